@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+登入、會話驗證與簽到/簽退的離線基準測試
+
+在本機啟動模擬的大葉大學系統（mock_dyu_server.py），為N個帳號建立與應用相同的
+SessionManager和TaskService，依次測量以下階段的延遲和吞吐量:
+    login     強制重新登入每個帳號
+    verify    驗證每個帳號的會話
+    sign_in   每個帳號執行一次簽到
+    sign_out  每個帳號執行一次簽退
+
+每個階段同時輸出伺服器收到的各頁面請求數，便於觀察每個操作實際發出多少請求。
+
+用法:
+    python benchmarks/bench_dyu.py --accounts 20 --concurrency 4 --latency 30 --error-rate 0.02
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 將專案根目錄添加到系統路徑，以便導入本地模塊
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_dyu_server import MockDyuServer
+from chronohelper.models.task import Task
+from chronohelper.services.session_manager import SessionManager
+from chronohelper.services.task_service import TaskService
+
+class BenchLogger:
+    """只計數不輸出的日誌記錄器，避免寫日誌文件影響測量"""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.debug_enabled = False
+        self.count = 0
+
+    def log(self, message):
+        self.count += 1
+        if self.verbose:
+            print(message)
+
+    def debug(self, message):
+        pass
+
+def run_phase(label, jobs, concurrency, server):
+    """並行執行一個階段並輸出結果
+
+    Args:
+        label: 階段名稱
+        jobs: 無參數的可調用對象列表，返回值表示是否成功
+        concurrency: 並行數
+        server: 模擬伺服器，用於統計請求數
+
+    Returns:
+        list: 每個作業的 (是否成功, 延遲秒數)
+    """
+    def timed(job):
+        start = time.perf_counter()
+        try:
+            ok = bool(job())
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    server.reset_counts()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, jobs))
+    total = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    succeeded = sum(1 for ok, _ in results if ok)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<9} ok {succeeded:>4}/{len(results):<4} "
+          f"mean {statistics.mean(latencies) * 1000:8.1f} ms  p50 {statistics.median(latencies) * 1000:8.1f} ms  "
+          f"p95 {p95 * 1000:8.1f} ms  max {latencies[-1] * 1000:8.1f} ms  "
+          f"total {total:7.3f} s  ({len(results) / total:6.1f} ops/s)")
+    counts = ", ".join(f"{path.rsplit('/', 1)[-1]}={count}" for path, count in sorted(server.request_counts.items()))
+    print(f"{'':<9} requests: {counts or '無'}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="登入、會話驗證與簽到/簽退的離線基準測試")
+    parser.add_argument("--accounts", type=int, default=10, help="帳號數")
+    parser.add_argument("--concurrency", type=int, default=4, help="並行數（對應max_session_workers）")
+    parser.add_argument("--latency", type=float, default=20, help="伺服器模擬處理延遲（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="伺服器隨機返回503的比例（0~1）")
+    parser.add_argument("--session-ttl", type=float, default=270, help="伺服器會話閒置過期時間（秒）")
+    parser.add_argument("--rate-interval", type=float, default=0.01, help="rate_limit_interval設定（秒）")
+    parser.add_argument("--rate-burst", type=int, default=10, help="rate_limit_burst設定")
+    parser.add_argument("--transport", default="http1", help="http_transport設定: http1 或 http2")
+    parser.add_argument("--verbose", action="store_true", help="輸出應用日誌")
+    args = parser.parse_args()
+
+    usernames = [f"user{i:03d}" for i in range(args.accounts)]
+    accounts = {username: ("secret", f"測試{i:03d}") for i, username in enumerate(usernames)}
+    server = MockDyuServer(accounts=accounts, latency=args.latency / 1000, error_rate=args.error_rate,
+                           session_ttl=args.session_ttl).start()
+
+    # 第一個帳號作為主帳號，其餘為附加帳號，與應用中的多帳號配置一致
+    settings = server.settings(
+        username=usernames[0], password="secret", name=accounts[usernames[0]][1],
+        accounts=[{"username": u, "password": "secret", "name": accounts[u][1]} for u in usernames[1:]],
+        max_session_workers=args.concurrency,
+        rate_limit_interval=args.rate_interval,
+        rate_limit_burst=args.rate_burst,
+        http_transport=args.transport,
+        session_valid_time=args.session_ttl
+    )
+    logger = BenchLogger(args.verbose)
+    manager = SessionManager(logger, settings)
+    task_service = TaskService(logger, manager.primary, manager)
+    keys = [""] + usernames[1:]
+
+    print(f"帳號 {args.accounts}，並行 {args.concurrency}，伺服器延遲 {args.latency} ms，"
+          f"錯誤率 {args.error_rate:.0%}，傳輸 {args.transport}")
+    try:
+        run_phase("login", [
+            (lambda key=key: manager.get_auth_service(key).login(manager.get_account_settings(key), force=True))
+            for key in keys
+        ], args.concurrency, server)
+
+        run_phase("verify", [
+            (lambda key=key: manager.get_auth_service(key).verify_session(manager.get_account_settings(key)))
+            for key in keys
+        ], args.concurrency, server)
+
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        tasks = [Task(f"bench-{key or usernames[0]}", today, "00:00", "00:01", account=key) for key in keys]
+        run_phase("sign_in", [
+            (lambda task=task: task_service.perform_sign_in(task, settings)) for task in tasks
+        ], args.concurrency, server)
+        run_phase("sign_out", [
+            (lambda task=task: task_service.perform_sign_out(task, settings)) for task in tasks
+        ], args.concurrency, server)
+    finally:
+        manager.shutdown()
+        server.stop()
+    print(f"應用日誌 {logger.count} 條")
+
+if __name__ == "__main__":
+    main()
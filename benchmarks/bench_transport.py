@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP/1.1 與 HTTP/2 傳輸的請求延遲基準測試
+
+在本機啟動兩個測試伺服器（HTTP/1.1 和 HTTP/2 明文直連），分別使用
+RequestsTransport 和 Http2Transport 發送相同的請求，比較串行與並行
+（每個工作線程模擬一個帳號的獨立會話）情況下的延遲。
+
+用法:
+    python benchmarks/bench_transport.py --requests 200 --concurrency 8 --latency 20
+
+HTTP/2 部分需要安裝 httpx[http2]，未安裝時只測試 HTTP/1.1。
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 將專案根目錄添加到系統路徑，以便導入本地模塊
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from requests.adapters import HTTPAdapter
+from chronohelper.utils.transport import RequestsTransport, Http2Transport
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# 模擬登入後首頁的響應內容
+RESPONSE_BODY = ("<html><body><span class=\"status\">測試 您好</span>"
+                 "<a href=\"logout.php\">登出</a></body></html>").encode("utf-8")
+
+def start_http1_server(latency):
+    """啟動HTTP/1.1測試伺服器
+
+    Args:
+        latency: 每個請求的模擬處理延遲（秒）
+
+    Returns:
+        tuple: (伺服器實例, 基礎URL)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+            self.end_headers()
+            self.wfile.write(RESPONSE_BODY)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/entrance/index.php"
+
+def _serve_h2_connection(sock, latency):
+    """處理單個HTTP/2連接，每個流在模擬延遲後獨立響應"""
+    conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+    lock = threading.Lock()
+    conn.initiate_connection()
+    sock.sendall(conn.data_to_send())
+
+    def respond(stream_id):
+        with lock:
+            try:
+                conn.send_headers(stream_id, [
+                    (":status", "200"),
+                    ("content-type", "text/html; charset=utf-8"),
+                    ("content-length", str(len(RESPONSE_BODY)))
+                ])
+                conn.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+                sock.sendall(conn.data_to_send())
+            except Exception:
+                pass
+
+    try:
+        while True:
+            data = sock.recv(65535)
+            if not data:
+                break
+            with lock:
+                events = conn.receive_data(data)
+                sock.sendall(conn.data_to_send())
+            for event in events:
+                if isinstance(event, h2.events.StreamEnded):
+                    timer = threading.Timer(latency, respond, (event.stream_id,))
+                    timer.daemon = True
+                    timer.start()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+def start_http2_server(latency):
+    """啟動HTTP/2明文直連（prior knowledge）測試伺服器
+
+    Args:
+        latency: 每個請求的模擬處理延遲（秒）
+
+    Returns:
+        tuple: (監聽socket, 基礎URL)
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(64)
+
+    def accept_loop():
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=_serve_h2_connection, args=(sock, latency), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    return listener, f"http://127.0.0.1:{listener.getsockname()[1]}/entrance/index.php"
+
+def run_sequential(transport, url, count):
+    """使用單個會話串行發送請求
+
+    Returns:
+        list: 每個請求的延遲（秒）
+    """
+    session = transport.new_session()
+    session.get(url, timeout=10)  # 預熱連接
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = session.get(url, timeout=10)
+        response.text
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_concurrent(transport, url, count, concurrency):
+    """多個會話（模擬多帳號）共用傳輸並行發送請求
+
+    Returns:
+        tuple: (每個請求的延遲列表, 總耗時秒數)
+    """
+    sessions = [transport.new_session() for _ in range(concurrency)]
+    for session in sessions:
+        session.get(url, timeout=10)  # 預熱連接
+
+    def worker(index):
+        session = sessions[index % concurrency]
+        start = time.perf_counter()
+        response = session.get(url, timeout=10)
+        response.text
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(worker, range(count)))
+    return latencies, time.perf_counter() - start
+
+def summarize(latencies):
+    """計算延遲統計（毫秒）"""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "mean": statistics.mean(ordered) * 1000,
+        "p50": statistics.median(ordered) * 1000,
+        "p95": p95 * 1000,
+        "max": ordered[-1] * 1000
+    }
+
+def print_row(label, latencies, total=None):
+    """輸出一行結果"""
+    stats = summarize(latencies)
+    line = (f"{label:<22} mean {stats['mean']:8.2f} ms  p50 {stats['p50']:8.2f} ms  "
+            f"p95 {stats['p95']:8.2f} ms  max {stats['max']:8.2f} ms")
+    if total is not None:
+        line += f"  total {total:7.3f} s  ({len(latencies) / total:7.1f} req/s)"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/1.1 與 HTTP/2 傳輸延遲基準測試")
+    parser.add_argument("--requests", type=int, default=200, help="每項測試的請求數")
+    parser.add_argument("--concurrency", type=int, default=8, help="並行會話數（模擬帳號數）")
+    parser.add_argument("--latency", type=float, default=20, help="伺服器模擬處理延遲（毫秒）")
+    args = parser.parse_args()
+
+    latency = args.latency / 1000
+    print(f"請求數 {args.requests}，並行會話 {args.concurrency}，伺服器延遲 {args.latency} ms")
+
+    server, url = start_http1_server(latency)
+    # 與SessionManager相同，所有會話共用一個連接池
+    transport = RequestsTransport(HTTPAdapter(pool_maxsize=args.concurrency))
+    try:
+        print_row("http1 sequential", run_sequential(transport, url, args.requests))
+        latencies, total = run_concurrent(transport, url, args.requests, args.concurrency)
+        print_row("http1 concurrent", latencies, total)
+    finally:
+        transport.close()
+        server.shutdown()
+
+    if not H2_AVAILABLE:
+        print("未安裝 h2，跳過 HTTP/2 測試（pip install httpx[http2]）")
+        return
+    try:
+        transport = Http2Transport(max_connections=args.concurrency, http1=False)
+    except ImportError as e:
+        print(f"無法創建 HTTP/2 傳輸，跳過測試: {str(e)}")
+        return
+
+    listener, url = start_http2_server(latency)
+    try:
+        print_row("http2 sequential", run_sequential(transport, url, args.requests))
+        latencies, total = run_concurrent(transport, url, args.requests, args.concurrency)
+        print_row("http2 concurrent", latencies, total)
+    finally:
+        transport.close()
+        listener.close()
+
+if __name__ == "__main__":
+    main()
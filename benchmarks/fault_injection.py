@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+重試、退避與斷路器行為的故障注入測試
+
+在模擬的大葉大學系統（mock_dyu_server.py）上逐一運行故障場景，每個場景使用
+全新的伺服器和認證服務，先正常登入，再注入故障並執行一次操作:
+    baseline          無故障，作為對照
+    latency_spike     簽到請求延遲超過單次請求超時
+    connection_reset  簽到請求的連接被重置（ProtocolError）
+    5xx_burst         連續多個簽到請求返回503
+    session_expiry    簽到請求到達時伺服器端會話過期，返回登入頁面
+    malformed_json    簽到API返回截斷的JSON
+    login_5xx         登入頁面和登入表單連續返回502，由ensure_login重新登入
+
+除login_5xx驅動AuthService.ensure_login外，其他場景通過TaskService.perform_sign_in
+驅動ensure_login和_execute_request_with_retry。每個場景輸出是否成功、按參數推算的
+預期結果（不一致時標記MISMATCH）、耗時、調用線程的阻塞時間（牆鐘時間減去線程CPU
+時間，即等待網絡和退避休眠的時間）以及伺服器收到的各頁面請求數。
+
+用法:
+    python benchmarks/fault_injection.py --spike 8 --attempt-timeout 5 --burst 2
+"""
+
+import argparse
+import datetime
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+# 將專案根目錄添加到系統路徑，以便導入本地模塊
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_dyu_server import MockDyuServer, INDEX_PATH, LOGIN_PATH, SIGN_PATH
+from bench_dyu import BenchLogger
+from chronohelper.models.task import Task
+from chronohelper.services.auth_service import AuthService
+from chronohelper.services.task_service import TaskService
+from chronohelper.utils.rate_limiter import RateLimiter
+
+class Fault:
+    """對指定路徑的前count個請求注入故障，作為MockDyuServer.fault_hook使用"""
+
+    def __init__(self, paths, count, action):
+        """初始化故障
+
+        Args:
+            paths: 受影響的路徑集合
+            count: 注入的次數
+            action: action(handler)返回True表示已自行響應，False表示繼續正常處理
+        """
+        self.paths = set(paths)
+        self.remaining = count
+        self.action = action
+        self.lock = threading.Lock()
+
+    def __call__(self, handler, path):
+        if path not in self.paths:
+            return False
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+        return self.action(handler)
+
+def spike(seconds):
+    """延遲後正常響應"""
+    def action(handler):
+        time.sleep(seconds)
+        return False
+    return action
+
+def reset(handler):
+    """不響應並以RST關閉連接，客戶端收到ProtocolError"""
+    handler.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    handler.connection.close()
+    handler.close_connection = True
+    return True
+
+def status(code):
+    """返回指定的錯誤狀態碼"""
+    def action(handler):
+        handler.respond(code, "Server Error", "text/plain")
+        return True
+    return action
+
+def expire(server):
+    """使伺服器端會話過期後繼續處理，請求會得到登入頁面"""
+    def action(handler):
+        server.expire_sessions()
+        return False
+    return action
+
+def malformed(handler):
+    """返回截斷的JSON"""
+    handler.respond(200, '{"result": 1, "msg": "簽到成', "application/json; charset=utf-8")
+    return True
+
+def build_scenarios(args):
+    """場景名稱 -> (創建故障的函數, 驅動方式, 預期是否成功)
+
+    預期結果按重試策略推算: 可重試的故障在故障次數少於最大嘗試次數時應恢復；
+    格式錯誤的JSON不重試；登入不重試，登入頁面出錯不致命，但登入表單出錯即失敗。
+    """
+    recovers = lambda failures: failures < args.max_attempts
+    return {
+        "baseline": (lambda server: None, "sign_in", True),
+        "latency_spike": (lambda server: Fault([SIGN_PATH], 1, spike(args.spike)), "sign_in", recovers(1)),
+        "connection_reset": (lambda server: Fault([SIGN_PATH], 2, reset), "sign_in", recovers(2)),
+        "5xx_burst": (lambda server: Fault([SIGN_PATH], args.burst, status(503)), "sign_in", recovers(args.burst)),
+        "session_expiry": (lambda server: Fault([SIGN_PATH], 1, expire(server)), "sign_in", recovers(1)),
+        "malformed_json": (lambda server: Fault([SIGN_PATH], 1, malformed), "sign_in", False),
+        "login_5xx": (lambda server: Fault([INDEX_PATH, LOGIN_PATH], args.burst, status(502)), "ensure_login",
+                      args.burst < 2),
+    }
+
+def run_scenario(name, make_fault, drive, args):
+    """運行單個場景
+
+    Returns:
+        dict: 場景結果
+    """
+    server = MockDyuServer(accounts={"tester": ("secret", "測試")}, latency=args.latency / 1000).start()
+    settings = server.settings(
+        username="tester", password="secret", name="測試",
+        rate_limit_interval=0.01, rate_limit_burst=10,
+        retry_policies={"sign_in": {"total_budget": args.budget, "max_attempts": args.max_attempts,
+                                    "max_attempt_timeout": args.attempt_timeout}}
+    )
+    logger = BenchLogger(args.verbose)
+    # 與應用相同，按設定創建限制器，避免默認頻率限制拖慢重試
+    rate_limiter = RateLimiter(settings["rate_limit_interval"], settings["rate_limit_burst"])
+    auth_service = AuthService(logger, rate_limiter=rate_limiter)
+    task_service = TaskService(logger, auth_service)
+    task = Task(f"fault-{name}", datetime.date.today().strftime("%Y-%m-%d"), "00:00", "00:01")
+
+    try:
+        if not auth_service.login(settings, force=True):
+            return {"name": name, "error": "初始登入失敗"}
+
+        server.fault_hook = make_fault(server)
+        server.reset_counts()
+        if drive == "ensure_login":
+            auth_service.login_status = False  # 模擬會話失效，ensure_login需要重新登入
+            operation = lambda: auth_service.ensure_login(settings)
+        else:
+            operation = lambda: task_service.perform_sign_in(task, settings)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            ok = bool(operation())
+        except Exception as e:
+            logger.log(f"場景拋出異常: {str(e)}")
+            ok = False
+        elapsed = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+
+        return {
+            "name": name,
+            "ok": ok,
+            "elapsed": elapsed,
+            "blocked": max(0.0, elapsed - cpu),
+            "cpu": cpu,
+            "counts": dict(server.request_counts),
+            "logs": logger.count
+        }
+    finally:
+        auth_service.transport.close()
+        server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="重試、退避與斷路器行為的故障注入測試")
+    parser.add_argument("--latency", type=float, default=5, help="伺服器基本處理延遲（毫秒）")
+    parser.add_argument("--spike", type=float, default=8, help="latency_spike場景的延遲（秒）")
+    parser.add_argument("--burst", type=int, default=2, help="5xx_burst和login_5xx場景的連續錯誤數")
+    parser.add_argument("--max-attempts", type=int, default=3, help="簽到操作的最大嘗試次數")
+    parser.add_argument("--attempt-timeout", type=float, default=5, help="簽到單次請求超時上限（秒）")
+    parser.add_argument("--budget", type=float, default=45, help="簽到操作的總時間預算（秒）")
+    parser.add_argument("--scenario", action="append", help="只運行指定場景，可重複")
+    parser.add_argument("--verbose", action="store_true", help="輸出應用日誌")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args)
+    names = args.scenario or list(scenarios.keys())
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f"未知場景: {', '.join(unknown)}（可用: {', '.join(scenarios)}）")
+
+    mismatches = 0
+    print(f"{'scenario':<18}{'result':<8}{'expected':<10}{'time':>9}{'blocked':>10}{'cpu':>8}  "
+          f"{'index':>6}{'login':>6}{'sign':>6}{'logs':>6}")
+    for name in names:
+        make_fault, drive, expected = scenarios[name]
+        result = run_scenario(name, make_fault, drive, args)
+        if "error" in result:
+            mismatches += 1
+            print(f"{name:<18}{result['error']}")
+            continue
+        counts = result["counts"]
+        match = result["ok"] == expected
+        if not match:
+            mismatches += 1
+        print(f"{name:<18}{'ok' if result['ok'] else 'FAIL':<8}"
+              f"{('ok' if expected else 'FAIL') + ('' if match else '!'):<10}"
+              f"{result['elapsed']:8.2f}s{result['blocked']:9.2f}s{result['cpu']:7.2f}s  "
+              f"{counts.get(INDEX_PATH, 0):>6}{counts.get(LOGIN_PATH, 0):>6}{counts.get(SIGN_PATH, 0):>6}"
+              f"{result['logs']:>6}{'' if match else '  MISMATCH'}")
+    if mismatches:
+        print(f"{mismatches} 個場景與預期不符")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
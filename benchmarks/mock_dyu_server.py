@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本機模擬的大葉大學系統，供基準測試和負載測試使用
+
+模擬以下頁面，響應格式與認證服務和任務服務的解析邏輯一致:
+    GET  /entrance/index.php          未登入時返回登入表單，已登入時返回「姓名 您好」和登出連結
+    POST /entrance/save_id.php        表單登入，帳號或密碼錯誤時返回error.php?error=2跳轉
+    POST /budget/prj_epfee/kernel/kernel_prj_carddata_edit.php
+                                      JSON簽到(type=1)/簽退(type=2) API，返回result/msg
+
+每個請求的處理延遲、隨機伺服器錯誤的比例、會話閒置過期時間和Date頭的時鐘偏移都可以設定。
+fault_hook可在處理請求前接管響應，用於故障注入。
+
+用法（獨立運行，將應用設定中的各URL指向此伺服器）:
+    python benchmarks/mock_dyu_server.py --port 8080 --latency 50 --error-rate 0.05 --session-ttl 270
+"""
+
+import argparse
+import email.utils
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+INDEX_PATH = "/entrance/index.php"
+LOGIN_PATH = "/entrance/save_id.php"
+SIGN_PATH = "/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php"
+
+LOGIN_PAGE = """<html><body>
+<form name="dyulogin" method="post" action="save_id.php">
+<input type="text" name="login_id"><input type="password" name="login_pwd">
+</form></body></html>"""
+
+HOME_PAGE = """<html><body>
+<span class="status">{name} 您好</span>
+<script>var ispass = "t";</script>
+<a href="logout.php">登出</a>
+</body></html>"""
+
+LOGIN_ERROR_PAGE = "<html><head><meta http-equiv='refresh' content='0; url=error.php?error=2'></head></html>"
+
+class MockSession:
+    """伺服器端的會話狀態"""
+
+    def __init__(self):
+        self.username = None
+        self.name = None
+        self.last_seen = time.monotonic()
+
+class MockDyuServer:
+    """模擬的大葉大學系統伺服器
+
+    帳號的簽到狀態保存在記憶體中：簽到後未簽退時再次簽到返回「請先簽退」，
+    未簽到時簽退返回「請先簽到」，與真實系統的提示一致。
+    """
+
+    def __init__(self, accounts=None, latency=0.0, error_rate=0.0, session_ttl=270, clock_skew=0.0,
+                 host="127.0.0.1", port=0):
+        """初始化伺服器
+
+        Args:
+            accounts: 帳號 -> (密碼, 姓名)，為None時接受任何帳號密碼
+            latency: 每個請求的處理延遲（秒）
+            error_rate: 隨機返回503的比例（0~1）
+            session_ttl: 會話閒置多久後過期（秒）
+            clock_skew: Date頭相對本機時間的偏移（秒），用於測試伺服器時鐘估計
+            host: 監聽地址
+            port: 監聽端口，0表示自動分配
+        """
+        self.accounts = accounts
+        self.latency = latency
+        self.error_rate = error_rate
+        self.session_ttl = session_ttl
+        self.clock_skew = clock_skew
+        self.fault_hook = None  # fault_hook(handler, path)返回True時表示已自行響應
+        self.sessions = {}  # PHPSESSID -> MockSession
+        self.signed_in = {}  # 帳號 -> 是否處於已簽到狀態
+        self.request_counts = Counter()  # 路徑 -> 請求數
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """伺服器根URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings(self, **overrides):
+        """生成指向此伺服器的應用設定
+
+        Args:
+            **overrides: 覆蓋的設定項
+
+        Returns:
+            dict: 可直接傳給AuthService/TaskService的設定字典
+        """
+        settings = {
+            "api_url": self.base_url + INDEX_PATH,
+            "login_url": self.base_url + LOGIN_PATH,
+            "sign_in_url": self.base_url + SIGN_PATH + "?page=NDgy",
+            "sign_out_url": self.base_url + SIGN_PATH + "?page=NDgy",
+        }
+        settings.update(overrides)
+        return settings
+
+    def start(self):
+        """在背景線程中啟動伺服器
+
+        Returns:
+            MockDyuServer: 自身，便於鏈式調用
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """停止伺服器"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def expire_sessions(self):
+        """立即使所有會話過期，模擬伺服器端登出"""
+        with self.lock:
+            self.sessions.clear()
+
+    def reset_counts(self):
+        """清除請求計數"""
+        with self.lock:
+            self.request_counts.clear()
+
+    def _get_session(self, session_id):
+        """獲取未過期的會話並更新最後活動時間，調用前需持有鎖"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session.last_seen > self.session_ttl:
+            del self.sessions[session_id]
+            return None
+        session.last_seen = now
+        return session
+
+    def _check_credentials(self, username, password):
+        """檢查帳號密碼
+
+        Returns:
+            str: 登入成功時返回姓名，否則返回None
+        """
+        if not username:
+            return None
+        if self.accounts is None:
+            return username
+        entry = self.accounts.get(username)
+        if entry is None or entry[0] != password:
+            return None
+        return entry[1]
+
+    def _sign(self, username, sign_type):
+        """執行簽到或簽退
+
+        Returns:
+            dict: 與真實API相同格式的結果
+        """
+        with self.lock:
+            signed_in = self.signed_in.get(username, False)
+            if sign_type == 1:
+                if signed_in:
+                    return {"result": 0, "msg": "請先簽退"}
+                self.signed_in[username] = True
+                return {"result": 1, "msg": "簽到成功"}
+            if sign_type == 2:
+                if not signed_in:
+                    return {"result": 0, "msg": "請先簽到"}
+                self.signed_in[username] = False
+                return {"result": 1, "msg": "簽退成功"}
+        return {"result": -1, "msg": "參數錯誤"}
+
+    def _make_handler(self):
+        """創建綁定到此伺服器的請求處理類"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def date_time_string(self, timestamp=None):
+                if timestamp is None:
+                    timestamp = time.time()
+                return email.utils.formatdate(timestamp + server.clock_skew, usegmt=True)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _session_id(self):
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "PHPSESSID":
+                        return value
+                return None
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def respond(self, status, body, content_type="text/html; charset=utf-8", cookie=None):
+                """發送完整響應"""
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                if cookie:
+                    self.send_header("Set-Cookie", f"PHPSESSID={cookie}; path=/")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self, method):
+                path = urlparse(self.path).path
+                body = self._read_body() if method == "POST" else b""
+                with server.lock:
+                    server.request_counts[path] += 1
+
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                if server.fault_hook and server.fault_hook(self, path):
+                    return
+                if server.error_rate > 0 and random.random() < server.error_rate:
+                    self.respond(503, "Service Unavailable", "text/plain")
+                    return
+
+                session_id = self._session_id()
+                new_cookie = None
+                with server.lock:
+                    session = server._get_session(session_id)
+                    if session is None:
+                        session_id = new_cookie = uuid.uuid4().hex
+                        session = server.sessions[session_id] = MockSession()
+
+                if path == INDEX_PATH and method == "GET":
+                    self._index(session, new_cookie)
+                elif path == LOGIN_PATH and method == "POST":
+                    self._login(session, body, new_cookie)
+                elif path == SIGN_PATH and method == "POST":
+                    self._sign_api(session, body, new_cookie)
+                else:
+                    self.respond(404, "Not Found", "text/plain", new_cookie)
+
+            def _index(self, session, cookie):
+                if session.username:
+                    self.respond(200, HOME_PAGE.format(name=session.name), cookie=cookie)
+                else:
+                    self.respond(200, LOGIN_PAGE, cookie=cookie)
+
+            def _login(self, session, body, cookie):
+                form = parse_qs(body.decode("utf-8"))
+                username = form.get("login_id", [""])[0]
+                name = server._check_credentials(username, form.get("login_pwd", [""])[0])
+                if name is None:
+                    self.respond(200, LOGIN_ERROR_PAGE, cookie=cookie)
+                    return
+                session.username = username
+                session.name = name
+                self.respond(200, HOME_PAGE.format(name=name), cookie=cookie)
+
+            def _sign_api(self, session, body, cookie):
+                # 會話失效時真實系統返回登入頁面而不是JSON
+                if not session.username:
+                    self.respond(200, LOGIN_PAGE, cookie=cookie)
+                    return
+                try:
+                    sign_type = int(json.loads(body or b"{}").get("type"))
+                except (ValueError, TypeError, AttributeError):
+                    sign_type = None
+                result = server._sign(session.username, sign_type)
+                self.respond(200, json.dumps(result, ensure_ascii=False), "application/json; charset=utf-8", cookie)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="本機模擬的大葉大學系統")
+    parser.add_argument("--host", default="127.0.0.1", help="監聽地址")
+    parser.add_argument("--port", type=int, default=8080, help="監聽端口")
+    parser.add_argument("--latency", type=float, default=0, help="每個請求的處理延遲（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="隨機返回503的比例（0~1）")
+    parser.add_argument("--session-ttl", type=float, default=270, help="會話閒置過期時間（秒）")
+    parser.add_argument("--clock-skew", type=float, default=0, help="Date頭的時鐘偏移（秒）")
+    args = parser.parse_args()
+
+    server = MockDyuServer(latency=args.latency / 1000, error_rate=args.error_rate, session_ttl=args.session_ttl,
+                           clock_skew=args.clock_skew, host=args.host, port=args.port)
+    print(f"模擬伺服器運行於 {server.base_url}，接受任何帳號密碼")
+    print(json.dumps(server.settings(), indent=2, ensure_ascii=False))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
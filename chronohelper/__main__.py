@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+命令行入口
+
+    python -m chronohelper           啟動圖形界面
+    python -m chronohelper --daemon  以無界面守護進程運行調度器（不導入tkinter）
+"""
+
+import argparse
+import logging
+import sys
+
+def main():
+    parser = argparse.ArgumentParser(prog="chronohelper", description="ChronoHelper 自動化簽到/簽退工具")
+    parser.add_argument("--daemon", action="store_true", help="以無界面守護進程運行，適用於沒有顯示器的伺服器")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from chronohelper.utils.ssl_handling import setup_ssl_handling
+    setup_ssl_handling()
+
+    if args.daemon:
+        from chronohelper.daemon import ChronoDaemon
+        return ChronoDaemon().run()
+
+    import tkinter as tk
+    from chronohelper.app import ChronoHelper
+    root = tk.Tk()
+    root.title("ChronoHelper")
+    root.minsize(400, 300)
+    ChronoHelper(root)
+    root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
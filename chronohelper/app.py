@@ -16,50 +16,37 @@ from typing import Callable, Any
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from chronohelper.config.colors import COLORS
-from chronohelper.config.settings import APP_SETTINGS
-from chronohelper.ui.notification import NotificationWindow
+from chronohelper.ui.notification import NotificationManager
 from chronohelper.ui.dialogs import SettingsDialog, ModernTaskDialog
-from chronohelper.ui.task_card import TaskCard
+from chronohelper.ui.task_card import TaskCard, card_signature
+from chronohelper.ui.task_list import VirtualTaskList
+from chronohelper.ui.task_canvas import CanvasTaskList
+from chronohelper.ui.task_views import SortedTaskViews
+from chronohelper.ui.task_search import TaskQuery, STATUS_FILTERS
 from chronohelper.ui.helpers import SettingTooltip
+from chronohelper.ui.event_bus import (UIEventBus, TASKS_CHANGED, STATUS_CHANGED, LOG_LINE,
+                                       NOTIFICATION, WARNING, STATS_CHANGED,
+                                       COALESCE_LAST, COALESCE_BATCH)
 from chronohelper.utils.logger import Logger
-from chronohelper.utils.network import NetworkUtils
-from chronohelper.utils.file_handler import FileHandler
-from chronohelper.services.auth_service import AuthService
-from chronohelper.services.task_service import TaskService
+from chronohelper.core import ChronoCore
 from chronohelper.services.scheduler import SchedulerService
 from chronohelper.models.task import Task
 
-class ChronoHelper:
+class ChronoHelper(ChronoCore):
+    """Tk界面應用，在應用核心之上提供任務列表、狀態面板和通知"""
+    
     def __init__(self, root):
         self.root = root
         self.root.title("ChronoHelper - 時間助手")
         self.root.geometry("950x650")
         self.root.configure(bg=COLORS["background"])
         
-        # 先初始化核心組件
-        self.logger = Logger() 
+        # 先初始化應用核心（設定、會話、任務服務和運行狀態）
+        super().__init__(Logger())
         
         # 設置應用圖標
         self.set_icon_for_all_windows()
         
-        # 初始化 file_handler
-        self.file_handler = FileHandler(self.logger)
-        
-        # 載入設定
-        self.settings = self.file_handler.load_settings(APP_SETTINGS)
-        
-        # 初始化其他核心組件
-        self.network_utils = NetworkUtils(self.logger, self.settings)
-        self.auth_service = AuthService(self.logger)
-        self.task_service = TaskService(self.logger, self.auth_service)
-        
-        # 初始化狀態變量
-        self.tasks = []
-        self.is_campus_network = False
-        self.current_ip = "未知"
-        self.last_network_log_time = None
-        self.last_network_log_status = None
-        
         # 網絡狀態平滑/持久化相關變數
         self.consecutive_failures = 0
         self.consecutive_successes = 0
@@ -78,21 +65,31 @@ class ChronoHelper:
             "sign_out_success": 0,
             "failures": 0
         }
-        
-        # 預先初始化執行統計結構
-        self.execution_stats = {
-            "total_executions": 0,
-            "successful_sign_ins": 0,
-            "successful_sign_outs": 0,
-            "failed_sign_ins": 0,
-            "failed_sign_outs": 0,
-            "last_success_time": None
-        }
+        self.shown_stats = {}  # 狀態面板目前顯示的值，只在變化時更新Tk變量和元件
+        self.stats_timer = None
         
         # 創建界面
         self.create_widgets()
         
-        # 載入任務和Cookie
+        # 桌面通知重用窗口並限制頻率，避免網絡波動時彈出大量窗口
+        self.notifications = NotificationManager(
+            self.root,
+            max_visible=self.settings.get("notification_max_visible", 3),
+            min_interval=self.settings.get("notification_min_interval", 2))
+        
+        # 後台線程的界面更新都經事件總線轉交主線程，每幀合併後處理
+        self.ui_bus = UIEventBus(self.root)
+        self.ui_bus.register(TASKS_CHANGED, self._on_tasks_changed, COALESCE_BATCH)
+        self.ui_bus.register(STATUS_CHANGED, self.status_var.set, COALESCE_LAST)
+        self.ui_bus.register(LOG_LINE, self._on_log_lines, COALESCE_BATCH)
+        self.ui_bus.register(NOTIFICATION, self._on_notification)
+        self.ui_bus.register(WARNING, self._on_warning)
+        self.ui_bus.register(STATS_CHANGED, lambda _: self.update_system_stats(), COALESCE_LAST)
+        self.logger.set_ui_sink(lambda line: self.ui_bus.publish(LOG_LINE, line))
+        self.ui_bus.start()
+        
+        # 載入任務和Cookie，排序視圖在首次刷新任務列表時建立
+        self.task_views = SortedTaskViews()
         self.load_tasks()
         self.refresh_task_list()
         self.log_text.see(tk.END) 
@@ -101,9 +98,7 @@ class ChronoHelper:
         
         # 先進行網絡環境初始檢測，不使用緩存結果
         self.logger.log("進行初始網絡環境檢測...")
-        self.network_utils.clear_cache()  # 清除緩存，確保獲得新的檢測結果
-        is_campus, ip, hop_info = self.network_utils.check_campus_network(
-            verbose=True, wait_for_hop_check=True)
+        is_campus, ip, hop_info = self.detect_network(verbose=True)
         self.update_network_status(is_campus, ip, hop_info, force_update=True)
         
         # 確保將結果設為應用程式的狀態
@@ -123,9 +118,8 @@ class ChronoHelper:
         initial_delay = 10000 + random.randint(0, 5000)  # 10-15秒的初始延遲
         self.root.after(initial_delay, self.periodic_network_check)
         
-        # 啟動狀態統計更新
-        self.update_system_stats()  # 立即更新一次
-        self.root.after(5000, self.update_system_stats)
+        # 啟動狀態統計更新（立即更新一次，之後由唯一的計時器定期更新）
+        self._stats_tick()
         
         # 註冊關閉窗口事件處理器
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -188,12 +182,16 @@ class ChronoHelper:
         
         sort_dropdown = ttk.Combobox(sort_frame, textvariable=self.sort_var, values=self.sort_options, width=10, state="readonly")
         sort_dropdown.pack(side=tk.LEFT)
-        sort_dropdown.bind("<<ComboboxSelected>>", lambda e: self.refresh_task_list())
+        # 切換排序時直接使用已排好序的視圖
+        sort_dropdown.bind("<<ComboboxSelected>>", lambda e: self.refresh_task_list(set()))
         
         from chronohelper.ui.base import ModernButton
         add_button = ModernButton(tasks_header, text="+ 新增任務", command=self.add_task)
         add_button.pack(side=tk.RIGHT)
         
+        # 搜尋和篩選列，輸入時即時篩選
+        self.create_filter_bar(left_frame)
+        
         # 任務捲動區域
         self.tasks_canvas = tk.Canvas(left_frame, bg=COLORS["background"], 
                                      highlightthickness=0)
@@ -204,12 +202,21 @@ class ChronoHelper:
                                        command=self.tasks_canvas.yview)
         tasks_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.tasks_canvas.configure(yscrollcommand=tasks_scrollbar.set)
-        
-        # 任務列表框架
-        self.tasks_frame = tk.Frame(self.tasks_canvas, bg=COLORS["background"])
-        self.tasks_canvas_window = self.tasks_canvas.create_window((0, 0), window=self.tasks_frame, 
-                                       anchor=tk.NW, tags="self.tasks_frame")
+        # 虛擬化任務列表，只為可見區域內的任務放置卡片並在捲動時回收重用
+        if self.settings.get("task_renderer", "widgets") == "canvas":
+            # 輕量渲染：所有卡片直接繪製在同一個Canvas上
+            self.task_list = CanvasTaskList(self.tasks_canvas, tasks_scrollbar,
+                                            on_edit=self.edit_task,
+                                            on_delete=self.delete_task,
+                                            on_sign_in=self.request_sign_in,
+                                            on_sign_out=self.request_sign_out,
+                                            on_update_status=self.update_task_status,
+                                            empty_factory=self._create_empty_view,
+                                            signature=card_signature)
+        else:
+            self.task_list = VirtualTaskList(self.tasks_canvas, tasks_scrollbar,
+                                             self._create_task_card, self._create_empty_view,
+                                             signature=card_signature)
         
         # 設置滾輪事件綁定
         self.tasks_canvas.bind("<Enter>", self._bind_mousewheel)
@@ -284,6 +291,18 @@ class ChronoHelper:
                                       bg=COLORS["card"], fg=COLORS["text"], font=("Arial", 9))
         self.sign_stats_label.pack(side=tk.RIGHT)
         
+        # 登入狀態（退避/鎖定）
+        self.login_state_frame = tk.Frame(self.status_card, bg=COLORS["card"])
+        self.login_state_frame.pack(fill=tk.X, pady=3)
+        
+        tk.Label(self.login_state_frame, text="登入狀態:", bg=COLORS["card"], 
+               fg=COLORS["text"], font=("Arial", 9, "bold")).pack(side=tk.LEFT)
+        
+        self.login_state_var = tk.StringVar(value="正常")
+        self.login_state_label = tk.Label(self.login_state_frame, textvariable=self.login_state_var,
+                                       bg=COLORS["card"], fg=COLORS["text"], font=("Arial", 9))
+        self.login_state_label.pack(side=tk.RIGHT)
+        
         # 最後更新時間
         self.last_update_frame = tk.Frame(self.status_card, bg=COLORS["card"])
         self.last_update_frame.pack(fill=tk.X, pady=3)
@@ -326,6 +345,12 @@ class ChronoHelper:
                                        fg="white", bg=COLORS["primary_dark"], font=("Arial", 10))
         self.network_status_label.pack(side=tk.RIGHT, padx=(0, 20))
         
+        # 後端服務（斷路器）狀態顯示
+        self.service_status_var = tk.StringVar(value="服務正常")
+        self.service_status_label = tk.Label(status_frame, textvariable=self.service_status_var,
+                                       fg="white", bg=COLORS["primary_dark"], font=("Arial", 10))
+        self.service_status_label.pack(side=tk.RIGHT, padx=(0, 20))
+        
         # 在狀態欄中添加刷新網絡狀態按鈕
         refresh_network_button = tk.Button(status_frame, text="⟳", bg=COLORS["primary_dark"],
                                          fg="white", relief=tk.FLAT, bd=0, padx=5,
@@ -358,10 +383,6 @@ class ChronoHelper:
         info_label.bind("<Enter>", lambda e: info_label.config(fg=COLORS["secondary"], font=("Arial", 10, "underline")))
         info_label.bind("<Leave>", lambda e: info_label.config(fg="white", font=("Arial", 10)))
         
-        # 設置任務畫布的捲動功能
-        self.tasks_frame.bind("<Configure>", self.on_frame_configure)
-        self.tasks_canvas.bind("<Configure>", self.on_canvas_configure)
-        
         # 記錄啟動信息
         self.logger.log("ChronoHelper 已啟動")
     
@@ -385,119 +406,168 @@ class ChronoHelper:
             self.tasks_canvas.unbind("<Button-4>")
             self.tasks_canvas.unbind("<Button-5>")
     
-    def on_frame_configure(self, event):
-        # 更新捲動區域
-        self.tasks_canvas.configure(scrollregion=self.tasks_canvas.bbox("all"))
+    def save_tasks(self, changed=None):
+        """保存任務列表並請求刷新界面（可在任意線程調用）
+        
+        Args:
+            changed: 內容有變更的任務，None表示未知或多個任務
+        """
+        if super().save_tasks(changed):
+            self.ui_bus.publish(TASKS_CHANGED, changed.id if changed is not None else None)
+            return True
+        return False
     
-    def on_canvas_configure(self, event):
-        # 調整任務列表框架的寬度
-        self.tasks_canvas.itemconfig("self.tasks_frame", width=event.width)
+    def _on_tasks_changed(self, task_ids):
+        """同一幀內的多次任務變更只刷新一次任務列表
+        
+        Args:
+            task_ids: 本幀收到的變更任務ID列表，包含None時表示需要完整比對
+        """
+        if None in task_ids:
+            self.refresh_task_list()
+        else:
+            self.refresh_task_list(set(task_ids))
     
-    def load_tasks(self):
-        """載入任務列表"""
-        self.tasks = self.file_handler.load_tasks()
-        
-        # 初始化任務的前一狀態，用於追蹤狀態變更
-        for task in self.tasks:
-            task._prev_sign_in_done = getattr(task, 'sign_in_done', False)
-            task._prev_sign_out_done = getattr(task, 'sign_out_done', False)
-            
-        self.logger.log(f"已載入 {len(self.tasks)} 個任務")
+    def _on_log_lines(self, lines):
+        """將本幀收到的日誌行一次插入日誌文本框
+        
+        Args:
+            lines: 已格式化的日誌行列表
+        """
+        self.log_text.insert(tk.END, "".join(lines))
+        self.log_text.see(tk.END)  # 自動滾動到底部
     
-    def save_tasks(self):
-        """保存任務列表"""
-        if self.file_handler.save_tasks(self.tasks):
-            self.refresh_task_list()
-            self.logger.log("任務已保存")
+    def _on_notification(self, payload):
+        """在主線程交給通知管理器顯示（可能合併或排隊）"""
+        title, message, duration = payload
+        self.notifications.notify(title, message, duration)
     
-    def refresh_task_list(self):
-        """刷新任務列表顯示"""
-        # 清空任務列表
-        for widget in self.tasks_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.tasks:
-            # 顯示友好的空任務提示
-            empty_frame = tk.Frame(self.tasks_frame, bg=COLORS["card"], padx=20, pady=30)
-            empty_frame.pack(fill=tk.X, padx=5, pady=10)
-            
-            # 改進邊框樣式
-            empty_frame.config(highlightbackground=COLORS["border"], highlightthickness=1, relief=tk.FLAT)
-            
-            # 添加圖示
-            icon_label = tk.Label(empty_frame, text="📋", font=("Arial", 36), bg=COLORS["card"], fg=COLORS["primary"])
-            icon_label.pack(pady=(10, 5))
-            
-            # 添加標題和說明文字
-            title_label = tk.Label(empty_frame, text="沒有待辦任務", font=("Arial", 14, "bold"), 
-                                 bg=COLORS["card"], fg=COLORS["text"])
-            title_label.pack(pady=(5, 10))
-            
-            message_label = tk.Label(empty_frame, 
-                                   text="您還沒有建立任何簽到簽退任務。\n點擊下方按鈕來新增第一個任務！", 
-                                   font=("Arial", 10), bg=COLORS["card"], fg=COLORS["light_text"],
-                                   wraplength=400, justify=tk.CENTER)
-            message_label.pack(pady=(0, 15))
-            
-            # 添加快速新增按鈕
-            from chronohelper.ui.base import ModernButton
-            add_task_button = ModernButton(empty_frame, text="+ 新增任務", command=self.add_task)
-            add_task_button.pack(pady=(0, 10))
-            
-            return
+    def _on_warning(self, payload):
+        """在主線程顯示警告對話框"""
+        title, message = payload
+        messagebox.showwarning(title, message, parent=self.root)
+    
+    def create_filter_bar(self, parent):
+        """創建任務搜尋和篩選列
         
-        # 根據排序設定排序任務
-        sort_option = self.sort_var.get()
-        
-        if sort_option == "日期 ↑":
-            sorted_tasks = sorted(self.tasks, key=lambda x: (x.date, x.sign_in_time))
-        elif sort_option == "日期 ↓":
-            sorted_tasks = sorted(self.tasks, key=lambda x: (x.date, x.sign_in_time), reverse=True)
-        elif sort_option == "簽到時間 ↑":
-            sorted_tasks = sorted(self.tasks, key=lambda x: (x.sign_in_time, x.date))
-        elif sort_option == "簽到時間 ↓":
-            sorted_tasks = sorted(self.tasks, key=lambda x: (x.sign_in_time, x.date), reverse=True)
-        elif sort_option == "名稱 ↑":
-            sorted_tasks = sorted(self.tasks, key=lambda x: x.name)
-        elif sort_option == "名稱 ↓":
-            sorted_tasks = sorted(self.tasks, key=lambda x: x.name, reverse=True)
-        elif sort_option == "狀態優先":
-            # 優先顯示今天待處理的任務，再顯示未來任務，最後是已完成/過期任務
-            today = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-            def status_key(task):
-                # 1: 今天待處理, 2: 未來任務, 3: 已完成任務, 4: 過期未完成任務
-                if task.date == today:
-                    if task.sign_in_done and task.sign_out_done:
-                        return 3  # 今天已完成
-                    else:
-                        return 1  # 今天待處理
-                elif task.date > today:
-                    return 2  # 未來任務
-                else:  # 過期任務
-                    if task.sign_in_done and task.sign_out_done:
-                        return 3  # 已完成
-                    else:
-                        return 4  # 過期未完成
-            
-            sorted_tasks = sorted(self.tasks, key=lambda x: (status_key(x), x.date, x.sign_in_time))
+        Args:
+            parent: 父容器
+        """
+        filter_frame = tk.Frame(parent, bg=COLORS["background"])
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.search_var = tk.StringVar()
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+        self.status_filter_var = tk.StringVar(value="全部狀態")
+        
+        tk.Label(filter_frame, text="搜尋:", bg=COLORS["background"], fg=COLORS["text"]).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(filter_frame, textvariable=self.search_var, width=16).pack(side=tk.LEFT)
+        
+        tk.Label(filter_frame, text="日期:", bg=COLORS["background"], fg=COLORS["text"]).pack(side=tk.LEFT, padx=(10, 5))
+        date_from_entry = ttk.Entry(filter_frame, textvariable=self.date_from_var, width=11)
+        date_from_entry.pack(side=tk.LEFT)
+        SettingTooltip(date_from_entry, "起始日期（YYYY-MM-DD），可只輸入年或年-月")
+        tk.Label(filter_frame, text="~", bg=COLORS["background"], fg=COLORS["text"]).pack(side=tk.LEFT, padx=2)
+        date_to_entry = ttk.Entry(filter_frame, textvariable=self.date_to_var, width=11)
+        date_to_entry.pack(side=tk.LEFT)
+        SettingTooltip(date_to_entry, "結束日期（YYYY-MM-DD），可只輸入年或年-月")
+        
+        status_dropdown = ttk.Combobox(filter_frame, textvariable=self.status_filter_var,
+                                       values=list(STATUS_FILTERS), width=9, state="readonly")
+        status_dropdown.pack(side=tk.LEFT, padx=(10, 0))
+        
+        from chronohelper.ui.base import ModernButton
+        ModernButton(filter_frame, text="清除", command=self.clear_filters).pack(side=tk.RIGHT)
+        
+        # 篩選條件變化時只重新查詢索引，任務本身沒有變更
+        for var in (self.search_var, self.date_from_var, self.date_to_var, self.status_filter_var):
+            var.trace_add("write", lambda *args: self.refresh_task_list(set()))
+    
+    def clear_filters(self):
+        """清除所有篩選條件"""
+        self.search_var.set("")
+        self.date_from_var.set("")
+        self.date_to_var.set("")
+        self.status_filter_var.set("全部狀態")
+    
+    def get_task_query(self):
+        """根據篩選列的輸入建立篩選條件"""
+        return TaskQuery(self.search_var.get(), self.date_from_var.get(),
+                         self.date_to_var.get(), self.status_filter_var.get())
+    
+    def _create_task_card(self, parent):
+        """創建尚未綁定任務的卡片，由虛擬化任務列表按需調用並回收重用"""
+        return TaskCard(
+            parent,
+            on_edit=self.edit_task,
+            on_delete=self.delete_task,
+            on_sign_in=self.request_sign_in,
+            on_sign_out=self.request_sign_out,
+            on_update_status=self.update_task_status,
+            main_canvas=self.tasks_canvas  # 傳遞Canvas引用
+        )
+    
+    def _create_empty_view(self, parent):
+        """創建沒有任務時顯示的友好提示"""
+        empty_frame = tk.Frame(parent, bg=COLORS["card"], padx=20, pady=30)
+        
+        # 改進邊框樣式
+        empty_frame.config(highlightbackground=COLORS["border"], highlightthickness=1, relief=tk.FLAT)
+        
+        # 添加圖示
+        icon_label = tk.Label(empty_frame, text="📋", font=("Arial", 36), bg=COLORS["card"], fg=COLORS["primary"])
+        icon_label.pack(pady=(10, 5))
+        
+        # 添加標題和說明文字
+        self.empty_title_label = tk.Label(empty_frame, text="沒有待辦任務", font=("Arial", 14, "bold"), 
+                             bg=COLORS["card"], fg=COLORS["text"])
+        self.empty_title_label.pack(pady=(5, 10))
+        
+        self.empty_message_label = tk.Label(empty_frame, 
+                               text="您還沒有建立任何簽到簽退任務。\n點擊下方按鈕來新增第一個任務！", 
+                               font=("Arial", 10), bg=COLORS["card"], fg=COLORS["light_text"],
+                               wraplength=400, justify=tk.CENTER)
+        self.empty_message_label.pack(pady=(0, 15))
+        self._update_empty_view()
+        
+        # 添加快速新增按鈕
+        from chronohelper.ui.base import ModernButton
+        add_task_button = ModernButton(empty_frame, text="+ 新增任務", command=self.add_task)
+        add_task_button.pack(pady=(0, 10))
+        
+        return empty_frame
+    
+    def refresh_task_list(self, changed_ids=None):
+        """刷新任務列表顯示，卡片只在可見區域內創建
+        
+        排序視圖增量維護，刷新時不再重新排序；順序未變時虛擬化列表只更新變更的卡片。
+        
+        Args:
+            changed_ids: 內容有變更的任務ID集合，None表示未知（與任務列表完整比對）
+        """
+        if changed_ids is None:
+            self.task_views.sync(self.tasks)
         else:
-            # 預設排序方式
-            sorted_tasks = sorted(self.tasks, key=lambda x: (x.date, x.sign_in_time))
-        
-        # 創建任務卡片，傳遞Canvas引用
-        for task in sorted_tasks:
-            task_card = TaskCard(
-                self.tasks_frame, 
-                task, 
-                on_edit=self.edit_task,
-                on_delete=self.delete_task,
-                on_sign_in=self.perform_sign_in,
-                on_sign_out=self.perform_sign_out,
-                on_update_status=self.update_task_status,
-                main_canvas=self.tasks_canvas  # 傳遞Canvas引用
-            )
-            task_card.pack(fill=tk.X, pady=5, padx=5)
+            self.task_views.update(changed_ids)
+        
+        # 篩選結果交給虛擬化列表，只移動、插入或移除有變化的卡片
+        self.task_list.set_tasks(self.task_views.filtered(self.sort_var.get(), self.get_task_query()))
+        if changed_ids:
+            self.task_list.update_tasks(changed_ids)
+        self._update_empty_view()
+        self.update_task_stats()
+    
+    def _update_empty_view(self):
+        """根據是否有篩選條件切換空列表提示"""
+        if getattr(self, 'empty_title_label', None) is None:
+            return
+        if self.tasks and not self.get_task_query().is_empty():
+            self.empty_title_label.config(text="沒有符合條件的任務")
+            self.empty_message_label.config(text="請調整搜尋文字、日期範圍或狀態篩選。")
+        else:
+            self.empty_title_label.config(text="沒有待辦任務")
+            self.empty_message_label.config(text="您還沒有建立任何簽到簽退任務。\n點擊下方按鈕來新增第一個任務！")
     
     def add_task(self):
         """添加新任務"""
@@ -518,7 +588,8 @@ class ChronoHelper:
             new_task._prev_sign_out_done = False
             
             self.tasks.append(new_task)
-            self.save_tasks()
+            self.task_views.add(new_task)
+            self.save_tasks(new_task)
             self.logger.log(f"新增任務: {name}, 日期: {date}, 時間: {sign_in}-{sign_out}")
             self.show_notification("任務已建立", f"已成功新增「{name}」任務")
     
@@ -542,7 +613,7 @@ class ChronoHelper:
             task.sign_in_time = sign_in
             task.sign_out_time = sign_out
             task.notify = notify
-            self.save_tasks()
+            self.save_tasks(task)
             self.logger.log(f"編輯任務: {name}, 日期: {date}, 時間: {sign_in}-{sign_out}")
             self.show_notification("任務已更新", f"已成功更新「{name}」任務")
     
@@ -550,7 +621,8 @@ class ChronoHelper:
         """刪除任務"""
         if messagebox.askyesno("確認刪除", f"確定要刪除「{task.name}」任務嗎？", parent=self.root):
             self.tasks.remove(task)
-            self.save_tasks()
+            self.task_views.remove(task.id)
+            self.save_tasks(task)
             self.logger.log(f"刪除任務: {task.name}")
             self.show_notification("任務已刪除", f"已成功刪除「{task.name}」任務")
     
@@ -565,7 +637,7 @@ class ChronoHelper:
         task._prev_sign_out_done = task.sign_out_done
         
         # 保存更新後的任務
-        self.save_tasks()
+        self.save_tasks(task)
         
         # 更新日誌
         status_text = []
@@ -616,21 +688,8 @@ class ChronoHelper:
             if (task.sign_in_done != old_sign_in_done) or (task.sign_out_done != old_sign_out_done):
                 stats["total_executions"] = stats.get("total_executions", 0) + 1
             
-            # 使用after延遲更新系統狀態面板，避免與界面更新衝突
-            self.root.after(100, self.update_system_stats)
-    
-    def load_cookies(self):
-        """載入保存的Cookies"""
-        cookies = self.file_handler.load_cookies()
-        if cookies:
-            self.auth_service.set_cookies(cookies)
-            self.logger.log("已載入保存的Cookie，將在首次操作時驗證")
-    
-    def save_cookies(self):
-        """保存當前會話的Cookies"""
-        cookies_list = self.auth_service.get_cookies_list()
-        if self.file_handler.save_cookies(cookies_list):
-            self.logger.log("已保存Cookie")
+            # 經事件總線更新系統狀態面板，與同一幀的其他界面更新合併
+            self.ui_bus.publish(STATS_CHANGED)
     
     def open_settings(self):
         """打開設置對話框"""
@@ -647,10 +706,14 @@ class ChronoHelper:
             # 立即保存到文件
             self.file_handler.save_settings(self.settings)
             self.logger.log("已更新應用程式設定")
+            self.logger.set_debug(self.settings.get("debug_logging", False))
             
             # 將新設定應用到網絡工具
             self.network_utils.update_settings(self.settings)
             
+            # 同步帳號列表到會話管理器
+            self.session_manager.update_settings(self.settings)
+            
             # 如果檢查間隔有變更，重啟調度器
             if old_interval != self.settings.get("check_interval", 30):
                 self.scheduler.stop()
@@ -669,162 +732,75 @@ class ChronoHelper:
             # 清除緩存，但不立即執行檢測
             self.network_utils.clear_cache()
     
-    def perform_sign_in(self, task, from_scheduler=False):
-        """執行簽到操作
+    def request_sign_in(self, task):
+        """從界面觸發簽到，通過請求頻率限制器排隊後在後台執行，不阻塞界面
         
         Args:
             task: 要執行的任務
-            from_scheduler: 是否由調度器自動執行
         """
-        # 檢查網絡環境
-        if not self.is_campus_network:
-            self.logger.log(f"簽到失敗: 當前處於校外網絡環境，IP: {self.current_ip}")
-            if self.settings.get("global_notify", True) and task.notify:
-                self.show_notification(f"{task.name} 簽到失敗", 
-                                     "您當前處於校外網絡環境，無法執行簽到操作\n請連接校內網絡後再試")
-            self.status_var.set("簽到需要校內網絡環境")
-            return False
-        
-        # 調用任務服務執行簽到
-        result = self.task_service.perform_sign_in(task, self.settings)
-        
-        # 處理結果
-        if result:
-            # 更新任務狀態
-            task.sign_in_done = True
-            self.save_tasks()
-            
-            # 更新統計信息 - 只有在非調度器調用時才增加計數
-            if hasattr(self, 'scheduler') and hasattr(self.scheduler, 'execution_stats') and not from_scheduler:
-                stats = self.scheduler.execution_stats
-                stats["successful_sign_ins"] = stats.get("successful_sign_ins", 0) + 1
-                stats["total_executions"] = stats.get("total_executions", 0) + 1
-                stats["last_success_time"] = datetime.datetime.now()
-                
-                # 立即更新系統狀態面板
-                self.update_system_stats()
-            
-            # 顯示通知
-            if self.settings.get("global_notify", True) and task.notify:
-                self.show_notification(f"{task.name} 簽到成功", 
-                                      f"已在 {datetime.datetime.now().strftime('%H:%M:%S')} 完成簽到")
-            
-            self.status_var.set(f"已完成 '{task.name}' 的簽到")
-            return True
+        url = self.settings.get("sign_in_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy")
+        delay = self.task_service.rate_limiter.schedule(url, self.perform_sign_in, task, reserved=True)
+        if delay > 0:
+            self.set_status(f"'{task.name}' 簽到已排隊，約 {delay:.1f} 秒後執行")
         else:
-            # 更新統計信息 - 只有在非調度器調用時才增加計數
-            if hasattr(self, 'scheduler') and hasattr(self.scheduler, 'execution_stats') and not from_scheduler:
-                stats = self.scheduler.execution_stats
-                stats["failed_sign_ins"] = stats.get("failed_sign_ins", 0) + 1
-                stats["total_executions"] = stats.get("total_executions", 0) + 1
-                
-                # 立即更新系統狀態面板
-                self.update_system_stats()
-                
-            # 如果任務有環境限制標記，更新UI
-            if hasattr(task, 'campus_restricted') and task.campus_restricted:
-                self.save_tasks()
-            
-            self.status_var.set(f"'{task.name}' 簽到失敗")
-            return False
+            self.set_status(f"正在執行 '{task.name}' 的簽到...")
     
-    def perform_sign_out(self, task, from_scheduler=False):
-        """執行簽退操作
+    def perform_sign_in(self, task, from_scheduler=False, reserved=False, return_joined=False):
+        """執行簽到操作，手動觸發時刷新狀態面板（在請求隊列的後台線程執行）
         
         Args:
             task: 要執行的任務
             from_scheduler: 是否由調度器自動執行
+            reserved: 是否已預約請求令牌（由request_sign_in排隊執行）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽到
         """
-        # 檢查網絡環境
-        if not self.is_campus_network:
-            self.logger.log(f"簽退失敗: 當前處於校外網絡環境，IP: {self.current_ip}")
-            if self.settings.get("global_notify", True) and task.notify:
-                self.show_notification(f"{task.name} 簽退失敗", 
-                                     "您當前處於校外網絡環境，無法執行簽退操作\n請連接校內網絡後再試")
-            self.status_var.set("簽退需要校內網絡環境")
-            return False
-        
-        # 調用任務服務執行簽退
-        result = self.task_service.perform_sign_out(task, self.settings)
-        
-        # 處理結果
-        if result:
-            # 更新任務狀態
-            task.sign_out_done = True
-            self.save_tasks()
-            
-            # 更新統計信息 - 只有在非調度器調用時才增加計數
-            if hasattr(self, 'scheduler') and hasattr(self.scheduler, 'execution_stats') and not from_scheduler:
-                stats = self.scheduler.execution_stats
-                stats["successful_sign_outs"] = stats.get("successful_sign_outs", 0) + 1
-                stats["total_executions"] = stats.get("total_executions", 0) + 1
-                stats["last_success_time"] = datetime.datetime.now()
-                
-                # 立即更新系統狀態面板
-                self.update_system_stats()
-            
-            # 顯示通知
-            if self.settings.get("global_notify", True) and task.notify:
-                self.show_notification(f"{task.name} 簽退成功", 
-                                      f"已在 {datetime.datetime.now().strftime('%H:%M:%S')} 完成簽退")
-            
-            # 特殊處理：檢查工作時間不足的情況
-            self.check_work_time(task)
-            
-            self.status_var.set(f"已完成 '{task.name}' 的簽退")
-            return True
+        result = super().perform_sign_in(task, from_scheduler, reserved, return_joined)
+        if not from_scheduler:
+            self.ui_bus.publish(STATS_CHANGED)
+        return result
+    
+    def request_sign_out(self, task):
+        """從界面觸發簽退，通過請求頻率限制器排隊後在後台執行，不阻塞界面
+        
+        Args:
+            task: 要執行的任務
+        """
+        url = self.settings.get("sign_out_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy")
+        delay = self.task_service.rate_limiter.schedule(url, self.perform_sign_out, task, reserved=True)
+        if delay > 0:
+            self.set_status(f"'{task.name}' 簽退已排隊，約 {delay:.1f} 秒後執行")
         else:
-            # 更新統計信息 - 只有在非調度器調用時才增加計數
-            if hasattr(self, 'scheduler') and hasattr(self.scheduler, 'execution_stats') and not from_scheduler:
-                stats = self.scheduler.execution_stats
-                stats["failed_sign_outs"] = stats.get("failed_sign_outs", 0) + 1
-                stats["total_executions"] = stats.get("total_executions", 0) + 1
-                
-                # 立即更新系統狀態面板
-                self.update_system_stats()
-                
-            # 如果任務有環境限制標記，更新UI
-            if hasattr(task, 'campus_restricted') and task.campus_restricted:
-                self.save_tasks()
-            
-            self.status_var.set(f"'{task.name}' 簽退失敗")
-            return False
+            self.set_status(f"正在執行 '{task.name}' 的簽退...")
     
-    def check_work_time(self, task):
-        """檢查工作時間是否足夠"""
-        if task.sign_in_done and task.sign_in_time:
-            try:
-                # 解析簽到時間
-                sign_in_parts = task.sign_in_time.split(":")
-                now = datetime.datetime.now()
-                
-                # 構建今天的簽到時間和當前時間對象
-                sign_in_time = datetime.datetime(
-                    now.year, now.month, now.day,
-                    int(sign_in_parts[0]), int(sign_in_parts[1])
-                )
-                
-                # 計算時間差
-                time_diff = now - sign_in_time
-                minutes = time_diff.total_seconds() / 60
-                
-                if minutes < 30:
-                    warning_msg = (
-                        f"注意：您的工作時間僅為 {int(minutes)} 分鐘，不足30分鐘。\n\n"
-                        "根據系統規則，不足30分鐘的工讀時數將不列入計算。\n"
-                        "請確保您的工作時間達到學校規定的最低要求。"
-                    )
-                    messagebox.showwarning("工作時間不足", warning_msg, parent=self.root)
-                    self.logger.log(f"警告: 工作時間不足30分鐘 ({int(minutes)}分鐘)")
-            except Exception as e:
-                self.logger.log(f"計算工作時間時出錯: {str(e)}")
+    def perform_sign_out(self, task, from_scheduler=False, reserved=False, return_joined=False):
+        """執行簽退操作，手動觸發時刷新狀態面板（在請求隊列的後台線程執行）
+        
+        Args:
+            task: 要執行的任務
+            from_scheduler: 是否由調度器自動執行
+            reserved: 是否已預約請求令牌（由request_sign_out排隊執行）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽退
+        """
+        result = super().perform_sign_out(task, from_scheduler, reserved, return_joined)
+        if not from_scheduler:
+            self.ui_bus.publish(STATS_CHANGED)
+        return result
+    
+    def set_status(self, text):
+        """在狀態欄顯示狀態文字（可在任意線程調用）"""
+        super().set_status(text)
+        self.ui_bus.publish(STATUS_CHANGED, text)
+    
+    def show_warning(self, title, message):
+        """以對話框顯示警告（可在任意線程調用）"""
+        self.ui_bus.publish(WARNING, (title, message))
     
     def show_notification(self, title, message):
-        """顯示桌面通知"""
+        """顯示桌面通知（可在任意線程調用）"""
         # 從設定中獲取通知顯示時間（秒），並轉換為毫秒
         duration = self.settings.get("notification_duration", 5) * 1000
-        NotificationWindow(title, message, duration=duration)
-        self.logger.log(f"通知: {title} - {message}")
+        self.ui_bus.publish(NOTIFICATION, (title, message, duration))
+        super().show_notification(title, message)
     
     def periodic_network_check(self):
         """定期檢測網絡環境"""
@@ -938,7 +914,7 @@ class ChronoHelper:
             
             # 如果狀態發生變化，刷新任務列表顯示
             if status_changed:
-                self.refresh_task_list()
+                self.ui_bus.publish(TASKS_CHANGED)
     
     def _update_network_quality_indicator(self, hop_info):
         """更新網絡質量指示器"""
@@ -1072,28 +1048,13 @@ class ChronoHelper:
                     current_status = getattr(self, 'is_campus_network', False)
                     self.update_network_status(current_status, ip, hop_info, force_update=True, skip_ip_log=True)
             
-            # 強制刷新任務列表顯示
-            self.refresh_task_list()
+            # 強制刷新任務列表顯示（與本次檢測中的其他刷新請求合併）
+            self.ui_bus.publish(TASKS_CHANGED)
         except Exception as e:
             self.logger.log(f"網絡狀態刷新失敗: {str(e)}")
             self.network_status_var.set("網絡檢測失敗")
             self.network_status_label.config(fg="#e74c3c")  # 紅色
     
-    def reset_campus_restrictions(self):
-        """重置所有任務的環境限制狀態，返回重置的任務數量"""
-        reset_count = 0
-        for task in self.tasks:
-            if hasattr(task, 'campus_restricted') and task.campus_restricted:
-                task.campus_restricted = False
-                task.last_attempt_time = None
-                reset_count += 1
-        
-        if reset_count > 0:
-            self.logger.log(f"已重置 {reset_count} 個任務的環境限制狀態")
-            self.save_tasks()
-        
-        return reset_count
-
     def set_icon_for_all_windows(self):
         """使用更可靠的方法設置所有視窗的圖標"""
         try:
@@ -1216,21 +1177,17 @@ class ChronoHelper:
         try:
             self.logger.log("正在關閉應用程式...")
             
-            # 停止調度器
-            if hasattr(self, 'scheduler'):
-                self.scheduler.stop()
-                self.logger.log("調度器已停止")
+            # 停止調度器和網絡檢測，保存設定、任務和Cookie，關閉連接池
+            self.shutdown()
             
-            # 停止所有網絡檢測操作
-            if hasattr(self, 'network_utils'):
-                self.network_utils.shutdown()
-                
-            # 保存所有設定和任務
-            if hasattr(self, 'file_handler'):
-                self.save_cookies()
-                self.file_handler.save_settings(self.settings)
-                self.file_handler.save_tasks(self.tasks)
-                self.logger.log("設定和任務已保存")
+            # 停止事件泵，之後的日誌只寫入文件
+            self.logger.set_ui_sink(None)
+            self.logger.set_text_widget(None)
+            self.ui_bus.stop()
+            self.notifications.clear()
+            if self.stats_timer is not None:
+                self.root.after_cancel(self.stats_timer)
+                self.stats_timer = None
             
             # 清理其他資源
             self.logger.log("ChronoHelper 已關閉")
@@ -1248,31 +1205,16 @@ class ChronoHelper:
 
         # 獲取調度器狀態
         scheduler_status = "運行中" if self.scheduler.running else "停止"
-        self.scheduler_status_var.set(scheduler_status)
+        self._set_stat(self.scheduler_status_var, scheduler_status)
         
         # 更新調度器狀態指示器顏色
         if scheduler_status == "運行中":
-            self.scheduler_indicator.config(fg=COLORS["progress_done"])  # 綠色
+            self._set_stat_fg(self.scheduler_indicator, COLORS["progress_done"])  # 綠色
         else:
-            self.scheduler_indicator.config(fg=COLORS["warning"])  # 紅色
-        
-        # 對任務進行統計
-        total_tasks = len(self.tasks)
+            self._set_stat_fg(self.scheduler_indicator, COLORS["warning"])  # 紅色
         
-        if total_tasks > 0:
-            today = datetime.datetime.now().strftime("%Y-%m-%d")
-            today_tasks = [t for t in self.tasks if t.date == today]
-            active_tasks = len(today_tasks)
-            
-            # 計算今日已完成和待執行任務
-            completed_tasks = len([t for t in today_tasks if getattr(t, 'sign_in_done', False) and getattr(t, 'sign_out_done', False)])
-            pending_tasks = active_tasks - completed_tasks
-            
-            # 更新任務統計信息
-            self.task_stats_var.set(f"總共 {total_tasks} | 今日 {active_tasks} | 已完成 {completed_tasks}")
-        else:
-            # 沒有任務
-            self.task_stats_var.set("總共 0 | 今日 0 | 已完成 0")
+        # 任務統計由計數器增量維護，這裡只處理跨日
+        self.update_task_stats()
         
         # 確保調度器的執行統計數據可用
         stats = getattr(self.scheduler, 'execution_stats', {})
@@ -1295,18 +1237,68 @@ class ChronoHelper:
         failed = stats.get("failed_sign_ins", 0) + stats.get("failed_sign_outs", 0)
         
         # 更新顯示格式
-        self.sign_stats_var.set(f"簽到 {sign_in_success} | 簽退 {sign_out_success} | 失敗 {failed}")
+        self._set_stat(self.sign_stats_var, f"簽到 {sign_in_success} | 簽退 {sign_out_success} | 失敗 {failed}")
         
         # 更新最後成功時間
         last_success = stats.get("last_success_time")
         if last_success:
             last_time_str = last_success.strftime("%H:%M:%S")
-            self.last_update_var.set(last_time_str)
+            self._set_stat(self.last_update_var, last_time_str)
         else:
-            self.last_update_var.set("從未")
-        
-        # 定期更新狀態統計
-        self.root.after(5000, self.update_system_stats)
+            self._set_stat(self.last_update_var, "從未")
+        
+        # 更新登入退避狀態
+        backoff_state = self.auth_service.get_backoff_state()
+        if backoff_state["remaining"] > 0:
+            self._set_stat(self.login_state_var, f"鎖定中，剩餘 {int(backoff_state['remaining'])} 秒")
+            self._set_stat_fg(self.login_state_label, COLORS["warning"])
+        elif backoff_state["failures"] > 0:
+            self._set_stat(self.login_state_var, f"連續失敗 {backoff_state['failures']} 次")
+            self._set_stat_fg(self.login_state_label, COLORS["warning"])
+        else:
+            self._set_stat(self.login_state_var, "正常")
+            self._set_stat_fg(self.login_state_label, COLORS["text"])
+        
+        # 更新後端服務斷路器狀態
+        breaker_state, retry_after = self.session_manager.breakers.get_summary()
+        if breaker_state == "open" and retry_after > 0:
+            self._set_stat(self.service_status_var, f"服務中斷 ⚠️ ({int(retry_after)}秒後探測)")
+            self._set_stat_fg(self.service_status_label, COLORS["warning"])
+        elif breaker_state in ("open", "half_open"):
+            self._set_stat(self.service_status_var, "服務探測中...")
+            self._set_stat_fg(self.service_status_label, "#f39c12")
+        else:
+            self._set_stat(self.service_status_var, "服務正常")
+            self._set_stat_fg(self.service_status_label, "white")
+    
+    def update_task_stats(self):
+        """根據增量計數器更新任務統計，不掃描任務列表"""
+        counters = self.task_views.counters
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        active_tasks, completed_tasks = counters.for_date(today)
+        self._set_stat(self.task_stats_var, f"總共 {counters.total} | 今日 {active_tasks} | 已完成 {completed_tasks}")
+    
+    def _stats_tick(self):
+        """唯一的狀態統計計時器，事件觸發的即時更新不會再增加計時器"""
+        self.stats_timer = None
+        try:
+            self.update_system_stats()
+        finally:
+            self.stats_timer = self.root.after(5000, self._stats_tick)
+    
+    def _set_stat(self, var, value):
+        """只在值變化時設置Tk變量，空閒時不觸發重繪"""
+        key = str(var)
+        if self.shown_stats.get(key) != value:
+            self.shown_stats[key] = value
+            var.set(value)
+    
+    def _set_stat_fg(self, widget, color):
+        """只在顏色變化時設置元件的前景色"""
+        key = (str(widget), "fg")
+        if self.shown_stats.get(key) != color:
+            self.shown_stats[key] = color
+            widget.config(fg=color)
 
     def reset_statistics(self):
         """重置統計數據"""
@@ -1334,7 +1326,7 @@ class ChronoHelper:
                 self.logger.log("已重置所有統計數據")
                 
                 # 顯示通知
-                self.status_var.set("統計數據已重置")
+                self.set_status("統計數據已重置")
         else:
             messagebox.showwarning("操作失敗", "無法重置統計數據，請確保系統正常運行", parent=self.root)
 
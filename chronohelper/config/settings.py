@@ -21,5 +21,27 @@ APP_SETTINGS = {
     "session_valid_time": 270,  # 會話有效時間（秒），默認4.5分鐘
     "enable_second_hop": False,  # 啟用第二躍點檢測（默認關閉）
     "hop_check_timeout": 10,      # 第二躍點檢測超時（秒）
-    "notification_duration": 5 # 通知顯示時間（秒）
+    "notification_duration": 5, # 通知顯示時間（秒）
+    "notification_max_visible": 3, # 同時顯示的通知窗口上限，相同標題的通知會合併
+    "notification_min_interval": 2, # 新通知窗口之間的平均最小間隔（秒），超出的排隊顯示
+    "accounts": [],              # 附加帳號列表，每項包含username、password和name
+    "max_session_workers": 4,    # 登入和會話維持的最大並行線程數
+    "max_sign_workers": 4,       # 同時執行簽到/簽退任務的最大線程數
+    "rate_limit_interval": 1.5,  # 同一主機請求的平均間隔（秒）
+    "rate_limit_burst": 2,       # 同一主機允許連續發出的請求數
+    "circuit_failure_threshold": 5, # 同一端點連續失敗多少次後暫停請求
+    "circuit_reset_timeout": 60, # 暫停請求後多久發送探測請求（秒）
+    "retry_policies": {          # 各操作的重試策略，total_budget為整個操作（含重新登入）的總時限（秒）
+        "sign_in": {"total_budget": 45, "max_attempts": 3, "max_attempt_timeout": 20},
+        "sign_out": {"total_budget": 60, "max_attempts": 3, "max_attempt_timeout": 30}
+    },
+    "cookie_probe_workers": 4,   # Cookie驗證探測的並行數
+    "cookie_probe_deadline": 15, # Cookie驗證探測的總時限（秒）
+    "http_transport": "http1",   # HTTP傳輸: http1 或 http2（需安裝 httpx[http2]）
+    "debug_logging": False,      # 記錄調試日誌（包括簽到/簽退響應內容預覽）
+    "task_renderer": "widgets",  # 任務卡片渲染方式: widgets（每張卡片一組元件）或 canvas（繪製在同一個Canvas上，更省資源）
+    "precision_firing": False,   # 精確觸發: 在預定時間的整分準時發送簽到/簽退請求
+    "fire_offset_seconds": 0,    # 精確觸發相對預定時間的偏移（秒，可為負數或小數）
+    "prewarm_seconds": 20,       # 精確觸發前多少秒預熱會話和連接
+    "server_time_sync": True     # 精確觸發按響應Date頭估計的伺服器時間對準預定時間
 }
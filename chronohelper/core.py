@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+ChronoHelper應用核心 - 不依賴任何界面庫
+"""
+
+import datetime
+
+from chronohelper.config.settings import APP_SETTINGS
+from chronohelper.utils.logger import Logger
+from chronohelper.utils.network import NetworkUtils
+from chronohelper.utils.file_handler import FileHandler
+from chronohelper.services.session_manager import SessionManager
+from chronohelper.services.task_service import TaskService
+
+class ChronoCore:
+    """應用核心，負責設定、任務、會話、網絡檢測和簽到/簽退流程
+
+    調度器只通過此類的接口與應用交互，因此既可以由Tk界面（ChronoHelper）繼承，
+    也可以在無界面的守護進程中直接使用。狀態文字、通知和警告默認只寫日誌，
+    界面子類覆蓋set_status、get_status、show_notification和show_warning以顯示在界面上。
+    """
+
+    def __init__(self, logger=None):
+        """初始化應用核心
+
+        Args:
+            logger: 日誌記錄器，默認創建新的Logger
+        """
+        self.logger = logger if logger is not None else Logger()
+        self.file_handler = FileHandler(self.logger)
+
+        # 載入設定
+        self.settings = self.file_handler.load_settings(APP_SETTINGS)
+        self.logger.set_debug(self.settings.get("debug_logging", False))
+
+        # 核心服務
+        self.network_utils = NetworkUtils(self.logger, self.settings)
+        self.session_manager = SessionManager(self.logger, self.settings)
+        self.session_manager.attach_state_store(self.file_handler)  # 恢復登入退避狀態
+        self.auth_service = self.session_manager.primary
+        self.task_service = TaskService(self.logger, self.auth_service, self.session_manager)
+
+        # 運行狀態
+        self.tasks = []
+        self.is_campus_network = False
+        self.current_ip = "未知"
+        self.last_network_log_time = None
+        self.last_network_log_status = None
+        self.status_text = ""
+
+        # 預先初始化執行統計結構，調度器創建後共用此字典
+        self.execution_stats = {
+            "total_executions": 0,
+            "successful_sign_ins": 0,
+            "successful_sign_outs": 0,
+            "failed_sign_ins": 0,
+            "failed_sign_outs": 0,
+            "last_success_time": None
+        }
+
+    def set_status(self, text):
+        """設置狀態文字
+
+        Args:
+            text: 狀態文字
+        """
+        self.status_text = text
+
+    def get_status(self):
+        """獲取目前的狀態文字"""
+        return self.status_text
+
+    def show_notification(self, title, message):
+        """發出通知，無界面時只記錄日誌"""
+        self.logger.log(f"通知: {title} - {message}")
+
+    def show_warning(self, title, message):
+        """顯示需要用戶注意的警告，無界面時不做額外處理（調用方已記錄日誌）"""
+
+    def load_tasks(self):
+        """載入任務列表"""
+        self.tasks = self.file_handler.load_tasks()
+
+        # 初始化任務的前一狀態，用於追蹤狀態變更
+        for task in self.tasks:
+            task._prev_sign_in_done = getattr(task, 'sign_in_done', False)
+            task._prev_sign_out_done = getattr(task, 'sign_out_done', False)
+
+        self.logger.log(f"已載入 {len(self.tasks)} 個任務")
+
+    def save_tasks(self, changed=None):
+        """保存任務列表
+
+        Args:
+            changed: 內容有變更的任務，None表示未知或多個任務（供界面只更新該任務）
+
+        Returns:
+            bool: 是否保存成功
+        """
+        if self.file_handler.save_tasks(self.tasks):
+            self.logger.log("任務已保存")
+            return True
+        return False
+
+    def load_cookies(self):
+        """載入保存的Cookies"""
+        cookies = self.file_handler.load_cookies()
+        if cookies:
+            self.auth_service.set_cookies(cookies)
+            self.logger.log("已載入保存的Cookie，正在背景驗證會話")
+
+        # 載入附加帳號的Cookie
+        account_cookies = self.file_handler.load_account_cookies()
+        if account_cookies:
+            self.session_manager.set_cookies_map(account_cookies)
+
+        # 以一次輕量驗證沿用仍然有效的會話，避免啟動時重新登入
+        if cookies or account_cookies:
+            self.session_manager.warm_start_all()
+
+    def save_cookies(self):
+        """保存當前會話的Cookies"""
+        cookies_list = self.auth_service.get_cookies_list()
+        if self.file_handler.save_cookies(cookies_list):
+            self.logger.log("已保存Cookie")
+
+        # 保存附加帳號的Cookie
+        if self.session_manager.list_accounts():
+            self.file_handler.save_account_cookies(self.session_manager.get_cookies_map())
+
+        # 保存會話元數據（最後驗證時間等），供下次啟動判斷是否沿用
+        self.session_manager.save_state()
+
+    def detect_network(self, verbose=True):
+        """清除緩存並檢測網絡環境
+
+        Args:
+            verbose: 是否輸出詳細日誌
+
+        Returns:
+            tuple: (是否校內網絡, IP地址, 躍點信息)
+        """
+        self.network_utils.clear_cache()  # 清除緩存，確保獲得新的檢測結果
+        is_campus, ip, hop_info = self.network_utils.check_campus_network(
+            verbose=verbose, wait_for_hop_check=True)
+        self.is_campus_network = is_campus
+        self.current_ip = ip
+        return is_campus, ip, hop_info
+
+    def reset_campus_restrictions(self):
+        """重置所有任務的環境限制狀態，返回重置的任務數量"""
+        reset_count = 0
+        for task in self.tasks:
+            if hasattr(task, 'campus_restricted') and task.campus_restricted:
+                task.campus_restricted = False
+                task.last_attempt_time = None
+                reset_count += 1
+
+        if reset_count > 0:
+            self.logger.log(f"已重置 {reset_count} 個任務的環境限制狀態")
+            self.save_tasks()
+
+        return reset_count
+
+    def _record_manual_result(self, key, success, from_scheduler):
+        """記錄手動觸發的操作結果，調度器觸發的操作由調度器自行計數
+
+        Args:
+            key: 統計鍵，如"successful_sign_ins"
+            success: 操作是否成功
+            from_scheduler: 是否由調度器觸發
+        """
+        scheduler = getattr(self, 'scheduler', None)
+        if from_scheduler or scheduler is None or not hasattr(scheduler, 'execution_stats'):
+            return
+        # 手動操作在請求隊列的後台線程完成，與調度器的工作線程並發，必須通過調度器的鎖更新
+        scheduler._increment_stat("total_executions")
+        if success:
+            scheduler._record_success(key)
+        else:
+            scheduler._increment_stat(key)
+
+    def perform_sign_in(self, task, from_scheduler=False, reserved=False, return_joined=False):
+        """執行簽到操作
+
+        同一任務的簽到正在進行時共用其結果，保存、統計、通知和狀態欄只由發起的調用處理。
+
+        Args:
+            task: 要執行的任務
+            from_scheduler: 是否由調度器自動執行
+            reserved: 是否已預約請求令牌（由界面排隊執行）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽到
+
+        Returns:
+            bool: 簽到是否成功；return_joined為True時返回(是否成功, 是否共用了他人的結果)
+        """
+        # 檢查網絡環境
+        if not self.is_campus_network:
+            self.logger.log(f"簽到失敗: 當前處於校外網絡環境，IP: {self.current_ip}")
+            if self.settings.get("global_notify", True) and task.notify:
+                self.show_notification(f"{task.name} 簽到失敗",
+                                       "您當前處於校外網絡環境，無法執行簽到操作\n請連接校內網絡後再試")
+            self.set_status("簽到需要校內網絡環境")
+            if from_scheduler:
+                # 在任務上標記環境限制，調度器不需要讀取可能被其他任務覆蓋的全局狀態
+                task.campus_restricted = True
+            return (False, False) if return_joined else False
+
+        # 調用任務服務執行簽到
+        result, joined = self.task_service.perform_sign_in(task, self.settings, reserved=reserved, return_joined=True)
+        if joined:
+            # 發起簽到的調用已處理保存、統計和通知，這裡只共用結果
+            return (result, True) if return_joined else result
+
+        if result:
+            # 更新任務狀態
+            task.sign_in_done = True
+            self.save_tasks(task)
+            self._record_manual_result("successful_sign_ins", True, from_scheduler)
+
+            # 顯示通知
+            if self.settings.get("global_notify", True) and task.notify:
+                self.show_notification(f"{task.name} 簽到成功",
+                                       f"已在 {datetime.datetime.now().strftime('%H:%M:%S')} 完成簽到")
+
+            self.set_status(f"已完成 '{task.name}' 的簽到")
+            return (True, False) if return_joined else True
+
+        self._record_manual_result("failed_sign_ins", False, from_scheduler)
+
+        # 如果任務有環境限制標記，保存狀態
+        if hasattr(task, 'campus_restricted') and task.campus_restricted:
+            self.save_tasks(task)
+
+        self.set_status(f"'{task.name}' 簽到失敗")
+        return (False, False) if return_joined else False
+
+    def perform_sign_out(self, task, from_scheduler=False, reserved=False, return_joined=False):
+        """執行簽退操作
+
+        同一任務的簽退正在進行時共用其結果，保存、統計、通知和狀態欄只由發起的調用處理。
+
+        Args:
+            task: 要執行的任務
+            from_scheduler: 是否由調度器自動執行
+            reserved: 是否已預約請求令牌（由界面排隊執行）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽退
+
+        Returns:
+            bool: 簽退是否成功；return_joined為True時返回(是否成功, 是否共用了他人的結果)
+        """
+        # 檢查網絡環境
+        if not self.is_campus_network:
+            self.logger.log(f"簽退失敗: 當前處於校外網絡環境，IP: {self.current_ip}")
+            if self.settings.get("global_notify", True) and task.notify:
+                self.show_notification(f"{task.name} 簽退失敗",
+                                       "您當前處於校外網絡環境，無法執行簽退操作\n請連接校內網絡後再試")
+            self.set_status("簽退需要校內網絡環境")
+            if from_scheduler:
+                # 在任務上標記環境限制，調度器不需要讀取可能被其他任務覆蓋的全局狀態
+                task.campus_restricted = True
+            return (False, False) if return_joined else False
+
+        # 調用任務服務執行簽退
+        result, joined = self.task_service.perform_sign_out(task, self.settings, reserved=reserved, return_joined=True)
+        if joined:
+            # 發起簽退的調用已處理保存、統計和通知，這裡只共用結果
+            return (result, True) if return_joined else result
+
+        if result:
+            # 更新任務狀態
+            task.sign_out_done = True
+            self.save_tasks(task)
+            self._record_manual_result("successful_sign_outs", True, from_scheduler)
+
+            # 顯示通知
+            if self.settings.get("global_notify", True) and task.notify:
+                self.show_notification(f"{task.name} 簽退成功",
+                                       f"已在 {datetime.datetime.now().strftime('%H:%M:%S')} 完成簽退")
+
+            # 特殊處理：檢查工作時間不足的情況
+            self.check_work_time(task)
+
+            self.set_status(f"已完成 '{task.name}' 的簽退")
+            return (True, False) if return_joined else True
+
+        self._record_manual_result("failed_sign_outs", False, from_scheduler)
+
+        # 如果任務有環境限制標記，保存狀態
+        if hasattr(task, 'campus_restricted') and task.campus_restricted:
+            self.save_tasks(task)
+
+        self.set_status(f"'{task.name}' 簽退失敗")
+        return (False, False) if return_joined else False
+
+    def check_work_time(self, task):
+        """檢查工作時間是否足夠"""
+        if task.sign_in_done and task.sign_in_time:
+            try:
+                # 解析簽到時間
+                sign_in_parts = task.sign_in_time.split(":")
+                now = datetime.datetime.now()
+
+                # 構建今天的簽到時間和當前時間對象
+                sign_in_time = datetime.datetime(
+                    now.year, now.month, now.day,
+                    int(sign_in_parts[0]), int(sign_in_parts[1])
+                )
+
+                # 計算時間差
+                minutes = (now - sign_in_time).total_seconds() / 60
+
+                if minutes < 30:
+                    warning_msg = (
+                        f"注意：您的工作時間僅為 {int(minutes)} 分鐘，不足30分鐘。\n\n"
+                        "根據系統規則，不足30分鐘的工讀時數將不列入計算。\n"
+                        "請確保您的工作時間達到學校規定的最低要求。"
+                    )
+                    self.logger.log(f"警告: 工作時間不足30分鐘 ({int(minutes)}分鐘)")
+                    self.show_warning("工作時間不足", warning_msg)
+            except Exception as e:
+                self.logger.log(f"計算工作時間時出錯: {str(e)}")
+
+    def shutdown(self):
+        """停止調度器和網絡檢測，保存狀態並釋放連接"""
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler is not None:
+            scheduler.stop()
+            self.logger.log("調度器已停止")
+
+        # 停止所有網絡檢測操作
+        self.network_utils.shutdown()
+
+        # 保存所有設定和任務
+        self.save_cookies()
+        self.file_handler.save_settings(self.settings)
+        self.file_handler.save_tasks(self.tasks)
+        self.logger.log("設定和任務已保存")
+
+        # 關閉會話管理器的線程池和連接池
+        self.session_manager.shutdown()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+無界面守護進程 - 在沒有顯示器的伺服器上運行網絡檢測、會話維持和任務調度
+
+此模塊及其依賴都不導入tkinter。
+"""
+
+import signal
+import threading
+
+from chronohelper.core import ChronoCore
+from chronohelper.utils.logger import Logger
+from chronohelper.services.scheduler import SchedulerService
+
+class ChronoDaemon(ChronoCore):
+    """以守護進程方式運行的應用核心，日誌同時輸出到標準輸出"""
+
+    def __init__(self):
+        super().__init__(Logger(console=True))
+        self.stop_event = threading.Event()
+        self.scheduler = None
+
+    def set_status(self, text):
+        """狀態變化時寫入日誌，代替界面上的狀態欄"""
+        if text != self.status_text:
+            self.logger.log(f"狀態: {text}")
+        super().set_status(text)
+
+    def start(self):
+        """載入任務和會話，完成初始網絡檢測後啟動調度器"""
+        self.logger.log("ChronoHelper 以守護進程模式啟動")
+        self.load_tasks()
+        self.load_cookies()
+
+        self.logger.log("進行初始網絡環境檢測...")
+        is_campus, ip, _ = self.detect_network(verbose=True)
+        self.set_status("校內網絡環境，任務執行中" if is_campus else "校外網絡環境，任務已暫停")
+        self.logger.log(f"當前IP: {ip}")
+
+        # 守護進程沒有手動啟動的入口，忽略auto_start設定
+        self.scheduler = SchedulerService(self)
+        self.scheduler.execution_stats = self.execution_stats
+        self.scheduler.start()
+
+    def request_stop(self, *args):
+        """請求停止，可直接作為信號處理函數"""
+        self.stop_event.set()
+
+    def run(self):
+        """運行直到收到SIGINT或SIGTERM
+
+        Returns:
+            int: 進程退出碼
+        """
+        signal.signal(signal.SIGINT, self.request_stop)
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, self.request_stop)
+
+        try:
+            self.start()
+            # 定期保存Cookie，進程被強制結束時也不會丟失太多會話狀態
+            while not self.stop_event.wait(600):
+                self.save_cookies()
+        except Exception as e:
+            self.logger.log(f"守護進程運行錯誤: {str(e)}")
+            return 1
+        finally:
+            self.logger.log("正在停止守護進程...")
+            self.shutdown()
+            self.logger.log("ChronoHelper 守護進程已停止")
+        return 0
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+登入退避狀態模型
+"""
+
+import random
+import time
+
+class LoginBackoff:
+    """登入退避狀態機，記錄連續失敗次數和鎖定時間
+
+    連續失敗達到閾值後進入鎖定，鎖定時間按失敗次數指數增長並加入隨機抖動，
+    避免多個實例在同一時間點重新嘗試。鎖定時間使用Unix時間戳，以便持久化後
+    在程式重啟時繼續生效。
+    """
+
+    def __init__(self, threshold=3, base_seconds=60, max_seconds=1800, jitter=0.2):
+        """初始化退避狀態
+
+        Args:
+            threshold: 觸發鎖定的連續失敗次數
+            base_seconds: 首次鎖定的基礎時間（秒）
+            max_seconds: 鎖定時間上限（秒）
+            jitter: 隨機抖動比例，0.2表示±20%
+        """
+        self.threshold = threshold
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.jitter = jitter
+        self.failures = 0
+        self.lock_until = 0.0  # 鎖定截止的Unix時間戳，0表示未鎖定
+        self.last_failure = None  # 最近一次失敗的Unix時間戳
+
+    def record_failure(self):
+        """記錄一次登入失敗
+
+        Returns:
+            float: 本次觸發的鎖定秒數，未觸發鎖定時為0
+        """
+        self.failures += 1
+        self.last_failure = time.time()
+
+        if self.failures < self.threshold:
+            return 0
+
+        # 按失敗次數計算鎖定時間，指數增長並加入抖動
+        window = min(self.base_seconds * (2 ** (self.failures - self.threshold)), self.max_seconds)
+        window *= 1 + random.uniform(-self.jitter, self.jitter)
+        self.lock_until = self.last_failure + window
+        return window
+
+    def record_success(self):
+        """登入成功後重置狀態"""
+        self.failures = 0
+        self.lock_until = 0.0
+
+    def is_locked(self, now=None):
+        """檢查是否處於鎖定狀態
+
+        Args:
+            now: 當前Unix時間戳，默認為time.time()
+
+        Returns:
+            bool: 是否鎖定中
+        """
+        return self.remaining(now) > 0
+
+    def remaining(self, now=None):
+        """獲取剩餘鎖定秒數
+
+        Args:
+            now: 當前Unix時間戳，默認為time.time()
+
+        Returns:
+            float: 剩餘鎖定秒數，未鎖定時為0
+        """
+        now = time.time() if now is None else now
+        return max(0.0, self.lock_until - now)
+
+    def to_dict(self):
+        """將狀態轉換為字典格式以便序列化"""
+        return {
+            'failures': self.failures,
+            'lock_until': self.lock_until,
+            'last_failure': self.last_failure
+        }
+
+    def load_dict(self, data):
+        """從字典恢復狀態
+
+        Args:
+            data: to_dict產生的字典
+        """
+        self.failures = int(data.get('failures', 0))
+        self.lock_until = float(data.get('lock_until', 0.0) or 0.0)
+        self.last_failure = data.get('last_failure', None)
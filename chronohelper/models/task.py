@@ -8,13 +8,14 @@ import uuid
 class Task:
     """任務類，表示一個簽到/簽退任務"""
     
-    def __init__(self, name, date, sign_in_time, sign_out_time, notify=True, task_id=None):
+    def __init__(self, name, date, sign_in_time, sign_out_time, notify=True, task_id=None, account=""):
         self.id = task_id if task_id else str(uuid.uuid4())
         self.name = name
         self.date = date  # 格式: YYYY-MM-DD
         self.sign_in_time = sign_in_time  # 格式: HH:MM
         self.sign_out_time = sign_out_time  # 格式: HH:MM
         self.notify = notify
+        self.account = account  # 所屬帳號，空字串表示使用主帳號
         self.sign_in_done = False
         self.sign_out_done = False
         # 新增屬性用於記錄環境限制狀態
@@ -30,6 +31,7 @@ class Task:
             'sign_in_time': self.sign_in_time,
             'sign_out_time': self.sign_out_time,
             'notify': self.notify,
+            'account': getattr(self, 'account', ''),
             'sign_in_done': self.sign_in_done,
             'sign_out_done': self.sign_out_done,
             'campus_restricted': getattr(self, 'campus_restricted', False),
@@ -45,7 +47,8 @@ class Task:
             sign_in_time=data['sign_in_time'],
             sign_out_time=data['sign_out_time'],
             notify=data.get('notify', True),
-            task_id=data['id']
+            task_id=data['id'],
+            account=data.get('account', '')
         )
         task.sign_in_done = data.get('sign_in_done', False)
         task.sign_out_done = data.get('sign_out_done', False)
@@ -4,29 +4,64 @@
 """
 
 import datetime
+import random
 import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from requests.exceptions import RequestException
+from chronohelper.models.login_backoff import LoginBackoff
+from chronohelper.utils.transport import RequestsTransport
+from chronohelper.utils.rate_limiter import RateLimiter
+from chronohelper.utils.server_clock import ServerClock
+from chronohelper.services.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
 
 class AuthService:
     """認證服務，處理系統登入和會話維護"""
     
-    def __init__(self, logger):
+    # 會話標識類cookie名稱
+    SESSION_COOKIE_NAMES = ('PHPSESSID', 'SESSION', 'JSESSIONID')
+    # 持久化cookie時保存的欄位
+    COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'expires', 'secure')
+    # cookie驗證探測的預設並行數
+    PROBE_WORKERS = 4
+    
+    def __init__(self, logger, adapter=None, transport=None, rate_limiter=None, breakers=None, server_clock=None):
         """初始化認證服務
         
         Args:
             logger: 日誌記錄器
+            adapter: 共用的HTTPAdapter，多帳號時由SessionManager傳入以共用連接池
+            transport: 創建會話的傳輸層，默認為基於requests的HTTP/1.1
+            rate_limiter: 按主機限制請求頻率的限制器，多帳號時共用同一個
+            breakers: 按端點劃分的斷路器註冊表，多帳號時共用同一個
+            server_clock: 伺服器時鐘偏移估計，多帳號時共用同一個
         """
         self.logger = logger
-        self.session = requests.Session()
-        self.session.verify = False  
+        self.adapter = adapter
+        self.transport = transport if transport is not None else RequestsTransport(adapter)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.breakers = breakers if breakers is not None else CircuitBreakerRegistry(logger=logger)
+        self.server_clock = server_clock if server_clock is not None else ServerClock()
+        self._probe_adapter = None  # 未共用adapter時，cookie探測自建的連接池
+        self.session = self._new_session()
+        self.login_lock = threading.RLock()  # 同一帳號的登入操作互斥
         self.login_status = False
         self.last_login_time = None
-        self.consecutive_failures = 0  # 追蹤連續登入失敗次數
-        self.login_lock_until = None  # 登入鎖定直到某時間點
+        self.backoff = LoginBackoff()  # 連續登入失敗的退避狀態
+        self.on_state_change = None  # 登入狀態變更時的回調，用於持久化
         self.important_cookies = []  # 儲存重要的cookie名稱
         
+        # 會話元數據（Unix時間戳），隨Cookie一起持久化以便啟動時判斷會話是否可沿用
+        self.session_started = None  # 會話建立（登入）時間
+        self.last_verified = None  # 最近一次確認會話有效的時間
+        self.learned_validity = 0  # 觀察到的會話仍有效的最長閒置秒數
+        self.learned_expiry = None  # 觀察到的會話已失效的最短閒置秒數
+        
         # 設置標準請求頭部
         self.standard_headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Gecko/20100101 Firefox/137.0",
@@ -37,19 +72,210 @@ class AuthService:
             "Upgrade-Insecure-Requests": "1"
         }
     
-    def login(self, settings, force=False):
+    def send(self, method, url, session=None, throttle=True, **kwargs):
+        """經過斷路器和請求頻率限制發送請求
+        
+        響應的Date頭會順帶用於估計伺服器時鐘偏移，不產生額外請求。
+        
+        Args:
+            method: HTTP方法
+            url: 請求URL
+            session: 使用的會話，默認為當前會話
+            throttle: 是否需要取得請求令牌，調用方已預約時傳入False
+            **kwargs: 傳給會話請求方法的參數
+            
+        Returns:
+            Response: 響應對象
+            
+        Raises:
+            CircuitOpenError: 該端點的斷路器處於斷開狀態
+            RequestException: 請求失敗
+        """
+        breaker = self.breakers.before_request(url)
+        try:
+            if throttle:
+                waited = self.rate_limiter.acquire(url)
+                if waited > 0.5:
+                    self.logger.log(f"控制請求頻率，已排隊 {waited:.2f} 秒")
+            sent_at = time.time()
+            response = (session or self.session).request(method, url, **kwargs)
+            received_at = time.time()
+        except Exception:
+            self.breakers.record(breaker, False)
+            raise
+        self.server_clock.observe(response.headers.get("Date"), sent_at, received_at)
+        # 伺服器錯誤計為端點故障，其他響應說明服務可用
+        self.breakers.record(breaker, response.status_code < 500)
+        return response
+    
+    def _new_session(self):
+        """通過傳輸層創建新的會話
+        
+        Returns:
+            Session: requests.Session或接口兼容的會話實例
+        """
+        return self.transport.new_session()
+    
+    @property
+    def consecutive_failures(self):
+        """連續登入失敗次數"""
+        return self.backoff.failures
+    
+    @property
+    def login_lock_until(self):
+        """登入鎖定截止時間，未鎖定時為None"""
+        if not self.backoff.is_locked():
+            return None
+        return datetime.datetime.fromtimestamp(self.backoff.lock_until)
+    
+    def is_login_locked(self):
+        """檢查登入是否處於鎖定狀態
+        
+        Returns:
+            bool: 是否鎖定中
+        """
+        return self.backoff.is_locked()
+    
+    def get_backoff_state(self):
+        """獲取退避狀態，供UI顯示和持久化
+        
+        Returns:
+            dict: 包含failures、lock_until、last_failure和remaining的字典
+        """
+        state = self.backoff.to_dict()
+        state['remaining'] = self.backoff.remaining()
+        return state
+    
+    def restore_backoff_state(self, state):
+        """從保存的資料恢復退避狀態
+        
+        Args:
+            state: get_backoff_state或LoginBackoff.to_dict產生的字典
+        """
+        if not state:
+            return
+        self.backoff.load_dict(state)
+        if self.backoff.is_locked():
+            self.logger.log(f"登入仍處於鎖定狀態，剩餘 {int(self.backoff.remaining())} 秒")
+    
+    def _notify_state_change(self):
+        """通知退避狀態已變更"""
+        if self.on_state_change:
+            try:
+                self.on_state_change(self)
+            except Exception as e:
+                self.logger.log(f"保存登入狀態時出錯: {str(e)}")
+    
+    def _record_login_success(self):
+        """登入成功後重置退避狀態並記錄會話建立時間"""
+        self.backoff.record_success()
+        self.session_started = self.last_verified = time.time()
+        self._notify_state_change()
+    
+    def _record_session_check(self, alive):
+        """根據會話驗證結果學習會話的有效閒置時間
+        
+        Args:
+            alive: 會話是否仍然有效
+        """
+        now = time.time()
+        if self.last_verified:
+            idle = now - self.last_verified
+            if alive and idle > self.learned_validity:
+                self.learned_validity = idle
+                # 有效的觀察推翻了更短的失效觀察
+                if self.learned_expiry is not None and self.learned_expiry <= idle:
+                    self.learned_expiry = None
+            elif not alive and idle > self.learned_validity:
+                if self.learned_expiry is None or idle < self.learned_expiry:
+                    self.learned_expiry = idle
+        if alive:
+            self.last_verified = now
+    
+    def get_session_meta(self):
+        """獲取會話元數據，用於持久化
+        
+        Returns:
+            dict: 會話元數據字典
+        """
+        return {
+            'session_started': self.session_started,
+            'last_verified': self.last_verified,
+            'learned_validity': self.learned_validity,
+            'learned_expiry': self.learned_expiry
+        }
+    
+    def restore_session_meta(self, meta):
+        """從保存的資料恢復會話元數據
+        
+        Args:
+            meta: get_session_meta產生的字典
+        """
+        if not meta:
+            return
+        self.session_started = meta.get('session_started')
+        self.last_verified = meta.get('last_verified')
+        self.learned_validity = meta.get('learned_validity', 0) or 0
+        self.learned_expiry = meta.get('learned_expiry')
+    
+    def warm_start(self, settings):
+        """啟動時以一次輕量驗證沿用保存的會話，避免重新提交帳號密碼
+        
+        Cookie缺失或已過期，或閒置時間已超過觀察到的失效時間時不發送請求
+        
+        Args:
+            settings: 設定字典
+            
+        Returns:
+            bool: 是否成功沿用保存的會話
+        """
+        with self.login_lock:
+            if self.login_status:
+                return True
+            
+            current_cookies = {cookie.name for cookie in self.session.cookies}
+            if not current_cookies or any(name not in current_cookies for name in self.important_cookies):
+                return False
+            
+            if self.last_verified and self.learned_expiry is not None:
+                idle = time.time() - self.last_verified
+                if idle >= self.learned_expiry:
+                    self.logger.log(f"保存的會話已閒置 {int(idle)} 秒，超過觀察到的失效時間，跳過沿用")
+                    return False
+            
+            if not self.verify_session(settings):
+                self.logger.log("保存的會話已失效，將在需要時重新登入")
+                return False
+            
+            self.login_status = True
+            self.last_login_time = datetime.datetime.now()
+            if not self.session_started:
+                self.session_started = self.last_verified
+            self.logger.log("已沿用保存的會話，無需重新登入")
+            self._notify_state_change()
+            return True
+    
+    def login(self, settings, force=False, timeout=None):
         """登入大葉大學系統並獲取Cookie
         
+        同一帳號的登入請求會被串行化，避免多個線程同時送出帳號密碼
+        
         Args:
             settings: 包含登入信息的設定字典
             force: 是否強制重新登入，即使Cookie可能還有效
+            timeout: 每個請求的超時上限（秒），由調用方的重試預算決定，默認30秒
             
         Returns:
             bool: 登入是否成功
         """
+        with self.login_lock:
+            return self._login(settings, force, timeout)
+    
+    def _login(self, settings, force=False, timeout=None):
+        """登入的實際流程，調用前需持有login_lock"""
         # 檢查是否處於登入鎖定狀態
-        if self.login_lock_until and datetime.datetime.now() < self.login_lock_until:
-            lock_remaining = (self.login_lock_until - datetime.datetime.now()).total_seconds()
+        if self.backoff.is_locked():
+            lock_remaining = self.backoff.remaining()
             self.logger.log(f"登入暫時鎖定中，請等待 {int(lock_remaining)} 秒後再試")
             return False
             
@@ -60,7 +286,7 @@ class AuthService:
                 elapsed = (datetime.datetime.now() - self.last_login_time).total_seconds()
                 if elapsed < login_valid_time:
                     self.logger.log("使用現有會話，無需重新登入")
-                    return self.verify_session(settings)  # 快速驗證會話是否真的有效
+                    return self.verify_session(settings, timeout=timeout)  # 快速驗證會話是否真的有效
         
         # 從設定中獲取登入信息
         login_url = settings.get("login_url", "https://adm_acc.dyu.edu.tw/entrance/save_id.php")
@@ -72,12 +298,13 @@ class AuthService:
             self.logger.log("登入信息不完整，請在設定中配置用戶名和密碼")
             return False
         
+        request_timeout = min(30, timeout) if timeout else 30
+        
         try:
             self.logger.log(f"嘗試登入大葉大學系統")
             
             # 清除現有會話
-            self.session = requests.Session()
-            self.session.verify = False
+            self.session = self._new_session()
             
             # 設置標準請求頭
             for key, value in self.standard_headers.items():
@@ -89,7 +316,7 @@ class AuthService:
                 pre_login_headers = self.standard_headers.copy()
                 
                 self.logger.log(f"正在獲取登入頁面以初始化cookies...")
-                pre_login_response = self.session.get(pre_login_url, headers=pre_login_headers, timeout=30)
+                pre_login_response = self.send("GET", pre_login_url, headers=pre_login_headers, timeout=request_timeout)
                 self.logger.log(f"獲取登入頁面: 狀態碼 {pre_login_response.status_code}")
                 
                 # 記錄獲取到的初始cookies
@@ -98,10 +325,12 @@ class AuthService:
                     self.logger.log(f"已獲取初始cookies: {', '.join(initial_cookies.keys())}")
                     # 記錄重要的cookie (如PHPSESSID)
                     for cookie_name in initial_cookies.keys():
-                        if cookie_name.upper() in ['PHPSESSID', 'SESSION', 'JSESSIONID']:
+                        if cookie_name.upper() in self.SESSION_COOKIE_NAMES:
                             self.important_cookies.append(cookie_name)
                             self.logger.log(f"識別到重要cookie: {cookie_name}")
                 
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 self.logger.log(f"獲取登入頁面時出錯 (非致命): {str(e)}")
                 # 繼續執行，這不是致命錯誤
@@ -123,7 +352,7 @@ class AuthService:
             })
             
             # 發送登入請求
-            response = self.session.post(login_url, data=login_data, headers=headers, timeout=30)
+            response = self.send("POST", login_url, data=login_data, headers=headers, timeout=request_timeout)
             
             # 記錄響應狀態和cookies（用於調試）
             self.logger.log(f"登入響應: 狀態碼 {response.status_code}")
@@ -164,10 +393,10 @@ class AuthService:
                         # 無論是否比對一致，都認為登入成功
                         self.login_status = True
                         self.last_login_time = datetime.datetime.now()
-                        self.consecutive_failures = 0  # 重置失敗計數
+                        self._record_login_success()  # 重置失敗計數
                         
                         # 確認登入後訪問主頁面，驗證會話有效性並獲取額外cookies
-                        self._confirm_login(settings)
+                        self._confirm_login(settings, timeout)
                         
                         return True
                     else:
@@ -189,10 +418,10 @@ class AuthService:
                         # 假設登入成功，但格式已變更
                         self.login_status = True
                         self.last_login_time = datetime.datetime.now()
-                        self.consecutive_failures = 0  # 重置失敗計數
+                        self._record_login_success()  # 重置失敗計數
                         
                         # 確認登入
-                        self._confirm_login(settings)
+                        self._confirm_login(settings, timeout)
                         
                         return True
                 else:
@@ -219,8 +448,8 @@ class AuthService:
                         self.logger.log("登入可能成功 (cookies增加)，但無法確認用戶名")
                         self.login_status = True
                         self.last_login_time = datetime.datetime.now()
-                        self.consecutive_failures = 0
-                        self._confirm_login(settings)
+                        self._record_login_success()
+                        self._confirm_login(settings, timeout)
                         return True
                     
                     self.logger.log("無法確認登入狀態，請檢查網頁結構是否已變更")
@@ -231,6 +460,10 @@ class AuthService:
                 self._handle_login_failure()
                 return False
         
+        except CircuitOpenError as e:
+            # 服務不可用不是帳號問題，不計入登入失敗
+            self.logger.log(f"登入已跳過: {str(e)}")
+            return False
         except RequestException as e:
             self.logger.log(f"登入過程中發生網絡錯誤: {str(e)}")
             self._handle_login_failure()
@@ -244,16 +477,17 @@ class AuthService:
     
     def _handle_login_failure(self):
         """處理登入失敗的情況，實現指數退避策略"""
-        self.consecutive_failures += 1
         self.login_status = False
         
-        if self.consecutive_failures >= 3:
-            # 按失敗次數計算鎖定時間，指數增長
-            lockout_seconds = min(60 * (2 ** (self.consecutive_failures - 3)), 1800)  # 最長30分鐘
-            self.login_lock_until = datetime.datetime.now() + datetime.timedelta(seconds=lockout_seconds)
-            self.logger.log(f"因連續 {self.consecutive_failures} 次登入失敗，已暫時鎖定登入功能 {lockout_seconds} 秒")
+        # 按失敗次數計算鎖定時間，指數增長並加入抖動，最長30分鐘
+        lockout_seconds = self.backoff.record_failure()
+        if lockout_seconds:
+            self.logger.log(f"因連續 {self.backoff.failures} 次登入失敗，已暫時鎖定登入功能 {int(lockout_seconds)} 秒")
+        
+        # 持久化狀態，重啟後鎖定依然有效
+        self._notify_state_change()
     
-    def _confirm_login(self, settings):
+    def _confirm_login(self, settings, timeout=None):
         """確認登入成功並獲取額外必要的cookies"""
         try:
             # 訪問首頁或儀表板以確認登入狀態
@@ -263,7 +497,7 @@ class AuthService:
             headers = self.standard_headers.copy()
             headers["Referer"] = settings.get("login_url", "https://adm_acc.dyu.edu.tw/entrance/save_id.php")
             
-            response = self.session.get(dashboard_url, headers=headers, timeout=10)
+            response = self.send("GET", dashboard_url, headers=headers, timeout=min(10, timeout) if timeout else 10)
             
             if response.status_code == 200:
                 self.logger.log("成功訪問首頁，確認登入狀態")
@@ -286,15 +520,23 @@ class AuthService:
         except Exception as e:
             self.logger.log(f"確認登入時出錯 (非致命): {str(e)}")
     
-    def verify_session(self, settings):
+    def verify_session(self, settings, timeout=None):
         """快速驗證當前會話是否有效
         
         Args:
             settings: 設定字典
+            timeout: 請求超時上限（秒），默認10秒
         
         Returns:
             bool: 會話是否有效
         """
+        valid = self._check_session_page(settings, timeout)
+        if valid:
+            self._record_session_check(True)
+        return valid
+    
+    def _check_session_page(self, settings, timeout=None):
+        """訪問需要登入的頁面判斷會話狀態，由verify_session調用"""
         try:
             # 檢查重要cookie是否存在
             current_cookies = {cookie.name: cookie.value for cookie in self.session.cookies}
@@ -310,13 +552,14 @@ class AuthService:
             # 使用標準頭部
             headers = self.standard_headers.copy()
             
-            response = self.session.get(verify_url, headers=headers, timeout=10)
+            response = self.send("GET", verify_url, headers=headers, timeout=min(10, timeout) if timeout else 10)
             
             if response.status_code == 200:
                 # 檢查頁面內容，確認是否需要登入
                 if "<form name=\"dyulogin\"" in response.text or "login_id" in response.text and "login_pwd" in response.text:
                     self.logger.log("會話已失效: 發現登入表單")
                     self.login_status = False
+                    self._record_session_check(False)
                     return False
                 elif "登出</a>" in response.text and "您好" in response.text:
                     return True
@@ -344,11 +587,12 @@ class AuthService:
             self.logger.log(f"驗證會話時出錯: {str(e)}")
             return False
     
-    def keep_session_alive(self, settings):
+    def keep_session_alive(self, settings, timeout=None):
         """定期刷新會話以保持登入狀態
         
         Args:
             settings: 包含會話設定的字典
+            timeout: 每個請求的超時上限（秒），由調用方的時間預算決定，默認不額外限制
             
         Returns:
             bool: 會話是否仍然有效
@@ -367,9 +611,9 @@ class AuthService:
                     self.logger.log("會話即將過期，正在刷新...")
                     
                     # 快速驗證會話
-                    if not self.verify_session(settings):
+                    if not self.verify_session(settings, timeout=timeout):
                         self.logger.log("會話驗證失敗，需要重新登入")
-                        return self.login(settings, force=True)
+                        return self.login(settings, force=True, timeout=timeout)
                     
                     # 使用API基礎URL刷新會話
                     refresh_url = settings.get("api_url", "https://adm_acc.dyu.edu.tw/entrance/index.php")
@@ -378,7 +622,7 @@ class AuthService:
                     headers = self.standard_headers.copy()
                     
                     # 嘗試訪問API基礎URL刷新會話
-                    response = self.session.get(refresh_url, headers=headers, timeout=10)
+                    response = self.send("GET", refresh_url, headers=headers, timeout=min(10, timeout) if timeout else 10)
                     
                     if response.status_code == 200:
                         # 檢查頁面內容確認登入狀態維持
@@ -391,18 +635,18 @@ class AuthService:
                         elif "<form name=\"dyulogin\"" in response.text or "login_id" in response.text and "login_pwd" in response.text:
                             self.logger.log("會話已過期，需要重新登入")
                             self.login_status = False
-                            return self.login(settings, force=True)
+                            return self.login(settings, force=True, timeout=timeout)
                         # 檢查是否有密碼錯誤信息，表示會話已失效
                         elif "密碼不得為空" in response.text or "帳號不得為空" in response.text:
                             self.logger.log("會話已過期，需要重新登入")
                             self.login_status = False
-                            return self.login(settings, force=True)
+                            return self.login(settings, force=True, timeout=timeout)
                         else:
                             # 如果無法確定，嘗試檢查其他特徵
                             if "ispass = \"\"" in response.text:  # 未登入狀態特徵
                                 self.logger.log("檢測到未登入狀態特徵，需要重新登入")
                                 self.login_status = False
-                                return self.login(settings, force=True)
+                                return self.login(settings, force=True, timeout=timeout)
                             elif "ispass = \"t\"" in response.text:  # 已登入狀態特徵
                                 self.last_login_time = datetime.datetime.now()
                                 self.logger.log("檢測到已登入狀態特徵，會話已成功刷新")
@@ -432,43 +676,44 @@ class AuthService:
                                 else:
                                     self.logger.log("重要cookie已丟失，需要重新登入")
                                     self.login_status = False
-                                    return self.login(settings, force=True)
+                                    return self.login(settings, force=True, timeout=timeout)
 
                     else:
                         self.logger.log(f"刷新會話失敗，狀態碼: {response.status_code}，將在下次檢查時重新登入")
                         self.login_status = False
-                        return self.login(settings, force=True)
+                        return self.login(settings, force=True, timeout=timeout)
                 
                 # 如果超過有效期，標記為失效
                 if elapsed >= valid_time:
                     self.logger.log("會話已超過有效期，標記為失效")
                     self.login_status = False
-                    return self.login(settings, force=True)
+                    return self.login(settings, force=True, timeout=timeout)
                     
                 # 如果在正常的刷新間隔內，會話還有效
                 return True
             
             # 未登入，嘗試登入
             self.logger.log("未檢測到活動會話，嘗試登入")
-            return self.login(settings)
+            return self.login(settings, timeout=timeout)
             
         except Exception as e:
             self.logger.log(f"刷新會話時出錯: {str(e)}")
             self.login_status = False
-            return self.login(settings, force=True)
+            return self.login(settings, force=True, timeout=timeout)
     
-    def ensure_login(self, settings):
+    def ensure_login(self, settings, timeout=None):
         """確保用戶已登入，必要時重新登入
         
         Args:
             settings: 包含登入信息的設定字典
+            timeout: 驗證、刷新和登入中每個請求的超時上限（秒），由調用方的時間預算決定
             
         Returns:
             bool: 是否成功確保登入狀態
         """
         # 如果未登入或登入已過期，則執行登入
         if not self.login_status:
-            return self.login(settings)
+            return self.login(settings, timeout=timeout)
         
         # 檢查登入狀態是否過期
         if self.last_login_time:
@@ -478,12 +723,12 @@ class AuthService:
             
             if elapsed >= valid_time * 0.8:  # 如果已過80%的有效期，提前刷新
                 self.logger.log("會話接近過期，主動刷新")
-                return self.keep_session_alive(settings)
+                return self.keep_session_alive(settings, timeout=timeout)
             
             # 如果真的過期了
             if elapsed >= valid_time:
                 self.logger.log("會話可能已過期，重新登入")
-                return self.login(settings, force=True)
+                return self.login(settings, force=True, timeout=timeout)
             
             # 還在有效期內，進行快速驗證
             if elapsed >= valid_time * 0.5:  # 超過一半的有效期，進行驗證
@@ -492,13 +737,13 @@ class AuthService:
                 for cookie_name in self.important_cookies:
                     if cookie_name not in current_cookies:
                         self.logger.log(f"會話驗證失敗: 缺少重要cookie {cookie_name}")
-                        return self.login(settings, force=True)
+                        return self.login(settings, force=True, timeout=timeout)
                 
                 # 只有在cookie檢查不夠時才進行完整驗證
                 if not self.important_cookies or elapsed >= valid_time * 0.7:
-                    if not self.verify_session(settings):
+                    if not self.verify_session(settings, timeout=timeout):
                         self.logger.log("會話驗證失敗，重新登入")
-                        return self.login(settings, force=True)
+                        return self.login(settings, force=True, timeout=timeout)
         
         return True
     
@@ -506,7 +751,7 @@ class AuthService:
         """獲取當前會話
         
         Returns:
-            Session: 當前的requests.Session實例
+            Session: 當前的會話實例，類型取決於傳輸層設定
         """
         # 更新會話的標準頭部
         for key, value in self.standard_headers.items():
@@ -526,12 +771,14 @@ class AuthService:
                 'name': cookie.name,
                 'value': cookie.value,
                 'domain': cookie.domain,
-                'path': cookie.path
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': cookie.secure
             }
             cookies_list.append(cookie_dict)
             
             # 記錄重要cookie
-            if cookie.name.upper() in ['PHPSESSID', 'SESSION', 'JSESSIONID'] and cookie.name not in self.important_cookies:
+            if cookie.name.upper() in self.SESSION_COOKIE_NAMES and cookie.name not in self.important_cookies:
                 self.important_cookies.append(cookie.name)
                 
         return cookies_list
@@ -544,12 +791,19 @@ class AuthService:
         """
         # 重置重要cookie列表
         self.important_cookies = []
+        now = time.time()
         
         for cookie_dict in cookies:
-            self.session.cookies.set(**cookie_dict)
+            # 跳過已過期的cookie
+            expires = cookie_dict.get('expires')
+            if expires and expires <= now:
+                self.logger.log(f"保存的cookie {cookie_dict['name']} 已過期，已忽略")
+                continue
+            
+            self.session.cookies.set(**{key: value for key, value in cookie_dict.items() if key in self.COOKIE_FIELDS})
             
             # 檢測重要cookie
-            if cookie_dict['name'].upper() in ['PHPSESSID', 'SESSION', 'JSESSIONID']:
+            if cookie_dict['name'].upper() in self.SESSION_COOKIE_NAMES:
                 self.important_cookies.append(cookie_dict['name'])
                 self.logger.log(f"從保存的cookie中識別到重要cookie: {cookie_dict['name']}")
         
@@ -561,9 +815,57 @@ class AuthService:
         for key, value in self.standard_headers.items():
             self.session.headers[key] = value
 
+    def _get_probe_adapter(self):
+        """獲取探測請求使用的連接池，未共用adapter時延遲創建自己的
+        
+        Returns:
+            HTTPAdapter: 探測請求共用的adapter
+        """
+        if self.adapter is not None:
+            return self.adapter
+        if self._probe_adapter is None:
+            self._probe_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.PROBE_WORKERS)
+        return self._probe_adapter
+    
+    def _probe_auth(self, adapter, url, cookies, deadline):
+        """使用指定的cookies訪問授權頁面，判斷是否處於登入狀態
+        
+        每個探測使用獨立的Cookie容器，但共用同一個連接池。超時在探測實際開始時
+        按剩餘時間計算，排隊到時限之後的探測不會發出請求。
+        
+        Args:
+            adapter: 共用的HTTPAdapter
+            url: 需要授權的頁面
+            cookies: 要帶上的cookie字典
+            deadline: 全局時限（time.monotonic時間）
+            
+        Returns:
+            tuple: (是否已授權, 是否出現登入表單)，已過時限時返回None
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        
+        with requests.Session() as probe_session:
+            probe_session.verify = False
+            probe_session.mount("https://", adapter)
+            probe_session.mount("http://", adapter)
+            probe_session.headers.update(self.session.headers)
+            for name, value in cookies.items():
+                probe_session.cookies.set(name, value)
+            
+            response = probe_session.get(url, timeout=min(10, remaining))
+            has_login_form = "<form name=\"dyulogin\"" in response.text
+            has_welcome = "您好" in response.text and "登出" in response.text
+            return has_welcome and not has_login_form, has_login_form
+    
     def verify_cookie_auth(self, settings):
         """驗證網站是否使用cookies進行權限控制
         
+        所有探測（基準、無cookies、逐一移除cookie、篡改PHPSESSID）並行執行，
+        共用同一個連接池，並受全局時限約束。基準失敗，或關鍵cookies已全部確定、
+        剩餘探測不會再改變結果時提前結束，取消尚未開始的探測。
+        
         Args:
             settings: 設定字典
         
@@ -589,95 +891,84 @@ class AuthService:
             original_cookies = {cookie.name: cookie.value for cookie in self.session.cookies}
             results["tests_performed"].append("記錄原始cookies")
             
-            # 1. 測試: 拷貝會話並嘗試訪問，作為基準
-            test_session = requests.Session()
-            test_session.headers.update(self.session.headers)
-            # 複製所有cookies
-            for name, value in original_cookies.items():
-                test_session.cookies.set(name, value)
-            
-            # 訪問需要授權的頁面
             auth_url = settings.get("api_url", "https://adm_acc.dyu.edu.tw/entrance/index.php")
-            response = test_session.get(auth_url, timeout=10)
-            
-            # 檢查基準結果 - 是否訪問成功
-            has_login_form = "<form name=\"dyulogin\"" in response.text
-            has_welcome = "您好" in response.text and "登出" in response.text
-            base_authorized = has_welcome and not has_login_form
-            
-            results["tests_performed"].append("完成基準測試")
-            
-            if not base_authorized:
+            deadline = time.monotonic() + settings.get("cookie_probe_deadline", 15)
+            
+            # 準備所有探測: 探測名稱 -> 使用的cookies
+            probes = {"baseline": dict(original_cookies), "no_cookies": {}}
+            # 會話標識類cookie優先探測，時限內未能完成全部探測時至少已確認最可能關鍵的cookie
+            session_cookie_names = [name for name in original_cookies if name.upper() in self.SESSION_COOKIE_NAMES]
+            for cookie_name in session_cookie_names + [n for n in original_cookies if n not in session_cookie_names]:
+                probes[("remove", cookie_name)] = {n: v for n, v in original_cookies.items() if n != cookie_name}
+            if "PHPSESSID" in original_cookies:
+                tampered = dict(original_cookies)
+                tampered["PHPSESSID"] = ''.join(random.choices(string.ascii_lowercase + string.digits, k=26))
+                probes["tamper"] = tampered
+            
+            outcomes = {}
+            adapter = self._get_probe_adapter()
+            workers = max(1, min(settings.get("cookie_probe_workers", self.PROBE_WORKERS), len(probes)))
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cookie-probe")
+            try:
+                futures = {}
+                for key, cookies in probes.items():
+                    futures[executor.submit(self._probe_auth, adapter, auth_url, cookies, deadline)] = key
+                
+                # 決定關鍵cookies的探測: 無cookies和逐一移除，篡改測試可能補充PHPSESSID
+                pending = set(probes) - {"baseline"}
+                try:
+                    for future in as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+                        key = futures[future]
+                        pending.discard(key)
+                        try:
+                            outcome = future.result()
+                        except RequestException as e:
+                            results["tests_performed"].append(f"探測 {self._probe_label(key)} 失敗: {str(e)}")
+                            continue
+                        if outcome is None:
+                            results["tests_performed"].append(f"{self._probe_label(key)}開始前已達探測時限，未執行")
+                            continue
+                        outcomes[key] = outcome
+                        results["tests_performed"].append(f"完成{self._probe_label(key)}")
+                        
+                        # 基準失敗時其他探測都沒有意義
+                        if key == "baseline" and not outcomes[key][0]:
+                            break
+                        
+                        # 關鍵cookies已全部確定時提前結束
+                        if "baseline" in outcomes and self._critical_cookies_known(outcomes, pending):
+                            if pending:
+                                results["tests_performed"].append("已確認關鍵cookies，提前結束探測")
+                            break
+                except FuturesTimeoutError:
+                    results["tests_performed"].append("已達探測時限，未完成的探測將被取消")
+            finally:
+                # 取消尚未開始的探測，不等待進行中的請求
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            baseline = outcomes.get("baseline")
+            if not baseline or not baseline[0]:
                 results["details"] = "基準測試失敗，即使有完整cookies也無法訪問受保護頁面"
                 return results
             
-            # 2. 測試: 移除所有cookies並嘗試訪問
-            test_session = requests.Session()
-            test_session.headers.update(self.session.headers)
-            # 不添加任何cookies
+            no_cookies = outcomes.get("no_cookies")
+            no_cookies_has_login = bool(no_cookies and no_cookies[1])
             
-            response = test_session.get(auth_url, timeout=10)
-            no_cookies_has_login = "<form name=\"dyulogin\"" in response.text
-            
-            results["tests_performed"].append("完成無cookies測試")
-            
-            # 3. 測試: 有選擇地移除cookies並測試
-            for cookie_name in original_cookies.keys():
-                test_session = requests.Session()
-                test_session.headers.update(self.session.headers)
-                
-                # 複製除了當前測試cookie外的所有cookies
-                for name, value in original_cookies.items():
-                    if name != cookie_name:
-                        test_session.cookies.set(name, value)
-                
-                # 訪問授權頁面
-                response = test_session.get(auth_url, timeout=10)
-                
-                # 檢查是否包含登入表單或歡迎訊息
-                has_login_form = "<form name=\"dyulogin\"" in response.text
-                has_welcome = "您好" in response.text and "登出" in response.text
-                
-                # 如果缺少這個cookie導致需要重新登入，則這個cookie對授權很重要
-                if has_login_form and not has_welcome:
+            for cookie_name in original_cookies:
+                if self._is_critical(outcomes.get(("remove", cookie_name))):
                     results["critical_cookies"].append(cookie_name)
-                
-                results["tests_performed"].append(f"測試移除 {cookie_name}")
             
             # 分析結果
             if no_cookies_has_login and results["critical_cookies"]:
                 results["uses_cookie_auth"] = True
                 results["details"] = f"確認網站使用cookies進行權限控制。關鍵cookies: {', '.join(results['critical_cookies'])}"
             
-            # 4. 測試: 修改PHPSESSID並嘗試訪問
-            if "PHPSESSID" in original_cookies:
-                test_session = requests.Session()
-                test_session.headers.update(self.session.headers)
-                
-                # 複製所有cookies，但修改PHPSESSID
-                for name, value in original_cookies.items():
-                    if name == "PHPSESSID":
-                        # 將PHPSESSID修改為隨機值
-                        import random
-                        import string
-                        random_value = ''.join(random.choices(string.ascii_lowercase + string.digits, k=26))
-                        test_session.cookies.set(name, random_value)
-                    else:
-                        test_session.cookies.set(name, value)
-                
-                # 訪問授權頁面
-                response = test_session.get(auth_url, timeout=10)
-                
-                # 檢查是否包含登入表單
-                has_login_form = "<form name=\"dyulogin\"" in response.text
-                
-                if has_login_form:
-                    results["uses_cookie_auth"] = True
-                    if "PHPSESSID" not in results["critical_cookies"]:
-                        results["critical_cookies"].append("PHPSESSID")
-                    results["details"] += " 修改PHPSESSID導致需要重新登入，確認其為關鍵會話標識。"
-                
-                results["tests_performed"].append("完成PHPSESSID修改測試")
+            tamper = outcomes.get("tamper")
+            if tamper and tamper[1]:
+                results["uses_cookie_auth"] = True
+                if "PHPSESSID" not in results["critical_cookies"]:
+                    results["critical_cookies"].append("PHPSESSID")
+                results["details"] += " 修改PHPSESSID導致需要重新登入，確認其為關鍵會話標識。"
             
             # 更新重要cookies列表
             self.important_cookies = list(set(self.important_cookies + results["critical_cookies"]))
@@ -688,4 +979,36 @@ class AuthService:
             import traceback
             results["details"] = f"測試過程中發生錯誤: {str(e)}\n{traceback.format_exc()}"
             return results
-
+    
+    @classmethod
+    def _critical_cookies_known(cls, outcomes, pending):
+        """判斷剩餘的探測是否還會改變關鍵cookies和是否使用cookie授權的結論
+        
+        逐一移除的探測全部完成後關鍵cookies即已確定；篡改測試只會補充PHPSESSID，
+        如果PHPSESSID已確認為關鍵且無cookies時出現登入表單，它就不會再改變結論。
+        
+        Args:
+            outcomes: 已完成的探測結果
+            pending: 尚未完成的探測
+            
+        Returns:
+            bool: 是否可以停止探測
+        """
+        if "no_cookies" in pending or any(isinstance(key, tuple) for key in pending):
+            return False
+        if "tamper" not in pending:
+            return True
+        no_cookies = outcomes.get("no_cookies")
+        return bool(no_cookies and no_cookies[1]) and cls._is_critical(outcomes.get(("remove", "PHPSESSID")))
+    
+    @staticmethod
+    def _is_critical(outcome):
+        """移除某cookie後出現登入表單且沒有歡迎訊息，則該cookie對授權很重要"""
+        return bool(outcome) and outcome[1] and not outcome[0]
+    
+    @staticmethod
+    def _probe_label(key):
+        """探測的顯示名稱"""
+        if isinstance(key, tuple):
+            return f"測試移除 {key[1]}"
+        return {"baseline": "基準測試", "no_cookies": "無cookies測試", "tamper": "PHPSESSID修改測試"}.get(key, str(key))
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+斷路器 - 後端故障時快速失敗，避免重試風暴
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+from requests.exceptions import RequestException
+
+# 斷路器狀態
+CLOSED = "closed"        # 正常，請求直接通過
+OPEN = "open"            # 斷開，請求立即失敗
+HALF_OPEN = "half_open"  # 半開，只放行一個探測請求
+
+class CircuitOpenError(RequestException):
+    """斷路器斷開時拒絕請求"""
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(f"服務 {endpoint} 暫時不可用，{int(retry_after)} 秒後再試")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """單個端點的斷路器
+
+    連續失敗達到閾值後斷開；斷開一段時間後進入半開狀態，只放行一個探測請求，
+    探測成功則恢復，失敗則重新斷開。
+    """
+
+    def __init__(self, endpoint, failure_threshold=5, reset_timeout=60):
+        """初始化斷路器
+
+        Args:
+            endpoint: 端點名稱
+            failure_threshold: 觸發斷開的連續失敗次數
+            reset_timeout: 斷開後多久允許探測（秒）
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """檢查是否允許發送請求，半開狀態下第一個調用者取得探測資格
+
+        Returns:
+            bool: 是否允許
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            # 半開: 只放行一個探測請求
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+
+    def retry_after(self):
+        """距離允許探測的剩餘秒數"""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def is_open(self):
+        """是否處於斷開狀態且尚未到探測時間"""
+        return self.retry_after() > 0
+
+    def record_success(self):
+        """記錄一次成功，恢復為閉合狀態
+
+        Returns:
+            bool: 狀態是否發生變化
+        """
+        with self.lock:
+            changed = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+            return changed
+
+    def record_failure(self):
+        """記錄一次失敗，達到閾值或探測失敗時斷開
+
+        Returns:
+            bool: 是否因此次失敗而斷開
+        """
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+class CircuitBreakerRegistry:
+    """按端點（協議+主機+路徑）管理斷路器，由各認證服務和任務服務共用"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, logger=None):
+        """初始化註冊表
+
+        Args:
+            failure_threshold: 觸發斷開的連續失敗次數
+            reset_timeout: 斷開後多久允許探測（秒）
+            logger: 日誌記錄器，用於記錄狀態變化
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logger
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(url):
+        """從URL取得端點鍵，忽略查詢參數"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+    def get(self, url):
+        """獲取URL對應的斷路器
+
+        Args:
+            url: 請求URL
+
+        Returns:
+            CircuitBreaker: 該端點的斷路器
+        """
+        key = self.endpoint(url)
+        with self.lock:
+            breaker = self.breakers.get(key)
+            if breaker is None:
+                breaker = self.breakers[key] = CircuitBreaker(key, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def before_request(self, url):
+        """發送請求前檢查斷路器
+
+        Args:
+            url: 請求URL
+
+        Returns:
+            CircuitBreaker: 允許請求時返回該端點的斷路器
+
+        Raises:
+            CircuitOpenError: 斷路器斷開或探測請求進行中
+        """
+        breaker = self.get(url)
+        if not breaker.allow_request():
+            raise CircuitOpenError(breaker.endpoint, breaker.retry_after())
+        return breaker
+
+    def record(self, breaker, success):
+        """記錄請求結果並在狀態變化時寫日誌
+
+        Args:
+            breaker: before_request返回的斷路器
+            success: 請求是否成功
+        """
+        if success:
+            if breaker.record_success() and self.logger:
+                self.logger.log(f"服務 {breaker.endpoint} 已恢復")
+        elif breaker.record_failure() and self.logger:
+            self.logger.log(f"服務 {breaker.endpoint} 連續失敗，暫停請求 {self.reset_timeout} 秒")
+
+    def is_open(self, url):
+        """URL對應的端點是否處於斷開狀態"""
+        return self.get(url).is_open()
+
+    def update_settings(self, failure_threshold, reset_timeout):
+        """更新閾值和恢復時間，套用到現有的斷路器
+
+        Args:
+            failure_threshold: 觸發斷開的連續失敗次數
+            reset_timeout: 斷開後多久允許探測（秒）
+        """
+        with self.lock:
+            self.failure_threshold = failure_threshold
+            self.reset_timeout = reset_timeout
+            for breaker in self.breakers.values():
+                breaker.failure_threshold = failure_threshold
+                breaker.reset_timeout = reset_timeout
+
+    def get_summary(self):
+        """獲取整體狀態，供狀態欄顯示
+
+        Returns:
+            tuple: (最差的狀態, 斷開端點中最長的剩餘秒數)
+        """
+        with self.lock:
+            breakers = list(self.breakers.values())
+        state = CLOSED
+        retry_after = 0.0
+        for breaker in breakers:
+            if breaker.state == OPEN:
+                state = OPEN
+                retry_after = max(retry_after, breaker.retry_after())
+            elif breaker.state == HALF_OPEN and state == CLOSED:
+                state = HALF_OPEN
+        return state, retry_after
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+重試策略 - 帶總時限預算的請求重試控制
+"""
+
+import random
+import time
+from requests.exceptions import ConnectionError, Timeout
+from urllib3.exceptions import ProtocolError
+from chronohelper.services.circuit_breaker import CircuitOpenError
+
+# 錯誤分類
+RETRYABLE = "retryable"  # 暫時性錯誤，稍後重試
+RELOGIN = "relogin"      # 會話問題，重新登入後重試
+FATAL = "fatal"          # 無法通過重試解決，立即失敗
+
+class RetryBudget:
+    """單次操作的時間預算，從操作開始計時"""
+
+    def __init__(self, total_seconds):
+        """初始化預算
+
+        Args:
+            total_seconds: 操作允許的總秒數
+        """
+        self.total = float(total_seconds)
+        self.started = time.monotonic()
+        self.deadline = self.started + self.total
+
+    def remaining(self):
+        """剩餘秒數"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def elapsed(self):
+        """已用秒數"""
+        return time.monotonic() - self.started
+
+    def allows(self, seconds):
+        """剩餘時間是否足夠執行指定秒數的工作"""
+        return self.remaining() >= seconds
+
+class RetryPolicy:
+    """請求重試策略
+
+    每次嘗試的超時由剩餘預算決定，確保整個操作（包括重新登入和退避等待）
+    在總時限內結束；預算不足以進行一次有意義的嘗試時立即失敗，
+    讓調度器在下一輪重新安排。
+    """
+
+    # 各操作的預設策略，可在設定的retry_policies中按操作覆蓋
+    OPERATION_DEFAULTS = {
+        "sign_in": {"total_budget": 45, "max_attempt_timeout": 20},
+        "sign_out": {"total_budget": 60, "max_attempt_timeout": 30},
+    }
+
+    def __init__(self, max_attempts=3, total_budget=60, max_attempt_timeout=30, min_attempt_timeout=3,
+                 base_delay=2, backoff_factor=1.5, jitter=0.2, max_relogins=1):
+        """初始化重試策略
+
+        Args:
+            max_attempts: 最大嘗試次數
+            total_budget: 整個操作的總時限（秒）
+            max_attempt_timeout: 單次請求超時上限（秒）
+            min_attempt_timeout: 單次請求至少需要的秒數，剩餘預算不足時不再嘗試
+            base_delay: 基本重試延遲（秒）
+            backoff_factor: 退避倍數
+            jitter: 延遲的隨機抖動比例
+            max_relogins: 操作過程中最多重新登入的次數
+        """
+        self.max_attempts = max_attempts
+        self.total_budget = total_budget
+        self.max_attempt_timeout = max_attempt_timeout
+        self.min_attempt_timeout = min_attempt_timeout
+        self.base_delay = base_delay
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_relogins = max_relogins
+
+    @classmethod
+    def from_settings(cls, settings, operation):
+        """根據設定創建指定操作的重試策略
+
+        Args:
+            settings: 設定字典，retry_policies[operation]中的鍵覆蓋預設值
+            operation: 操作名稱，如"sign_in"、"sign_out"
+
+        Returns:
+            RetryPolicy: 重試策略實例
+        """
+        options = dict(cls.OPERATION_DEFAULTS.get(operation, {}))
+        options.update((settings.get("retry_policies") or {}).get(operation, {}))
+        return cls(**options)
+
+    def start(self):
+        """開始一次操作的計時
+
+        Returns:
+            RetryBudget: 本次操作的時間預算
+        """
+        return RetryBudget(self.total_budget)
+
+    def attempt_timeout(self, budget):
+        """根據剩餘預算計算本次嘗試的超時
+
+        Args:
+            budget: 操作的時間預算
+
+        Returns:
+            float: 超時秒數，預算不足一次嘗試時返回None
+        """
+        remaining = budget.remaining()
+        if remaining < self.min_attempt_timeout:
+            return None
+        return min(self.max_attempt_timeout, remaining)
+
+    def next_delay(self, attempt):
+        """計算第attempt次嘗試前的退避延遲
+
+        Args:
+            attempt: 即將進行的嘗試序號（從2開始）
+
+        Returns:
+            float: 延遲秒數
+        """
+        delay = self.base_delay * (self.backoff_factor ** (attempt - 1))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def can_retry(self, budget, attempt, delay):
+        """判斷在退避後是否還能進行一次嘗試
+
+        Args:
+            budget: 操作的時間預算
+            attempt: 即將進行的嘗試序號
+            delay: 退避延遲秒數
+
+        Returns:
+            bool: 是否可以重試
+        """
+        return attempt <= self.max_attempts and budget.allows(delay + self.min_attempt_timeout)
+
+    @staticmethod
+    def classify_exception(error):
+        """將請求異常分類
+
+        Args:
+            error: 請求過程中拋出的異常
+
+        Returns:
+            str: RETRYABLE、RELOGIN或FATAL
+        """
+        if isinstance(error, CircuitOpenError):
+            return FATAL
+        if isinstance(error, (ConnectionError, Timeout, ProtocolError)):
+            return RETRYABLE
+        # 重定向循環和其他未預期錯誤多半與會話狀態有關，重新登入後再試
+        return RELOGIN
+
+    @staticmethod
+    def classify_status(status_code):
+        """將HTTP狀態碼分類
+
+        Args:
+            status_code: HTTP狀態碼
+
+        Returns:
+            str: 狀態碼正常時返回None，否則為RETRYABLE或FATAL
+        """
+        if status_code == 200:
+            return None
+        # 5xx和除401/403外的4xx可以重試，權限錯誤重試也無法解決
+        if 500 <= status_code < 600 or (400 <= status_code < 500 and status_code not in (401, 403)):
+            return RETRYABLE
+        return FATAL
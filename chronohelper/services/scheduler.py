@@ -7,10 +7,18 @@ import time
 import datetime
 import threading
 import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from chronohelper.utils.precision_timer import PrecisionTimer, monotonic_deadline, parse_task_time
 
 class SchedulerService:
     """任務調度服務，負責自動執行到期任務"""
     
+    # 精確觸發模式下，預約未來多少秒內的操作（需大於輪詢的最長休眠時間）
+    ARM_HORIZON = 600
+    # 伺服器時鐘偏移的不確定度超過此秒數時不予採用
+    MAX_CLOCK_UNCERTAINTY = 1.0
+    
     def __init__(self, app):
         """初始化調度服務
         
@@ -32,6 +40,22 @@ class SchedulerService:
             "failed_sign_outs": 0,
             "last_success_time": None
         }
+        self.locked_accounts_logged = {}  # 帳號 -> 已記錄日誌的鎖定截止時間
+        self.stats_lock = threading.Lock()  # 保護execution_stats的並發更新
+        
+        # 到期任務交由有界線程池並行執行，單個任務的慢請求不會拖延其他任務
+        max_workers = max(1, int(self.app.settings.get("max_sign_workers", 4)))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sign")
+        self.task_locks = {}  # 任務ID -> 鎖，保證同一任務同時只有一個執行中的操作
+        self.task_locks_guard = threading.Lock()
+        
+        # 精確觸發模式: 在單調時鐘上預約每個操作的截止時間，提前預熱會話，準時發送請求
+        self.precision_firing = bool(self.app.settings.get("precision_firing", False))
+        self.fire_offset = float(self.app.settings.get("fire_offset_seconds", 0))
+        self.prewarm_seconds = max(0.0, float(self.app.settings.get("prewarm_seconds", 20)))
+        self.server_time_sync = bool(self.app.settings.get("server_time_sync", True))
+        self.precision_timer = PrecisionTimer(logger=self.app.logger)
+        self.lateness_samples = deque(maxlen=100)  # 最近的 (操作, 相對預定時間的延遲秒數)
         
         # 如果設置了自動啟動，則啟動調度線程
         if self.app.settings.get("auto_start", True):
@@ -44,11 +68,16 @@ class SchedulerService:
             self.thread = threading.Thread(target=self.scheduler_loop, daemon=True)
             self.thread.daemon = True
             self.thread.start()
+            if self.precision_firing:
+                self.precision_timer.start()
             self.app.logger.log("調度器已啟動")
     
     def stop(self):
         """停止調度線程"""
         self.running = False
+        self.precision_timer.stop()
+        # 取消尚未開始的任務操作，進行中的請求自行結束
+        self.executor.shutdown(wait=False, cancel_futures=True)
         if self.thread and self.thread.is_alive():
             try:
                 self.thread.join(2)  # 等待線程結束，最多2秒
@@ -259,14 +288,26 @@ class SchedulerService:
             # 按時間順序排序今天的任務
             today_tasks.sort(key=lambda t: t.sign_in_time)
             
-            # 處理今天的任務
+            # 處理今天的任務，到期的操作分派到線程池並行執行
+            dispatched = 0
             for task in today_tasks:
                 # 檢查任務是否被標記為異常
                 if self._should_skip_task(task):
                     continue
                 
+                if not self._has_due_operation(task, current_time):
+                    continue
+                
                 # 使用智能執行策略
-                self._execute_task_if_needed(task, current_time, current_is_campus)
+                if self._dispatch_task(task, current_time, current_is_campus):
+                    dispatched += 1
+            
+            if dispatched > 1:
+                self.app.logger.log(f"本次檢查並行執行 {dispatched} 個到期任務")
+            
+            # 預約即將到期的操作，由精確定時器準時觸發
+            if self.precision_firing:
+                self._arm_precise_operations(today_tasks)
             
             # 任務檢查完成後，計算執行時間
             check_duration = (datetime.datetime.now() - check_start_time).total_seconds()
@@ -324,9 +365,9 @@ class SchedulerService:
                 
             # 更新狀態欄
             if current_is_campus:
-                self.app.status_var.set("校內網絡環境，任務執行中")
+                self.app.set_status("校內網絡環境，任務執行中")
             else:
-                self.app.status_var.set("校外網絡環境，任務已暫停")
+                self.app.set_status("校外網絡環境，任務已暫停")
             
             return current_is_campus
             
@@ -334,7 +375,7 @@ class SchedulerService:
             self.app.logger.log(f"網絡環境檢測錯誤: {str(e)}")
             # 發生錯誤時，保守地返回False
             self.app.is_campus_network = False
-            self.app.status_var.set("網絡檢測錯誤，任務已暫停")
+            self.app.set_status("網絡檢測錯誤，任務已暫停")
             return False
     
     def _ensure_valid_session(self):
@@ -344,6 +385,10 @@ class SchedulerService:
             bool: 會話是否有效
         """
         try:
+            # 附加帳號的會話交由會話管理器的線程池在背景維持
+            if hasattr(self.app, 'session_manager'):
+                self.app.session_manager.keep_all_alive(include_primary=False)
+            
             # 嘗試刷新會話
             return self.app.auth_service.keep_session_alive(self.app.settings)
         except Exception as e:
@@ -389,6 +434,230 @@ class SchedulerService:
         
         return False
     
+    def _has_due_operation(self, task, current_time):
+        """檢查任務是否有到期的簽到或簽退操作
+        
+        Args:
+            task: 要檢查的任務
+            current_time: 當前時間
+            
+        Returns:
+            bool: 是否有到期操作
+        """
+        operation = self._next_operation(task)
+        if operation is None or current_time < operation[1]:
+            return False
+        # 已由精確定時器預約的操作交給定時器觸發，避免輪詢提前執行
+        return not self.precision_timer.is_scheduled((task.id, operation[0]))
+    
+    def _next_operation(self, task):
+        """獲取任務下一個待執行的操作
+        
+        Args:
+            task: 任務對象
+            
+        Returns:
+            tuple: (操作名稱, 預定時間HH:MM)，任務已完成時返回None
+        """
+        if not getattr(task, 'sign_in_done', False):
+            return "sign_in", task.sign_in_time
+        if not getattr(task, 'sign_out_done', False):
+            return "sign_out", task.sign_out_time
+        return None
+    
+    def _clock_offset(self):
+        """獲取可採用的伺服器時鐘偏移
+        
+        Returns:
+            float: 伺服器時間減本地時間的秒數，未啟用或估計不可靠時為0
+        """
+        if not self.server_time_sync:
+            return 0.0
+        estimate = self.app.auth_service.server_clock.get_offset()
+        if estimate is None or estimate[1] > self.MAX_CLOCK_UNCERTAINTY:
+            return 0.0
+        return estimate[0]
+    
+    def _target_time(self, task, scheduled_time):
+        """計算操作的目標發送時間（預定時間加上偏移）
+        
+        伺服器按自己的時鐘記錄簽到時間，因此預定時間視為伺服器時間，
+        再按估計的時鐘偏移換算為本地時間。
+        
+        Args:
+            task: 任務對象
+            scheduled_time: 預定時間HH:MM
+            
+        Returns:
+            datetime: 目標時間（本地時間）
+        """
+        seconds = self.fire_offset - self._clock_offset()
+        return parse_task_time(task.date, scheduled_time) + datetime.timedelta(seconds=seconds)
+    
+    def _arm_precise_operations(self, tasks):
+        """為即將到期的操作預約精確觸發和會話預熱
+        
+        已到期的操作由輪詢處理；任務時間被修改時以新的截止時間取代舊預約。
+        
+        Args:
+            tasks: 今天的任務列表
+        """
+        now = time.time()
+        for task in tasks:
+            operation = self._next_operation(task)
+            if operation is None or self._should_skip_task(task):
+                continue
+            name, scheduled_time = operation
+            target = self._target_time(task, scheduled_time)
+            seconds_to_target = target.timestamp() - now
+            if seconds_to_target <= 0 or seconds_to_target > self.ARM_HORIZON:
+                continue
+            
+            key = (task.id, name)
+            deadline = monotonic_deadline(target)
+            armed = self.precision_timer.get_deadline(key)
+            if armed is not None and abs(armed - deadline) < 0.05:
+                continue
+            
+            self.precision_timer.schedule(key, deadline, self._fire_operation, task.id, name, scheduled_time)
+            if seconds_to_target > self.prewarm_seconds > 0:
+                self.precision_timer.schedule(key + ("prewarm",), deadline - self.prewarm_seconds,
+                                              self._prewarm_operation, task.id)
+            label = "簽到" if name == "sign_in" else "簽退"
+            message = f"已預約 '{task.name}' 的{label}於本地時間 {target.strftime('%H:%M:%S.%f')[:-3]} 精確觸發"
+            clock_offset = self._clock_offset()
+            if clock_offset:
+                message += f"（伺服器時鐘偏移 {clock_offset:+.3f} 秒）"
+            self.app.logger.log(message)
+    
+    def _find_task(self, task_id):
+        """按ID查找任務"""
+        for task in self.app.tasks:
+            if task.id == task_id:
+                return task
+        return None
+    
+    def _prewarm_operation(self, lateness, task_id):
+        """定時器回調: 在操作前預熱帳號會話，實際工作交給線程池"""
+        task = self._find_task(task_id)
+        if task is None or not self.running:
+            return
+        try:
+            self.executor.submit(self._run_prewarm, task)
+        except RuntimeError:
+            pass  # 線程池已關閉（調度器停止中）
+    
+    def _run_prewarm(self, task):
+        """在工作線程中預熱會話"""
+        try:
+            if not self.app.task_service.prewarm(task, self.app.settings, self.prewarm_seconds):
+                self.app.logger.log(f"任務 '{task.name}' 預熱會話失敗，將在執行時重試登入")
+        except Exception as e:
+            self.app.logger.log(f"任務 '{task.name}' 預熱會話時發生錯誤: {str(e)}")
+    
+    def _fire_operation(self, lateness, task_id, name, scheduled_time):
+        """定時器回調: 到達目標時間，立即分派操作
+        
+        Args:
+            lateness: 定時器觸發相對截止時間的延遲（秒）
+            task_id: 任務ID
+            name: 操作名稱
+            scheduled_time: 預約時的預定時間HH:MM
+        """
+        task = self._find_task(task_id)
+        # 任務已刪除、已完成或時間已修改時放棄本次預約
+        if task is None or not self.running or self._next_operation(task) != (name, scheduled_time):
+            return
+        if self._should_skip_task(task):
+            return
+        # 以預定時間作為當前時間，負偏移提前觸發時分鐘比較仍然成立
+        self._dispatch_task(task, scheduled_time, getattr(self.app, 'is_campus_network', False))
+    
+    def _record_lateness(self, task, name, scheduled_time):
+        """記錄操作實際執行時間相對目標時間的延遲
+        
+        Args:
+            task: 任務對象
+            name: 操作名稱
+            scheduled_time: 預定時間HH:MM
+        """
+        try:
+            lateness = time.time() - self._target_time(task, scheduled_time).timestamp()
+        except ValueError:
+            return
+        with self.stats_lock:
+            self.lateness_samples.append((name, lateness))
+        self.app.logger.log(f"'{task.name}' 預定 {scheduled_time}，實際執行延遲 {lateness:.3f} 秒")
+    
+    def get_lateness_stats(self):
+        """獲取最近執行延遲的統計
+        
+        Returns:
+            dict: 包含count、avg、max和last的字典（秒），沒有樣本時返回None
+        """
+        with self.stats_lock:
+            samples = [lateness for _, lateness in self.lateness_samples]
+        if not samples:
+            return None
+        return {
+            "count": len(samples),
+            "avg": sum(samples) / len(samples),
+            "max": max(samples),
+            "last": samples[-1]
+        }
+    
+    def _get_task_lock(self, task):
+        """獲取任務對應的鎖"""
+        with self.task_locks_guard:
+            lock = self.task_locks.get(task.id)
+            if lock is None:
+                lock = self.task_locks[task.id] = threading.Lock()
+            return lock
+    
+    def _dispatch_task(self, task, current_time, is_campus_network):
+        """將任務提交到線程池執行
+        
+        如果該任務上一次的操作仍在執行（例如請求掛起），本次跳過而不是重複提交
+        
+        Args:
+            task: 要執行的任務
+            current_time: 當前時間
+            is_campus_network: 是否在校內網絡
+            
+        Returns:
+            bool: 是否已提交
+        """
+        lock = self._get_task_lock(task)
+        if not lock.acquire(blocking=False):
+            self.app.logger.log(f"任務 '{task.name}' 的上一次操作仍在執行，本次跳過")
+            return False
+        
+        try:
+            self.executor.submit(self._run_task, lock, task, current_time, is_campus_network)
+            return True
+        except RuntimeError:
+            # 線程池已關閉（調度器停止中）
+            lock.release()
+            return False
+    
+    def _run_task(self, lock, task, current_time, is_campus_network):
+        """在工作線程中執行任務，完成後釋放任務鎖"""
+        try:
+            self._execute_task_if_needed(task, current_time, is_campus_network)
+        finally:
+            lock.release()
+    
+    def _increment_stat(self, key):
+        """線程安全地增加統計計數"""
+        with self.stats_lock:
+            self.execution_stats[key] = self.execution_stats.get(key, 0) + 1
+    
+    def _record_success(self, key):
+        """線程安全地記錄一次成功操作"""
+        with self.stats_lock:
+            self.execution_stats[key] = self.execution_stats.get(key, 0) + 1
+            self.execution_stats["last_success_time"] = datetime.datetime.now()
+    
     def _execute_task_if_needed(self, task, current_time, is_campus_network):
         """根據需要執行任務
         
@@ -401,6 +670,14 @@ class SchedulerService:
         if not is_campus_network:
             return
         
+        # 帳號登入鎖定期間不安排簽到/簽退，避免重複提交帳號密碼
+        if self._is_account_locked(task):
+            return
+        
+        # 後端斷路器斷開時不執行，避免任務因服務故障被累計失敗次數
+        if self._is_backend_unavailable(task):
+            return
+        
         try:
             # 檢查簽到 - 只對未標記為已完成的任務執行
             self._execute_sign_in_if_needed(task, current_time)
@@ -418,7 +695,48 @@ class SchedulerService:
             task.last_attempt_time = datetime.datetime.now().isoformat()
             
             # 保存任務狀態
-            self.app.save_tasks()
+            self.app.save_tasks(task)
+    
+    def _is_account_locked(self, task):
+        """檢查任務所屬帳號是否處於登入鎖定狀態
+        
+        每個鎖定週期只記錄一次日誌
+        
+        Args:
+            task: 要檢查的任務
+            
+        Returns:
+            bool: 是否鎖定中
+        """
+        account = getattr(task, 'account', '')
+        auth_service = self.app.task_service.get_auth_service(task)
+        if not auth_service.is_login_locked():
+            self.locked_accounts_logged.pop(account, None)
+            return False
+        
+        lock_until = auth_service.backoff.lock_until
+        if self.locked_accounts_logged.get(account) != lock_until:
+            self.locked_accounts_logged[account] = lock_until
+            self.app.logger.log(f"帳號登入鎖定中，暫停執行任務 '{task.name}'，剩餘 {int(auth_service.backoff.remaining())} 秒")
+        return True
+    
+    def _is_backend_unavailable(self, task):
+        """檢查任務要使用的後端端點是否處於斷開狀態
+        
+        Args:
+            task: 要檢查的任務
+            
+        Returns:
+            bool: 是否暫時不可用
+        """
+        breakers = self.app.task_service.get_auth_service(task).breakers
+        settings = self.app.settings
+        urls = [settings.get("login_url", "https://adm_acc.dyu.edu.tw/entrance/save_id.php")]
+        if not getattr(task, 'sign_in_done', False):
+            urls.append(settings.get("sign_in_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy"))
+        else:
+            urls.append(settings.get("sign_out_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy"))
+        return any(breakers.is_open(url) for url in urls)
     
     def _execute_sign_in_if_needed(self, task, current_time):
         """根據需要執行簽到操作
@@ -428,17 +746,20 @@ class SchedulerService:
             current_time: 當前時間
         """
         if current_time >= task.sign_in_time and not getattr(task, 'sign_in_done', False):
-            # 記錄執行統計
-            self.execution_stats["total_executions"] += 1
+            self._record_lateness(task, "sign_in", task.sign_in_time)
             
             try:
                 self.app.logger.log(f"執行簽到任務: {task.name}")
-                result = self.app.perform_sign_in(task, from_scheduler=True)
+                result, joined = self.app.perform_sign_in(task, from_scheduler=True, return_joined=True)
+                
+                # 共用了手動觸發的簽到時，統計已由發起的調用記錄
+                if not joined:
+                    self._increment_stat("total_executions")
                 
                 if result:
                     # 簽到成功
-                    self.execution_stats["successful_sign_ins"] += 1
-                    self.execution_stats["last_success_time"] = datetime.datetime.now()
+                    if not joined:
+                        self._record_success("successful_sign_ins")
                     
                     # 清除環境限制標記和失敗計數
                     task.campus_restricted = False
@@ -449,20 +770,18 @@ class SchedulerService:
                     if hasattr(task, '_sign_in_warning_shown'):
                         delattr(task, '_sign_in_warning_shown')
                         
-                else:
+                elif not joined:
                     # 簽到失敗
-                    self.execution_stats["failed_sign_ins"] += 1
-                    
-                    # 檢查是否由於環境限制而失敗
-                    if self.app.status_var.get() == "簽到需要校內網絡環境":
-                        task.campus_restricted = True
+                    self._increment_stat("failed_sign_ins")
+                    # 環境限制由perform_sign_in直接標記在任務上（campus_restricted）
                     
                 # 保存任務狀態
-                self.app.save_tasks()
+                self.app.save_tasks(task)
                 
             except Exception as e:
                 self.app.logger.log(f"執行簽到 '{task.name}' 時發生錯誤: {str(e)}")
-                self.execution_stats["failed_sign_ins"] += 1
+                self._increment_stat("total_executions")
+                self._increment_stat("failed_sign_ins")
                 
                 # 記錄為一次失敗
                 if not hasattr(task, 'failure_count'):
@@ -471,7 +790,7 @@ class SchedulerService:
                 task.last_attempt_time = datetime.datetime.now().isoformat()
                 
                 # 保存任務狀態
-                self.app.save_tasks()
+                self.app.save_tasks(task)
     
     def _execute_sign_out_if_needed(self, task, current_time):
         """根據需要執行簽退操作
@@ -481,17 +800,20 @@ class SchedulerService:
             current_time: 當前時間
         """
         if current_time >= task.sign_out_time and getattr(task, 'sign_in_done', False) and not getattr(task, 'sign_out_done', False):
-            # 記錄執行統計
-            self.execution_stats["total_executions"] += 1
+            self._record_lateness(task, "sign_out", task.sign_out_time)
             
             try:
                 self.app.logger.log(f"執行簽退任務: {task.name}")
-                result = self.app.perform_sign_out(task, from_scheduler=True)
+                result, joined = self.app.perform_sign_out(task, from_scheduler=True, return_joined=True)
+                
+                # 共用了手動觸發的簽退時，統計已由發起的調用記錄
+                if not joined:
+                    self._increment_stat("total_executions")
                 
                 if result:
                     # 簽退成功
-                    self.execution_stats["successful_sign_outs"] += 1
-                    self.execution_stats["last_success_time"] = datetime.datetime.now()
+                    if not joined:
+                        self._record_success("successful_sign_outs")
                     
                     # 清除環境限制標記和失敗計數
                     task.campus_restricted = False
@@ -502,20 +824,18 @@ class SchedulerService:
                     if hasattr(task, '_sign_out_warning_shown'):
                         delattr(task, '_sign_out_warning_shown')
                         
-                else:
+                elif not joined:
                     # 簽退失敗
-                    self.execution_stats["failed_sign_outs"] += 1
-                    
-                    # 檢查是否由於環境限制而失敗
-                    if self.app.status_var.get() == "簽退需要校內網絡環境":
-                        task.campus_restricted = True
+                    self._increment_stat("failed_sign_outs")
+                    # 環境限制由perform_sign_out直接標記在任務上（campus_restricted）
                     
                 # 保存任務狀態
-                self.app.save_tasks()
+                self.app.save_tasks(task)
                 
             except Exception as e:
                 self.app.logger.log(f"執行簽退 '{task.name}' 時發生錯誤: {str(e)}")
-                self.execution_stats["failed_sign_outs"] += 1
+                self._increment_stat("total_executions")
+                self._increment_stat("failed_sign_outs")
                 
                 # 記錄為一次失敗
                 if not hasattr(task, 'failure_count'):
@@ -524,7 +844,7 @@ class SchedulerService:
                 task.last_attempt_time = datetime.datetime.now().isoformat()
                 
                 # 保存任務狀態
-                self.app.save_tasks()
+                self.app.save_tasks(task)
 
     def _handle_abnormal_tasks(self, today):
         """處理異常情況的任務，例如前一任務簽退失敗但需要進行下一個任務簽到的情況
@@ -647,7 +967,7 @@ class SchedulerService:
                 prev_task._force_completed = True
                 
                 # 保存任務變更
-                self.app.save_tasks()
+                self.app.save_tasks(prev_task)
                 return
             
             # 嘗試正常簽退
@@ -661,7 +981,7 @@ class SchedulerService:
                 if time_diff > 15:
                     self.app.logger.log(f"無法自動補簽退且已超時15分鐘，將標記為已完成以允許下一任務運行")
                     prev_task.sign_out_done = True
-                    self.app.save_tasks()
+                    self.app.save_tasks(prev_task)
                     
                     # 添加警告說明需要手動處理
                     self.app.logger.log(f"⚠️ 警告: 任務 '{prev_task.name}' 的簽退已被標記為完成，但實際可能未簽退成功")
@@ -676,7 +996,7 @@ class SchedulerService:
             if time_diff > 30:
                 self.app.logger.log(f"由於錯誤且已超時30分鐘，強制標記任務 '{prev_task.name}' 為已完成")
                 prev_task.sign_out_done = True
-                self.app.save_tasks()
+                self.app.save_tasks(prev_task)
                 self.app.logger.log(f"⚠️ 請稍後手動檢查此任務的實際狀態")
     
     def _is_missed_task(self, prev_task, next_task):
@@ -733,7 +1053,7 @@ class SchedulerService:
             prev_task.abnormal_reason = f"任務已錯過 {int(time_diff)} 小時，系統自動標記"
             
             # 保存狀態
-            self.app.save_tasks()
+            self.app.save_tasks(prev_task)
     
     def _is_task_sequence_abnormal(self, prev_task, next_task):
         """檢查任務順序是否異常
@@ -773,7 +1093,7 @@ class SchedulerService:
             prev_task._sequence_abnormal = True
             
             # 保存狀態
-            self.app.save_tasks()
+            self.app.save_tasks(prev_task)
     
     def _check_single_task_stuck(self, task):
         """檢查單個任務是否卡在某個狀態
@@ -806,7 +1126,7 @@ class SchedulerService:
                         self.app.logger.log(f"⚠️ 嚴重警告: 任務 '{task.name}' 已超過簽到時間 {int(time_diff)} 分鐘(超過3小時)")
                         task.marked_abnormal = True
                         task.abnormal_reason = f"簽到超時 {int(time_diff)} 分鐘"
-                        self.app.save_tasks()
+                        self.app.save_tasks(task)
                 elif time_diff > 60:  # 超過1小時
                     # 記錄警告
                     if not hasattr(task, '_sign_in_warning_shown'):
@@ -837,7 +1157,7 @@ class SchedulerService:
                         self.app.logger.log(f"⚠️ 嚴重警告: 任務 '{task.name}' 已超過簽退時間 {int(time_diff)} 分鐘(超過5小時)")
                         task.marked_abnormal = True
                         task.abnormal_reason = f"簽退超時 {int(time_diff)} 分鐘"
-                        self.app.save_tasks()
+                        self.app.save_tasks(task)
                 elif time_diff > 60:  # 超過1小時
                     # 記錄警告
                     if not hasattr(task, '_sign_out_warning_shown'):
@@ -887,5 +1207,11 @@ class SchedulerService:
                 stats["last_success_ago"] = f"{int(time_diff/3600)}小時前"
         else:
             stats["last_success_ago"] = "從未成功"
+        
+        # 添加執行延遲統計
+        lateness = self.get_lateness_stats()
+        if lateness:
+            stats["avg_lateness"] = f"{lateness['avg']:.3f}秒"
+            stats["max_lateness"] = f"{lateness['max']:.3f}秒"
             
         return stats
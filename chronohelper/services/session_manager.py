@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+多帳號會話管理服務
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from chronohelper.services.auth_service import AuthService
+from chronohelper.utils.transport import create_transport
+from chronohelper.utils.rate_limiter import RateLimiter
+from chronohelper.utils.server_clock import ServerClock
+from chronohelper.services.circuit_breaker import CircuitBreakerRegistry
+
+class SessionManager:
+    """多帳號會話管理器，按帳號維護獨立的認證服務並共用連接池
+
+    每個帳號擁有自己的AuthService（獨立的Cookie、登入鎖和退避狀態），
+    所有帳號共用同一個HTTPAdapter連接池，登入和會話維持統一交由
+    有界線程池執行，避免同時對伺服器發出大量請求。
+    """
+
+    def __init__(self, logger, settings):
+        """初始化會話管理器
+
+        Args:
+            logger: 日誌記錄器
+            settings: 應用設定字典
+        """
+        self.logger = logger
+        self.settings = settings
+        self.lock = threading.RLock()
+        self.state_store = None  # 登入狀態的持久化存儲（FileHandler）
+        self.saved_state = {}  # 已載入但帳號尚未建立的狀態
+
+        # 所有帳號共用的連接池
+        max_workers = max(1, int(settings.get("max_session_workers", 4)))
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers * 2)
+        # 會話的傳輸層，http2時同一主機的請求在一條連接上多路復用
+        self.transport = create_transport(settings.get("http_transport", "http1"), adapter=self.adapter,
+                                          max_connections=max_workers * 2, logger=logger)
+        # 所有帳號共用的按主機請求頻率限制
+        self.rate_limiter = RateLimiter(settings.get("rate_limit_interval", 1.5), settings.get("rate_limit_burst", 2))
+        # 所有帳號共用的端點斷路器
+        self.breakers = CircuitBreakerRegistry(settings.get("circuit_failure_threshold", 5),
+                                               settings.get("circuit_reset_timeout", 60), logger=logger)
+        # 所有帳號的響應共同估計伺服器時鐘偏移
+        self.server_clock = ServerClock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="session")
+
+        # 主帳號使用應用設定中的帳號密碼
+        self.primary = AuthService(logger, adapter=self.adapter, transport=self.transport,
+                                   rate_limiter=self.rate_limiter, breakers=self.breakers,
+                                   server_clock=self.server_clock)
+
+        # 其他帳號: 帳號 -> (AuthService, 帳號設定)
+        self.accounts = {}
+        self.load_accounts(settings.get("accounts", []))
+
+    def update_settings(self, settings):
+        """更新設定並同步帳號列表
+
+        Args:
+            settings: 新的設定字典
+        """
+        with self.lock:
+            self.settings = settings
+        self.rate_limiter.update_settings(settings.get("rate_limit_interval", 1.5), settings.get("rate_limit_burst", 2))
+        self.breakers.update_settings(settings.get("circuit_failure_threshold", 5), settings.get("circuit_reset_timeout", 60))
+        self.load_accounts(settings.get("accounts", []))
+
+    def load_accounts(self, accounts):
+        """根據設定中的帳號列表建立或移除帳號
+
+        Args:
+            accounts: 帳號字典列表，每項包含username、password和可選的name
+        """
+        wanted = {}
+        for account in accounts or []:
+            username = (account.get("username") or "").strip()
+            if username:
+                wanted[username] = account
+
+        with self.lock:
+            # 移除已不存在的帳號
+            for username in list(self.accounts.keys()):
+                if username not in wanted:
+                    del self.accounts[username]
+                    self.logger.log(f"已移除帳號 {username} 的會話")
+
+            # 新增或更新帳號資料
+            for username, account in wanted.items():
+                if username in self.accounts:
+                    self.accounts[username] = (self.accounts[username][0], dict(account))
+                else:
+                    auth_service = AuthService(self.logger, adapter=self.adapter, transport=self.transport,
+                                               rate_limiter=self.rate_limiter, breakers=self.breakers,
+                                               server_clock=self.server_clock)
+                    self._attach_state(username, auth_service)
+                    self.accounts[username] = (auth_service, dict(account))
+
+    def attach_state_store(self, store):
+        """掛載登入狀態存儲，恢復各帳號的退避狀態並在變更時自動保存
+
+        Args:
+            store: 提供load_auth_state和save_auth_state的對象（FileHandler）
+        """
+        self.state_store = store
+        self.saved_state = store.load_auth_state() or {}
+        self._attach_state(self._primary_key(), self.primary)
+        with self.lock:
+            entries = list(self.accounts.items())
+        for username, entry in entries:
+            self._attach_state(username, entry[0])
+
+    def _primary_key(self):
+        """主帳號在狀態存儲中使用的鍵"""
+        return self.settings.get("username", "")
+
+    def _attach_state(self, key, auth_service):
+        """為認證服務恢復保存的狀態並設置變更回調"""
+        if self.state_store is None:
+            return
+        state = self.saved_state.get(key, {})
+        auth_service.restore_backoff_state(state.get("backoff"))
+        auth_service.restore_session_meta(state.get("session"))
+        auth_service.on_state_change = lambda service: self.save_state()
+
+    def collect_state(self):
+        """收集所有帳號的登入狀態
+
+        Returns:
+            dict: 帳號名稱 -> 狀態字典
+        """
+        state = dict(self.saved_state)
+        with self.lock:
+            entries = list(self.accounts.items())
+        services = [(self._primary_key(), self.primary)] + [(username, entry[0]) for username, entry in entries]
+        for key, auth_service in services:
+            account_state = dict(state.get(key, {}))
+            account_state["backoff"] = auth_service.backoff.to_dict()
+            account_state["session"] = auth_service.get_session_meta()
+            state[key] = account_state
+        return state
+
+    def save_state(self):
+        """保存所有帳號的登入狀態到存儲"""
+        if self.state_store is None:
+            return
+        with self.lock:
+            self.saved_state = self.collect_state()
+            self.state_store.save_auth_state(self.saved_state)
+
+    def is_login_locked(self, account=None):
+        """檢查指定帳號的登入是否處於鎖定狀態
+
+        Args:
+            account: 帳號名稱，為空時為主帳號
+
+        Returns:
+            bool: 是否鎖定中
+        """
+        return self.get_auth_service(account).is_login_locked()
+
+    def list_accounts(self):
+        """獲取所有附加帳號的名稱
+
+        Returns:
+            list: 帳號名稱列表
+        """
+        with self.lock:
+            return list(self.accounts.keys())
+
+    def _is_primary(self, account):
+        """判斷帳號是否為主帳號"""
+        return not account or account == self.settings.get("username", "")
+
+    def get_auth_service(self, account=None):
+        """獲取指定帳號的認證服務
+
+        Args:
+            account: 帳號名稱，為空時返回主帳號
+
+        Returns:
+            AuthService: 該帳號的認證服務，帳號不存在時返回主帳號
+        """
+        if self._is_primary(account):
+            return self.primary
+        with self.lock:
+            entry = self.accounts.get(account)
+        if entry is None:
+            self.logger.log(f"找不到帳號 {account}，改用主帳號")
+            return self.primary
+        return entry[0]
+
+    def get_account_settings(self, account=None):
+        """獲取指定帳號使用的設定字典
+
+        附加帳號的設定以應用設定為基礎，覆蓋帳號、密碼和姓名
+
+        Args:
+            account: 帳號名稱，為空時返回應用設定
+
+        Returns:
+            dict: 該帳號的設定字典
+        """
+        if self._is_primary(account):
+            return self.settings
+        with self.lock:
+            entry = self.accounts.get(account)
+        if entry is None:
+            return self.settings
+        account_settings = dict(self.settings)
+        account_settings["username"] = entry[1].get("username", "")
+        account_settings["password"] = entry[1].get("password", "")
+        account_settings["name"] = entry[1].get("name", "")
+        return account_settings
+
+    def _all_accounts(self):
+        """列出所有帳號（包括主帳號）"""
+        with self.lock:
+            accounts = list(self.accounts.keys())
+        if self.settings.get("username"):
+            accounts.insert(0, "")
+        return accounts
+
+    def submit_login(self, account=None, force=False):
+        """將登入操作提交到線程池
+
+        Args:
+            account: 帳號名稱，為空時為主帳號
+            force: 是否強制重新登入
+
+        Returns:
+            Future: 登入結果的Future
+        """
+        auth_service = self.get_auth_service(account)
+        account_settings = self.get_account_settings(account)
+        return self.executor.submit(auth_service.login, account_settings, force)
+
+    def login_all(self, force=False):
+        """為所有帳號提交登入操作
+
+        Args:
+            force: 是否強制重新登入
+
+        Returns:
+            dict: 帳號名稱 -> Future
+        """
+        return {account: self.submit_login(account, force) for account in self._all_accounts()}
+
+    def keep_all_alive(self, include_primary=True):
+        """為所有帳號提交會話維持操作，不等待結果
+
+        Args:
+            include_primary: 是否包括主帳號
+
+        Returns:
+            dict: 帳號名稱 -> Future
+        """
+        futures = {}
+        for account in self._all_accounts():
+            if not include_primary and self._is_primary(account):
+                continue
+            auth_service = self.get_auth_service(account)
+            account_settings = self.get_account_settings(account)
+            futures[account] = self.executor.submit(self._keep_alive, account, auth_service, account_settings)
+        return futures
+
+    def _keep_alive(self, account, auth_service, account_settings):
+        """在工作線程中維持單個帳號的會話"""
+        try:
+            return auth_service.keep_session_alive(account_settings)
+        except Exception as e:
+            self.logger.log(f"維持帳號 {account or '主帳號'} 會話時出錯: {str(e)}")
+            return False
+
+    def warm_start_all(self):
+        """在背景為所有帳號嘗試沿用保存的會話
+
+        Returns:
+            dict: 帳號名稱 -> Future
+        """
+        futures = {}
+        for account in self._all_accounts():
+            auth_service = self.get_auth_service(account)
+            account_settings = self.get_account_settings(account)
+            futures[account] = self.executor.submit(self._warm_start, account, auth_service, account_settings)
+        return futures
+
+    def _warm_start(self, account, auth_service, account_settings):
+        """在工作線程中為單個帳號沿用保存的會話"""
+        try:
+            return auth_service.warm_start(account_settings)
+        except Exception as e:
+            self.logger.log(f"沿用帳號 {account or '主帳號'} 的會話時出錯: {str(e)}")
+            return False
+
+    def get_cookies_map(self):
+        """獲取所有附加帳號的Cookie，用於保存
+
+        Returns:
+            dict: 帳號名稱 -> Cookie字典列表
+        """
+        with self.lock:
+            entries = list(self.accounts.items())
+        return {username: entry[0].get_cookies_list() for username, entry in entries}
+
+    def set_cookies_map(self, cookies_map):
+        """從保存的資料恢復附加帳號的Cookie
+
+        Args:
+            cookies_map: 帳號名稱 -> Cookie字典列表
+        """
+        with self.lock:
+            entries = dict(self.accounts)
+        for username, cookies in (cookies_map or {}).items():
+            if username in entries and cookies:
+                entries[username][0].set_cookies(cookies)
+
+    def shutdown(self):
+        """關閉線程池和連接池"""
+        self.executor.shutdown(wait=False)
+        self.transport.close()
+        self.adapter.close()
@@ -5,46 +5,119 @@
 
 import datetime
 import time
-import random
-from requests.exceptions import RequestException, ConnectionError, Timeout, TooManyRedirects
-from urllib3.exceptions import ProtocolError
+from chronohelper.services.retry_policy import RetryPolicy, RETRYABLE, RELOGIN, FATAL
+from chronohelper.utils.in_flight import InFlightRegistry
 
 class TaskService:
     """任務管理服務，處理簽到/簽退操作"""
     
-    def __init__(self, logger, auth_service):
+    # 操作類型 -> 重試策略設定中的鍵
+    OPERATION_KEYS = {"簽到": "sign_in", "簽退": "sign_out"}
+    
+    def __init__(self, logger, auth_service, session_manager=None):
         """初始化任務服務
         
         Args:
             logger: 日誌記錄器
-            auth_service: 認證服務實例
+            auth_service: 認證服務實例（主帳號）
+            session_manager: 多帳號會話管理器，為None時所有任務使用主帳號
         """
         self.logger = logger
         self.auth_service = auth_service
-        self.max_retry_attempts = 3  # 最大重試次數
-        self.retry_base_delay = 2    # 基本重試延遲（秒）
-        self.last_request_time = None  # 上次請求時間
-        self.min_request_interval = 1.5  # 最小請求間隔（秒）
+        self.session_manager = session_manager
+        self.rate_limiter = auth_service.rate_limiter  # 與認證服務共用的請求頻率限制
+        self.in_flight = InFlightRegistry()  # (任務ID, 操作) -> 進行中的簽到/簽退
+    
+    def get_auth_service(self, task):
+        """獲取任務所屬帳號的認證服務
+        
+        Args:
+            task: 任務對象
+            
+        Returns:
+            AuthService: 認證服務實例
+        """
+        account = getattr(task, 'account', '')
+        if self.session_manager and account:
+            return self.session_manager.get_auth_service(account)
+        return self.auth_service
+    
+    def _resolve_account(self, task, settings):
+        """根據任務所屬帳號獲取認證服務和對應的設定
+        
+        Args:
+            task: 任務對象
+            settings: 應用設定字典
+            
+        Returns:
+            tuple: (認證服務, 帳號設定字典)
+        """
+        account = getattr(task, 'account', '')
+        if self.session_manager and account:
+            return (self.session_manager.get_auth_service(account),
+                    self.session_manager.get_account_settings(account))
+        return self.auth_service, settings
+    
+    def prewarm(self, task, settings, lead_seconds):
+        """在預定操作前預熱任務帳號的會話和連接
+        
+        如果到預定時間時會話已過有效期的一半，ensure_login會在操作時再發驗證請求，
+        所以提前重新登入；否則只確認登入狀態。
+        
+        Args:
+            task: 任務對象
+            settings: 應用設定字典
+            lead_seconds: 距離預定操作的秒數
+            
+        Returns:
+            bool: 會話是否可用
+        """
+        auth_service, settings = self._resolve_account(task, settings)
+        if auth_service.is_login_locked():
+            return False
+        
+        valid_time = settings.get("session_valid_time", 270)
+        if auth_service.login_status and auth_service.last_login_time:
+            elapsed = (datetime.datetime.now() - auth_service.last_login_time).total_seconds()
+            if elapsed + lead_seconds < valid_time * 0.5:
+                return auth_service.ensure_login(settings)
+        return auth_service.login(settings, force=True)
     
-    def perform_sign_in(self, task, settings):
+    def perform_sign_in(self, task, settings, reserved=False, return_joined=False):
         """執行簽到操作
         
         Args:
             task: 任務對象
             settings: 設定字典
+            reserved: 調用方是否已通過rate_limiter.schedule預約了請求令牌（只用於首次請求，
+                ensure_login中的請求和重試仍各自取得令牌）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽到
             
         Returns:
-            bool: 簽到是否成功
+            bool: 簽到是否成功；return_joined為True時返回(是否成功, 是否共用了他人的結果)
         """
+        # 同一任務的簽到正在進行時（按鈕、調度器或卡住修復同時觸發），共用其結果而不重複發送
+        result, joined = self.in_flight.run((task.id, "sign_in"), self._perform_sign_in, task, settings, reserved)
+        if joined:
+            self.logger.log(f"'{task.name}' 的簽到已在進行中，已共用其結果")
+        if return_joined:
+            return result, joined
+        return result
+    
+    def _perform_sign_in(self, task, settings, reserved):
+        """簽到的實際流程，由perform_sign_in通過進行中登記調用"""
         self.logger.log(f"執行簽到: {task.name}, 時間: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # 確保已登入
-        if not self.auth_service.ensure_login(settings):
-            self.logger.log("簽到前檢測到未登入，嘗試重新登入")
-            if not self.auth_service.login(settings, force=True):
-                self.logger.log("重新登入失敗，無法執行簽到")
-                self._handle_task_failure(task, "登入失敗")
-                return False
+        auth_service, settings = self._resolve_account(task, settings)
+        
+        # 整個簽到操作（包括登入）共用同一個時間預算
+        policy = RetryPolicy.from_settings(settings, "sign_in")
+        budget = policy.start()
+        
+        # 確保已登入，驗證、刷新和登入的請求都受同一預算限制
+        if not self._ensure_login_within_budget(auth_service, settings, policy, budget, "簽到"):
+            self._handle_task_failure(task, "登入失敗")
+            return False
         
         # 簽到URL
         sign_in_url = settings.get("sign_in_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy")
@@ -55,7 +128,7 @@ class TaskService:
         }
         
         # 使用與認證服務相同的標準頭部，並添加必要的API請求頭
-        headers = self.auth_service.standard_headers.copy()
+        headers = auth_service.standard_headers.copy()
         headers.update({
             "Content-Type": "application/json",
             "Accept": "application/json, text/plain, */*",
@@ -73,28 +146,48 @@ class TaskService:
             settings=settings,
             operation_type="簽到",
             success_handler=self._handle_sign_in_success,
-            failure_handler=self._handle_sign_in_failure
+            failure_handler=self._handle_sign_in_failure,
+            auth_service=auth_service,
+            reserved=reserved,
+            policy=policy,
+            budget=budget
         )
     
-    def perform_sign_out(self, task, settings):
+    def perform_sign_out(self, task, settings, reserved=False, return_joined=False):
         """執行簽退操作
         
         Args:
             task: 任務對象
             settings: 設定字典
+            reserved: 調用方是否已通過rate_limiter.schedule預約了請求令牌（只用於首次請求，
+                ensure_login中的請求和重試仍各自取得令牌）
+            return_joined: 是否同時返回本次調用是否共用了進行中的簽退
             
         Returns:
-            bool: 簽退是否成功
+            bool: 簽退是否成功；return_joined為True時返回(是否成功, 是否共用了他人的結果)
         """
+        # 同一任務的簽退正在進行時（按鈕、調度器或卡住修復同時觸發），共用其結果而不重複發送
+        result, joined = self.in_flight.run((task.id, "sign_out"), self._perform_sign_out, task, settings, reserved)
+        if joined:
+            self.logger.log(f"'{task.name}' 的簽退已在進行中，已共用其結果")
+        if return_joined:
+            return result, joined
+        return result
+    
+    def _perform_sign_out(self, task, settings, reserved):
+        """簽退的實際流程，由perform_sign_out通過進行中登記調用"""
         self.logger.log(f"執行簽退: {task.name}, 時間: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # 確保已登入
-        if not self.auth_service.ensure_login(settings):
-            self.logger.log("簽退前檢測到未登入，嘗試重新登入")
-            if not self.auth_service.login(settings, force=True):
-                self.logger.log("重新登入失敗，無法執行簽退")
-                self._handle_task_failure(task, "登入失敗") 
-                return False
+        auth_service, settings = self._resolve_account(task, settings)
+        
+        # 整個簽退操作（包括登入）共用同一個時間預算
+        policy = RetryPolicy.from_settings(settings, "sign_out")
+        budget = policy.start()
+        
+        # 確保已登入，驗證、刷新和登入的請求都受同一預算限制
+        if not self._ensure_login_within_budget(auth_service, settings, policy, budget, "簽退"):
+            self._handle_task_failure(task, "登入失敗")
+            return False
         
         # 簽退URL
         sign_out_url = settings.get("sign_out_url", "https://adm_acc.dyu.edu.tw/budget/prj_epfee/kernel/kernel_prj_carddata_edit.php?page=NDgy")
@@ -105,7 +198,7 @@ class TaskService:
         }
         
         # 使用與認證服務相同的標準頭部，並添加必要的API請求頭
-        headers = self.auth_service.standard_headers.copy()
+        headers = auth_service.standard_headers.copy()
         headers.update({
             "Content-Type": "application/json",
             "Accept": "application/json, text/plain, */*",
@@ -123,12 +216,49 @@ class TaskService:
             settings=settings,
             operation_type="簽退",
             success_handler=self._handle_sign_out_success,
-            failure_handler=self._handle_sign_out_failure
+            failure_handler=self._handle_sign_out_failure,
+            auth_service=auth_service,
+            reserved=reserved,
+            policy=policy,
+            budget=budget
         )
     
-    def _execute_request_with_retry(self, task, url, method, data, headers, settings, operation_type, success_handler, failure_handler):
+    def _ensure_login_within_budget(self, auth_service, settings, policy, budget, operation_type):
+        """在操作的時間預算內確保已登入
+        
+        Args:
+            auth_service: 認證服務
+            settings: 設定字典
+            policy: 重試策略
+            budget: 操作的時間預算
+            operation_type: 操作類型，用於日誌
+            
+        Returns:
+            bool: 是否已登入；預算用盡時返回False
+        """
+        timeout = policy.attempt_timeout(budget)
+        if timeout is None:
+            self.logger.log(f"{operation_type}操作剩餘時間不足，無法確認登入狀態")
+            return False
+        if auth_service.ensure_login(settings, timeout=timeout):
+            return True
+        
+        self.logger.log(f"{operation_type}前檢測到未登入，嘗試重新登入")
+        timeout = policy.attempt_timeout(budget)
+        if timeout is None:
+            self.logger.log(f"{operation_type}操作剩餘時間不足，無法重新登入")
+            return False
+        if not auth_service.login(settings, force=True, timeout=timeout):
+            self.logger.log(f"重新登入失敗，無法執行{operation_type}")
+            return False
+        return True
+    
+    def _execute_request_with_retry(self, task, url, method, data, headers, settings, operation_type, success_handler, failure_handler, auth_service=None, reserved=False, policy=None, budget=None):
         """執行帶重試機制的HTTP請求
         
+        重試受RetryPolicy控制: 每次請求的超時取自剩餘的時間預算，
+        錯誤分為可重試、需重新登入和致命三類，預算用盡時立即失敗。
+        
         Args:
             task: 任務對象
             url: 請求URL
@@ -139,115 +269,110 @@ class TaskService:
             operation_type: 操作類型 (簽到/簽退)
             success_handler: 成功處理函數
             failure_handler: 失敗處理函數
+            auth_service: 執行請求的認證服務，默認為主帳號
+            reserved: 首次請求的令牌是否已由調用方預約
+            policy: 重試策略，默認按操作類型從設定創建
+            budget: 已開始計時的時間預算，默認從此處開始計時
             
         Returns:
             bool: 請求是否成功
         """
+        if auth_service is None:
+            auth_service = self.auth_service
+        if policy is None:
+            policy = RetryPolicy.from_settings(settings, self.OPERATION_KEYS.get(operation_type, operation_type))
+        if budget is None:
+            budget = policy.start()
+        
         attempt = 0
+        relogins = 0
         last_error = None
         
-        # 控制請求頻率
-        self._apply_request_throttling()
-        
         # 獲取會話
-        session = self.auth_service.get_session()
+        session = auth_service.get_session()
         
-        while attempt < self.max_retry_attempts:
+        while attempt < policy.max_attempts:
             attempt += 1
+            category = None
             
             try:
                 if attempt > 1:
-                    delay = self.retry_base_delay * (1.5 ** (attempt - 1)) * (0.8 + 0.4 * random.random())  # 指數退避+隨機抖動
+                    delay = policy.next_delay(attempt)  # 指數退避+隨機抖動
+                    if not policy.can_retry(budget, attempt, delay):
+                        self.logger.log(f"{operation_type}操作剩餘時間不足（{budget.remaining():.1f}秒），停止重試")
+                        break
                     self.logger.log(f"{operation_type}操作第{attempt}次重試，延遲{delay:.1f}秒...")
                     time.sleep(delay)
-                    
-                    # 重試前重新檢查登入狀態
-                    if not self.auth_service.verify_session(settings):
-                        self.logger.log(f"重試前發現會話已失效，重新登入...")
-                        if not self.auth_service.login(settings, force=True):
-                            self.logger.log(f"重新登入失敗，無法繼續{operation_type}操作")
-                            break
-                        # 獲取新的會話
-                        session = self.auth_service.get_session()
+                    # 只有會話問題（RELOGIN）才在下方重新登入，5xx和網絡錯誤退避後直接重發，
+                    # 不再額外發送驗證請求消耗預算
                 
-                # 紀錄本次請求時間
-                self.last_request_time = datetime.datetime.now()
+                # 本次請求的超時由剩餘預算決定
+                timeout = policy.attempt_timeout(budget)
+                if timeout is None:
+                    self.logger.log(f"{operation_type}操作已用完 {policy.total_budget} 秒的時間預算")
+                    break
                 
-                # 發送請求
+                # 發送請求，經過斷路器和請求頻率限制，首次請求已預約時不再重複取得令牌
+                throttle = attempt > 1 or not reserved
                 if method.upper() == "POST":
-                    response = session.post(url, json=data, headers=headers, timeout=30)
+                    response = auth_service.send("POST", url, session=session, throttle=throttle, json=data, headers=headers, timeout=timeout)
                 else:  # GET
-                    response = session.get(url, headers=headers, timeout=30)
+                    response = auth_service.send("GET", url, session=session, throttle=throttle, headers=headers, timeout=timeout)
                 
                 # 檢查PHPSESSID是否仍然存在
-                if not self._check_session_cookie(session):
+                if not self._check_session_cookie(session, auth_service):
                     self.logger.log(f"{operation_type}操作後發現PHPSESSID丟失，將重新登入")
-                    if self.auth_service.login(settings, force=True):
-                        continue  # 重新登入成功，重試請求
-                    else:
-                        self.logger.log(f"重新登入失敗，無法繼續{operation_type}操作")
-                        break
-                
-                # 記錄簡潔的響應信息
-                if len(response.text) > 500:
-                    preview = response.text[:500] + "... (截斷)"
+                    category = RELOGIN
                 else:
-                    preview = response.text
-                self.logger.log(f"{operation_type}API響應: 狀態碼={response.status_code}, 內容長度={len(response.text)}, 預覽={preview}")
-                
-                # 檢查是否重定向到登入頁面（會話失效）
-                if "login_id" in response.text and "login_pwd" in response.text and "<form" in response.text.lower():
-                    self.logger.log(f"{operation_type}操作返回登入頁面，會話可能已失效，嘗試重新登入")
-                    if self.auth_service.login(settings, force=True):
-                        continue  # 重新登入成功，重試請求
-                    else:
-                        self.logger.log(f"重新登入失敗，無法繼續{operation_type}操作")
-                        break
-                
-                # 檢查響應狀態碼
-                if response.status_code != 200:
-                    self.logger.log(f"{operation_type}請求失敗，狀態碼: {response.status_code}")
-                    # 只有在狀態碼為5xx或4xx(除了401/403)時才重試
-                    if (500 <= response.status_code < 600) or (400 <= response.status_code < 500 and response.status_code not in [401, 403]):
+                    self.logger.log(f"{operation_type}API響應: 狀態碼={response.status_code}, 內容長度={len(response.content)}")
+                    # 響應內容預覽只在調試日誌中輸出，避免每次都複製和格式化響應文本
+                    if self.logger.debug_enabled:
+                        text = response.text
+                        preview = text[:500] + "... (截斷)" if len(text) > 500 else text
+                        self.logger.debug(f"{operation_type}API響應預覽: {preview}")
+                    
+                    category, result = self._classify_response(response, policy)
+                    if category is None:
+                        return success_handler(task, result)
+                    if category == RELOGIN:
+                        self.logger.log(f"{operation_type}操作返回登入頁面，會話可能已失效，嘗試重新登入")
+                    elif category == RETRYABLE:
+                        self.logger.log(f"{operation_type}請求失敗，狀態碼: {response.status_code}")
                         continue  # 重試請求
-                    else:
+                    elif response.status_code != 200:
+                        self.logger.log(f"{operation_type}請求失敗，狀態碼: {response.status_code}")
                         return failure_handler(task, response, f"狀態碼錯誤: {response.status_code}")
+                    else:
+                        # 狀態碼是200但既不是JSON也不是登入頁面，可能是API格式變更
+                        self.logger.log(f"{operation_type}響應解析失敗: 內容不是有效的JSON")
+                        return failure_handler(task, response, f"響應無法解析")
                 
-                # 嘗試解析JSON
-                try:
-                    result = response.json()
-                    return success_handler(task, result)
-                except ValueError as e:
-                    # JSON解析失敗但狀態碼是200，可能是API格式變更或登入過期
-                    self.logger.log(f"{operation_type}響應解析失敗: {str(e)}")
-                    if "login_id" in response.text or "login_pwd" in response.text:
-                        self.logger.log(f"檢測到重定向到登入頁面，嘗試重新登入")
-                        if self.auth_service.login(settings, force=True):
-                            continue  # 重新登入成功，重試請求
-                
-                # 所有處理方式都失敗，使用failure_handler
-                return failure_handler(task, response, f"響應無法解析")
-                
-            except (ConnectionError, Timeout, TooManyRedirects, ProtocolError) as e:
-                # 網絡相關錯誤，可以重試
-                self.logger.log(f"{operation_type}過程中發生網絡錯誤: {str(e)}")
-                last_error = e
-                continue
             except Exception as e:
-                # 其他錯誤，記錄下來
+                last_error = e
+                category = RetryPolicy.classify_exception(e)
+                if category == FATAL:
+                    # 服務暫時不可用，立即失敗，等待調度器下一輪
+                    self.logger.log(f"{operation_type}操作已跳過: {str(e)}")
+                    break
+                if category == RETRYABLE:
+                    # 網絡相關錯誤，可以重試
+                    self.logger.log(f"{operation_type}過程中發生網絡錯誤: {str(e)}")
+                    continue
+                # 其他錯誤，記錄下來，可能需要重新登入
                 self.logger.log(f"{operation_type}過程中發生未預期錯誤: {str(e)}")
                 import traceback
                 self.logger.log(traceback.format_exc())
-                last_error = e
-                # 對於未知錯誤，可能需要重新登入
-                if attempt == 1:  # 只在第一次嘗試後重新登入
-                    self.logger.log(f"嘗試重新登入以恢復...")
-                    if self.auth_service.login(settings, force=True):
-                        continue  # 重新嘗試
-                break
+            
+            # 需要重新登入時，在重新登入次數和預算允許的情況下重試
+            if category == RELOGIN:
+                session = self._relogin(auth_service, settings, policy, budget, relogins, operation_type)
+                relogins += 1
+                if session is None:
+                    break
+                continue
         
         # 所有重試都失敗了
-        error_msg = f"{operation_type}操作失敗，已重試{attempt}次"
+        error_msg = f"{operation_type}操作失敗，已嘗試{attempt}次，耗時{budget.elapsed():.1f}秒"
         if last_error:
             error_msg += f"，最後錯誤: {str(last_error)}"
         self.logger.log(error_msg)
@@ -256,18 +381,67 @@ class TaskService:
         self._handle_task_failure(task, error_msg)
         return False
     
-    def _apply_request_throttling(self):
-        """控制請求頻率，避免發送過於頻繁的請求"""
-        if self.last_request_time:
-            elapsed = (datetime.datetime.now() - self.last_request_time).total_seconds()
-            if elapsed < self.min_request_interval:
-                sleep_time = self.min_request_interval - elapsed + (random.random() * 0.5)  # 添加一些隨機抖動
-                self.logger.log(f"控制請求頻率，等待 {sleep_time:.2f} 秒...")
-                time.sleep(sleep_time)
+    def _classify_response(self, response, policy):
+        """分類簽到/簽退響應
+        
+        API正常時返回JSON，因此先嘗試解析JSON，只有解析失敗時才掃描響應文本
+        判斷是否被重定向到登入頁面。後端的JSON響應有時標為text/html，
+        所以不依賴Content-Type；HTML內容在第一個字元就會解析失敗，成本很低。
+        
+        Args:
+            response: 響應對象
+            policy: 重試策略，用於分類狀態碼
+            
+        Returns:
+            tuple: (分類, JSON結果)，分類為None表示成功，否則為RELOGIN、RETRYABLE或FATAL
+        """
+        try:
+            result = response.json()
+        except ValueError:
+            pass
+        else:
+            category = policy.classify_status(response.status_code)
+            return category, (result if category is None else None)
+        
+        # 非JSON響應: 會話失效時伺服器返回登入表單
+        text = response.text
+        if "login_id" in text and "login_pwd" in text:
+            return RELOGIN, None
+        return policy.classify_status(response.status_code) or FATAL, None
+    
+    def _relogin(self, auth_service, settings, policy, budget, relogins, operation_type):
+        """在重試過程中重新登入
+        
+        Args:
+            auth_service: 認證服務
+            settings: 設定字典
+            policy: 重試策略
+            budget: 操作的時間預算
+            relogins: 本次操作已重新登入的次數
+            operation_type: 操作類型，用於日誌
+            
+        Returns:
+            Session: 重新登入後的會話，無法重新登入時返回None
+        """
+        if relogins >= policy.max_relogins:
+            self.logger.log(f"{operation_type}操作已重新登入 {relogins} 次，不再重試")
+            return None
+        
+        timeout = policy.attempt_timeout(budget)
+        if timeout is None:
+            self.logger.log(f"{operation_type}操作剩餘時間不足，無法重新登入")
+            return None
+        
+        if not auth_service.login(settings, force=True, timeout=timeout):
+            self.logger.log(f"重新登入失敗，無法繼續{operation_type}操作")
+            return None
+        # 登入會創建新的會話對象
+        return auth_service.get_session()
     
-    def _check_session_cookie(self, session):
+    def _check_session_cookie(self, session, auth_service=None):
         """檢查會話是否包含必要的cookie（特別是PHPSESSID）"""
-        for cookie_name in self.auth_service.important_cookies:
+        auth_service = auth_service or self.auth_service
+        for cookie_name in auth_service.important_cookies:
             if cookie_name not in session.cookies.keys():
                 return False
         return True
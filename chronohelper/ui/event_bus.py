@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+界面事件總線 - 將後台線程的界面更新轉交給Tk主線程
+
+Tk不是線程安全的，調度器、請求隊列等後台線程只能發布事件，由主線程上的
+root.after泵每幀取出並分發。同一幀內的同類事件按註冊時指定的方式合併，
+例如多次任務變更只觸發一次列表刷新，多條日誌一次插入文本框。
+"""
+
+import queue
+
+# 事件類型
+TASKS_CHANGED = "tasks_changed"    # 任務列表需要刷新，負載為任務ID或None（全部）
+STATUS_CHANGED = "status_changed"  # 狀態欄文字，負載為文字
+LOG_LINE = "log_line"              # 日誌行，負載為已格式化的日誌文字
+NOTIFICATION = "notification"      # 桌面通知，負載為 (標題, 內容, 顯示毫秒數)
+WARNING = "warning"                # 警告對話框，負載為 (標題, 內容)
+STATS_CHANGED = "stats_changed"    # 狀態面板統計需要刷新，無負載
+
+# 合併方式
+COALESCE_NONE = "none"    # 每個事件單獨調用處理函數
+COALESCE_LAST = "last"    # 只以最後一個負載調用一次
+COALESCE_BATCH = "batch"  # 以本幀所有負載的列表調用一次
+
+class UIEventBus:
+    """線程安全的界面事件總線，發布可在任意線程調用，分發只在Tk主線程進行"""
+
+    def __init__(self, root, interval=50, max_events=1000):
+        """初始化事件總線
+
+        Args:
+            root: Tk根窗口，用於註冊after回調
+            interval: 泵的間隔（毫秒）
+            max_events: 每幀最多處理的事件數，超出的留到下一幀，避免長時間佔用主線程
+        """
+        self.root = root
+        self.interval = interval
+        self.max_events = max_events
+        self.queue = queue.SimpleQueue()
+        self.handlers = {}  # 事件類型 -> (處理函數, 合併方式)
+        self.running = False
+        self.after_id = None
+
+    def register(self, kind, handler, coalesce=COALESCE_NONE):
+        """註冊事件處理函數，每種事件只有一個處理函數
+
+        Args:
+            kind: 事件類型
+            handler: 處理函數，COALESCE_BATCH時接收負載列表，其他方式接收單個負載
+            coalesce: 同一幀內同類事件的合併方式
+        """
+        self.handlers[kind] = (handler, coalesce)
+
+    def publish(self, kind, payload=None):
+        """發布事件，可在任意線程調用
+
+        Args:
+            kind: 事件類型
+            payload: 事件負載
+        """
+        self.queue.put((kind, payload))
+
+    def start(self):
+        """在主線程上啟動事件泵"""
+        if not self.running:
+            self.running = True
+            self.after_id = self.root.after(self.interval, self._pump)
+
+    def stop(self):
+        """停止事件泵，之後發布的事件不再分發"""
+        self.running = False
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def flush(self):
+        """立即在當前（主）線程分發所有待處理事件"""
+        self._dispatch(self._drain(None))
+
+    def _drain(self, limit):
+        """取出待處理事件並按類型分組，保持各類型首次出現的順序
+
+        Args:
+            limit: 最多取出的事件數，None表示全部
+
+        Returns:
+            dict: 事件類型 -> 負載列表
+        """
+        grouped = {}
+        count = 0
+        while limit is None or count < limit:
+            try:
+                kind, payload = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            grouped.setdefault(kind, []).append(payload)
+            count += 1
+        return grouped
+
+    def _dispatch(self, grouped):
+        """按合併方式調用處理函數，單次調用出錯不影響其他事件，包括同類的其他事件"""
+        for kind, payloads in grouped.items():
+            entry = self.handlers.get(kind)
+            if entry is None:
+                continue
+            handler, coalesce = entry
+            if coalesce == COALESCE_BATCH:
+                calls = (payloads,)
+            elif coalesce == COALESCE_LAST:
+                calls = (payloads[-1],)
+            else:
+                calls = payloads
+            for payload in calls:
+                try:
+                    handler(payload)
+                except Exception as e:
+                    # 不能經日誌記錄器輸出，否則錯誤日誌本身又會進入總線
+                    print(f"處理界面事件 {kind} 時出錯: {str(e)}")
+
+    def _pump(self):
+        """主線程上的事件泵，每幀分發一次"""
+        self.after_id = None
+        if not self.running:
+            return
+        self._dispatch(self._drain(self.max_events))
+        if self.running:
+            self.after_id = self.root.after(self.interval, self._pump)
@@ -3,15 +3,232 @@
 UI輔助工具類 - 提供通用UI組件和工具函數
 """
 
+import weakref
 import tkinter as tk
 from chronohelper.config.colors import COLORS
 
+class TooltipManager:
+    """
+    工具提示管理器 - 每個根窗口共用一個提示窗口和一個懸停計時器
+    
+    元件只需註冊提示文字（字符串或返回字符串的函數），事件由同一個綁定標籤統一處理，
+    不再為每個元件建立計時器和事件回調；提示窗口創建一次後只隱藏、移動和更換文字，
+    滑鼠移動時不會反覆創建和銷毀窗口。
+    
+    用法:
+        manager = TooltipManager.for_widget(mybutton)
+        manager.register(mybutton, "這是一個按鈕")
+        manager.register(mylabel, lambda: current_status_text())
+    """
+    BINDTAG = "ChronoTooltip"  # 已註冊元件共用的綁定標籤
+    
+    _managers = weakref.WeakKeyDictionary()  # 根窗口 -> 管理器
+    
+    @classmethod
+    def for_widget(cls, widget):
+        """
+        獲取元件所在根窗口的提示管理器，首次使用時創建
+        
+        Args:
+            widget: 任意tkinter元件
+            
+        Returns:
+            TooltipManager: 該根窗口的提示管理器
+        """
+        root = widget._root()
+        manager = cls._managers.get(root)
+        if manager is None:
+            manager = cls._managers[root] = cls(root)
+        return manager
+    
+    def __init__(self, root):
+        """
+        初始化提示管理器，應通過for_widget獲取而不是直接創建
+        
+        Args:
+            root: Tk根窗口
+        """
+        self.root = root
+        self.entries = {}  # 元件路徑 -> (文字提供者, 延遲毫秒)
+        self.tip_window = None
+        self.tip_label = None
+        self.timer = None
+        self.current = None  # 目前懸停的 (元件路徑, 區域鍵)
+        
+        # 所有已註冊元件的事件只綁定一次
+        root.bind_class(self.BINDTAG, "<Enter>", self._on_enter)
+        root.bind_class(self.BINDTAG, "<Leave>", lambda e: self.hide())
+        root.bind_class(self.BINDTAG, "<ButtonPress>", lambda e: self.hide())  # 任何滑鼠按下都隱藏提示
+        root.bind_class(self.BINDTAG, "<Destroy>", self._on_destroy)
+    
+    def register(self, widget, provider, delay=500):
+        """
+        為元件註冊提示，重複註冊時更新提示文字和延遲
+        
+        Args:
+            widget: 要添加提示的tkinter部件
+            provider: 提示文字，或在顯示時調用以取得文字的函數；文字為空時不顯示
+            delay: 顯示提示前的延遲（毫秒）
+        """
+        path = str(widget)
+        if path not in self.entries:
+            # 放在元件自身標籤之後，元件的Enter/Leave綁定（如按鈕懸停效果）仍先執行
+            tags = widget.bindtags()
+            widget.bindtags(tags[:1] + (self.BINDTAG,) + tags[1:])
+        self.entries[path] = (provider, delay)
+    
+    def unregister(self, widget):
+        """
+        移除元件的提示
+        
+        Args:
+            widget: 已註冊的元件
+        """
+        path = str(widget)
+        if self.entries.pop(path, None) is not None:
+            widget.bindtags(tuple(tag for tag in widget.bindtags() if tag != self.BINDTAG))
+            if self.current and self.current[0] == path:
+                self.hide()
+    
+    def hover(self, widget, key, provider=None, delay=500):
+        """
+        報告元件內自行判斷的懸停區域，用於在Canvas上繪製的按鈕等沒有獨立元件的區域
+        
+        同一區域重複報告時不重新計時；key為None表示離開所有區域。
+        
+        Args:
+            widget: 區域所在的元件
+            key: 區域的唯一鍵，None表示沒有懸停區域
+            provider: 提示文字或返回文字的函數
+            delay: 顯示提示前的延遲（毫秒）
+        """
+        current = (str(widget), key) if key is not None else None
+        if current == self.current:
+            return
+        self.hide()
+        if current is not None:
+            self._schedule(current, provider, delay, widget)
+    
+    def show_now(self, widget):
+        """
+        立即顯示已註冊元件的提示
+        
+        Args:
+            widget: 已註冊的元件
+        """
+        path = str(widget)
+        entry = self.entries.get(path)
+        if entry is not None:
+            self.hide()
+            self.current = (path, None)
+            self._show(widget, entry[0], False)
+    
+    def hide(self):
+        """取消待顯示的提示並隱藏提示窗口"""
+        self.current = None
+        if self.timer is not None:
+            try:
+                self.root.after_cancel(self.timer)
+            except Exception:
+                pass  # 忽略可能的錯誤
+            self.timer = None
+        if self.tip_window is not None:
+            try:
+                self.tip_window.withdraw()
+            except Exception:
+                self.tip_window = None  # 窗口已被銷毀，下次重新創建
+    
+    def _on_enter(self, event):
+        """已註冊元件的鼠標進入事件"""
+        path = str(event.widget)
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        self.hide()
+        self._schedule((path, None), entry[0], entry[1], event.widget)
+        return None
+    
+    def _on_destroy(self, event):
+        """元件銷毀時移除註冊"""
+        path = str(event.widget)
+        self.entries.pop(path, None)
+        if self.current and self.current[0] == path:
+            self.hide()
+    
+    def _schedule(self, current, provider, delay, widget):
+        """以唯一的懸停計時器安排延遲顯示"""
+        self.current = current
+        region = current[1] is not None
+        self.timer = self.root.after(delay, lambda: self._fire(current, widget, provider, region))
+    
+    def _fire(self, current, widget, provider, region):
+        """計時器到期，懸停目標沒有變化時顯示提示"""
+        self.timer = None
+        if current == self.current:
+            self._show(widget, provider, region)
+    
+    def _show(self, widget, provider, region):
+        """
+        重新設置共用提示窗口的文字和位置並顯示
+        
+        Args:
+            widget: 提示所屬的元件
+            provider: 提示文字或返回文字的函數
+            region: 是否為元件內的懸停區域，區域提示顯示在滑鼠旁
+        """
+        try:
+            text = provider() if callable(provider) else provider
+            if not text or not widget.winfo_exists():
+                return
+            
+            if region:
+                # 區域由調用方判斷，滑鼠已離開元件時不再顯示
+                x, y = widget.winfo_pointerxy()
+                if widget.winfo_containing(x, y) is not widget:
+                    return
+                x += 15
+                y += 15
+            else:
+                x = widget.winfo_rootx() + 20
+                y = widget.winfo_rooty() + 20
+            
+            if self.tip_window is None:
+                self._create_window()
+            self.tip_label.config(text=text)
+            self.tip_window.wm_geometry(f"+{x}+{y}")
+            self.tip_window.deiconify()
+            self.tip_window.lift()
+        except Exception:
+            # 顯示失敗時不影響元件本身的操作
+            self.hide()
+    
+    def _create_window(self):
+        """創建共用的提示窗口（初始隱藏）"""
+        self.tip_window = tw = tk.Toplevel(self.root)
+        tw.withdraw()
+        tw.wm_overrideredirect(True)  # 無邊框窗口
+        tw.attributes("-topmost", True)  # 確保提示顯示在頂層
+        
+        # 使用現代化風格
+        frame = tk.Frame(tw, bg=COLORS["card"], bd=1, relief=tk.SOLID)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tip_label = tk.Label(frame, justify=tk.LEFT,
+                                  background=COLORS["card"], fg=COLORS["text"],
+                                  wraplength=250, padx=10, pady=10,
+                                  font=("Arial", "9", "normal"))
+        self.tip_label.pack()
+        
+        # 增加關閉提示的事件綁定
+        tw.bind("<ButtonPress>", lambda e: self.hide())
+
 class SettingTooltip:
     """
     設定項工具提示類 - 為UI元素添加懸停提示
     
     這個類可以為任何 tkinter 小部件添加懸停提示，當鼠標移動到元素上時顯示提示文本。
     可以選擇性地顯示一個問號圖標來指示這個元素有提示信息。
+    提示窗口和計時器由所在根窗口的TooltipManager共用，修改text屬性即可更新提示文字。
     
     用法:
         # 基本用法 - 僅添加懸停提示
@@ -29,30 +246,22 @@ class SettingTooltip:
             widget: 要添加提示的tkinter部件
             text: 提示文本內容
             delay: 顯示提示前的延遲（毫秒）
-            button_safe: 是否針對按鈕進行特殊處理，避免干擾按鈕點擊
+            button_safe: 保留參數；按下滑鼠總是隱藏提示，不會干擾按鈕點擊
         """
         self.widget = widget
         self.text = text
         self.delay = delay
-        self.tip_window = None
-        self.tip_timer = None
-        
-        # 確保不干擾按鈕的點擊事件
         self.button_safe = button_safe
-        
-        # 適配不同類型的部件
-        if isinstance(widget, tk.Button) or "Button" in widget.__class__.__name__:
-            # 按鈕需要特殊處理，避免干擾點擊
-            self.button_safe = True
-        
-        # 使用add="+"參數添加事件而不是替換
-        self.widget.bind("<Enter>", self._schedule_show, add="+")
-        self.widget.bind("<Leave>", self._on_leave, add="+")
-        self.widget.bind("<ButtonPress>", self._on_button_press, add="+")  # 任何滑鼠按下都隱藏提示
+        self.manager = TooltipManager.for_widget(widget)
+        self.manager.register(widget, self._get_text, delay)
         
         # 初始化問號圖標，但不立即顯示
         self.hint_label = None
     
+    def _get_text(self):
+        """顯示時才讀取文字，因此之後修改text屬性也會生效"""
+        return self.text
+    
     def place_hint(self, row, column):
         """
         放置問號提示圖標（用於網格布局）
@@ -64,65 +273,13 @@ class SettingTooltip:
         if not self.hint_label:
             self.hint_label = tk.Label(self.widget.master, text="ⓘ", fg=COLORS["primary"], 
                                      bg=COLORS["card"], cursor="hand2")
-            self.hint_label.bind("<Enter>", self._schedule_show, add="+")  # 使用add="+"參數
-            self.hint_label.bind("<Leave>", self._on_leave, add="+")
+            self.manager.register(self.hint_label, self._get_text, self.delay)
         
         self.hint_label.grid(row=row, column=column, padx=(2, 0))
     
-    def _schedule_show(self, event=None):
-        """安排延遲顯示提示窗口
-        
-        Args:
-            event: 觸發事件對象
-        """
-        # 取消任何現有的定時器
-        if self.tip_timer:
-            self.widget.after_cancel(self.tip_timer)
-            self.tip_timer = None
-            
-        # 如果是右鍵事件，不顯示提示
-        if event and hasattr(event, 'num') and event.num == 3:
-            return None
-            
-        # 安排延遲顯示
-        self.tip_timer = self.widget.after(self.delay, lambda: self.show_tip(event))
-        return None
-    
-    def _on_leave(self, event=None):
-        """處理鼠標離開事件
-        
-        Args:
-            event: 觸發事件對象
-        """
-        # 取消定時器
-        if self.tip_timer:
-            self.widget.after_cancel(self.tip_timer)
-            self.tip_timer = None
-        
-        # 隱藏提示
-        self.hide_tip(event)
-        return None
-    
-    def _on_button_press(self, event=None):
-        """處理按鈕按下事件
-        
-        Args:
-            event: 觸發事件對象
-        """
-        # 取消定時器並隱藏提示
-        if self.tip_timer:
-            self.widget.after_cancel(self.tip_timer)
-            self.tip_timer = None
-        
-        # 隱藏提示
-        self.hide_tip(event)
-        
-        # 不干擾原始事件
-        return None
-    
     def show_tip(self, event=None):
         """
-        顯示提示窗口
+        立即顯示提示窗口
         
         Args:
             event: 觸發事件對象
@@ -130,81 +287,7 @@ class SettingTooltip:
         Returns:
             None: 不阻止事件繼續傳播
         """
-        # 如果是右鍵事件，不顯示提示
-        if event and hasattr(event, 'num') and event.num == 3:  # 3 表示右鍵
-            return None
-            
-        # 如果提示已經顯示或沒有文本，則退出
-        if self.tip_window or not self.text:
-            return None
-        
-        # 對於按鈕，避免在點擊時顯示提示
-        if self.button_safe and event and hasattr(event, 'type') and event.type.startswith('Button'):
-            return None
-            
-        # 計算提示窗口顯示位置
-        x = y = 0
-        if event and hasattr(event, 'widget'):
-            # 根據事件的小部件獲取位置
-            try:
-                event_widget = event.widget
-                # 嘗試獲取精確位置
-                if hasattr(event_widget, "bbox") and hasattr(event_widget, "index"):
-                    try:
-                        x, y, _, _ = event_widget.bbox("insert")
-                        x += event_widget.winfo_rootx() + 25
-                        y += event_widget.winfo_rooty() + 25
-                    except:
-                        # 如果無法獲取插入點，使用小部件位置
-                        x = event_widget.winfo_rootx() + event_widget.winfo_width() + 5
-                        y = event_widget.winfo_rooty() + 5
-                else:
-                    # 對於無法獲取精確位置的元件，使用簡單定位
-                    x = event_widget.winfo_rootx() + 20
-                    y = event_widget.winfo_rooty() + 20
-            except Exception:
-                # 故障安全模式：使用小部件的左上角
-                try:
-                    x = event.widget.winfo_rootx() + 15
-                    y = event.widget.winfo_rooty() + 10
-                except:
-                    # 如果所有方法都失敗，使用默認位置
-                    x = 100
-                    y = 100
-        else:
-            # 如果沒有事件，使用小部件的位置
-            try:
-                x = self.widget.winfo_rootx() + self.widget.winfo_width()
-                y = self.widget.winfo_rooty() + 10
-            except:
-                # 如果獲取位置失敗，使用默認位置
-                x = 100
-                y = 100
-        
-        # 創建工具提示窗口
-        try:
-            self.tip_window = tw = tk.Toplevel(self.widget)
-            tw.wm_overrideredirect(True)  # 無邊框窗口
-            tw.wm_geometry(f"+{x}+{y}")
-            tw.attributes("-topmost", True)  # 確保提示顯示在頂層
-            
-            # 使用現代化風格
-            frame = tk.Frame(tw, bg=COLORS["card"], bd=1, relief=tk.SOLID)
-            frame.pack(fill=tk.BOTH, expand=True)
-            
-            label = tk.Label(frame, text=self.text, justify=tk.LEFT,
-                          background=COLORS["card"], fg=COLORS["text"],
-                          wraplength=250, padx=10, pady=10,
-                          font=("Arial", "9", "normal"))
-            label.pack()
-            
-            # 增加關閉提示的事件綁定
-            tw.bind("<ButtonPress>", lambda e: self.hide_tip())
-        except Exception:
-            # 如果創建提示窗口失敗，確保不會留下殘留狀態
-            self.tip_window = None
-        
-        # 不阻止事件繼續傳播
+        self.manager.show_now(self.widget)
         return None
     
     def hide_tip(self, event=None):
@@ -217,29 +300,7 @@ class SettingTooltip:
         Returns:
             None: 不阻止事件繼續傳播
         """
-        # 如果是右鍵事件，允許事件繼續傳播
-        if event and hasattr(event, 'num') and event.num == 3:  # 3 表示右鍵
-            return None
-        
-        # 取消任何存在的計時器
-        if self.tip_timer:
-            try:
-                self.widget.after_cancel(self.tip_timer)
-            except Exception:
-                pass  # 忽略可能的錯誤
-            self.tip_timer = None
-            
-        # 銷毀提示窗口
-        try:
-            tw = self.tip_window
-            self.tip_window = None
-            if tw and tw.winfo_exists():
-                tw.destroy()
-        except Exception:
-            # 如果銷毀過程中出現錯誤，強制清除引用
-            self.tip_window = None
-            
-        # 不阻止事件繼續傳播
+        self.manager.hide()
         return None
 
 def add_tooltip(widget, text, row=None, column=None, delay=500, button_safe=True):
@@ -3,19 +3,38 @@
 通知窗口
 """
 
+import collections
+import time
 import tkinter as tk
 from chronohelper.config.colors import COLORS
+from chronohelper.utils.rate_limiter import TokenBucket
 
 class NotificationWindow(tk.Toplevel):
-    """自定義通知窗口"""
-    def __init__(self, title, message, duration=5000):
-        super().__init__()
+    """自定義通知窗口，由NotificationManager創建並重複使用"""
+    WIDTH = 300
+    HEIGHT = 120  # 增加高度以容納更多文本
+    
+    def __init__(self, master=None, on_close=None):
+        """
+        創建隱藏的通知窗口
+        
+        Args:
+            master: 父窗口
+            on_close: on_close(window)在用戶點擊關閉時調用
+        """
+        super().__init__(master)
+        self.withdraw()
         self.title("")
         self.overrideredirect(True)  # 無邊框窗口
-        self.geometry("300x120")  # 增加高度以容納更多文本
         self.configure(bg=COLORS["card"], bd=1, relief=tk.SOLID)
         self.attributes("-topmost", True)  # 置頂顯示
         
+        self.heading = None  # 目前顯示的標題（不含合併次數）
+        self.count = 0  # 合併的通知數
+        self.shown_at = 0.0  # 首次顯示的時間（time.monotonic）
+        self.close_timer = None
+        self.position = None
+        
         # 創建主框架以確保正確排列
         main_frame = tk.Frame(self, bg=COLORS["card"])
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -24,29 +43,183 @@ class NotificationWindow(tk.Toplevel):
         header_frame = tk.Frame(main_frame, bg=COLORS["primary"], height=25)
         header_frame.pack(fill=tk.X)
         
-        tk.Label(header_frame, text=title, fg="white", bg=COLORS["primary"], 
-                 font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10, pady=3)
+        self.title_label = tk.Label(header_frame, fg="white", bg=COLORS["primary"],
+                                    font=("Arial", 10, "bold"))
+        self.title_label.pack(side=tk.LEFT, padx=10, pady=3)
         
-        close_btn = tk.Label(header_frame, text="×", fg="white", bg=COLORS["primary"], 
+        close_btn = tk.Label(header_frame, text="×", fg="white", bg=COLORS["primary"],
                            font=("Arial", 12, "bold"))
         close_btn.pack(side=tk.RIGHT, padx=10, pady=2)
-        close_btn.bind("<Button-1>", lambda e: self.destroy())
+        close_btn.bind("<Button-1>", lambda e: on_close(self) if on_close else self.withdraw())
         
         # 內容區域
         content_frame = tk.Frame(main_frame, bg=COLORS["card"], padx=10, pady=15)
         content_frame.pack(fill=tk.BOTH, expand=True)
         
-        message_label = tk.Label(content_frame, text=message, bg=COLORS["card"], fg=COLORS["text"], 
-                 wraplength=280, justify=tk.LEFT)
-        message_label.pack(fill=tk.BOTH, expand=True)
+        self.message_label = tk.Label(content_frame, bg=COLORS["card"], fg=COLORS["text"],
+                                      wraplength=280, justify=tk.LEFT)
+        self.message_label.pack(fill=tk.BOTH, expand=True)
+    
+    def set_content(self, title, message, count=1):
+        """
+        更新標題和內容
+        
+        Args:
+            title: 標題
+            message: 內容
+            count: 合併的通知數，大於1時顯示在標題後
+        """
+        self.heading = title
+        self.count = count
+        self.title_label.config(text=f"{title} (×{count})" if count > 1 else title)
+        self.message_label.config(text=message)
+    
+    def show_at(self, x, y):
+        """在指定螢幕位置顯示，位置不變時不重新設置幾何"""
+        if self.position != (x, y):
+            self.position = (x, y)
+            self.geometry(f"{self.WIDTH}x{self.HEIGHT}+{x}+{y}")
+        self.deiconify()
+
+class NotificationManager:
+    """
+    通知管理器 - 重用通知窗口並限制通知頻率
+    
+    顯示中的通知在螢幕右下角向上堆疊，最多同時顯示max_visible個；標題相同的通知合併到
+    已顯示或排隊中的同一條通知（更新內容並顯示次數）。新窗口按令牌桶限制的頻率顯示，
+    超出的通知按到達順序排隊，窗口關閉或令牌補充後再顯示。關閉的窗口隱藏後放回池中重用。
+    只應在Tk主線程中使用。
+    """
+    MARGIN = 20  # 與螢幕邊緣的距離
+    SPACING = 10  # 堆疊窗口之間的距離
+    
+    def __init__(self, root, max_visible=3, min_interval=2.0, coalesce_window=30.0, max_queue=20):
+        """
+        初始化通知管理器
+        
+        Args:
+            root: Tk根窗口
+            max_visible: 同時顯示的通知上限，也是連續通知的突發上限
+            min_interval: 新通知窗口之間的平均最小間隔（秒）
+            coalesce_window: 已顯示的通知在首次顯示後多少秒內可以合併同標題的通知
+            max_queue: 排隊通知的上限，超出時丟棄最舊的
+        """
+        self.root = root
+        self.max_visible = max(1, int(max_visible))
+        self.min_interval = max(0.1, float(min_interval))
+        self.bucket = TokenBucket(1.0 / self.min_interval, self.max_visible)
+        self.coalesce_window = coalesce_window
+        self.max_queue = max(1, int(max_queue))
+        
+        self.visible = []  # 顯示中的窗口，按堆疊順序（最下方在前）
+        self.pool = []  # 已隱藏可重用的窗口
+        self.queue = collections.OrderedDict()  # 標題 -> [內容, 顯示毫秒數, 合併次數]
+        self.drain_timer = None
+        self.screen_size = None
+    
+    def notify(self, title, message, duration=5000):
+        """
+        顯示通知，可能合併到同標題的通知或排隊稍後顯示
+        
+        Args:
+            title: 標題
+            message: 內容
+            duration: 顯示時間（毫秒）
+        """
+        now = time.monotonic()
+        for window in self.visible:
+            if window.heading == title and now - window.shown_at <= self.coalesce_window:
+                window.set_content(title, message, window.count + 1)
+                self._schedule_close(window, duration)
+                return
+        
+        pending = self.queue.get(title)
+        if pending is not None:
+            pending[0] = message
+            pending[1] = duration
+            pending[2] += 1
+            return
+        
+        if not self.queue and len(self.visible) < self.max_visible and self.bucket.try_acquire():
+            self._show(title, message, duration, 1)
+            return
         
-        # 放在螢幕右下角
-        self.update_idletasks()
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        x = screen_width - 320
-        y = screen_height - 140  # 調整位置以適應更高的窗口
-        self.geometry(f"+{x}+{y}")
+        if len(self.queue) >= self.max_queue:
+            self.queue.popitem(last=False)  # 丟棄最舊的通知
+        self.queue[title] = [message, duration, 1]
+        self._schedule_drain()
+    
+    def clear(self):
+        """關閉所有通知並清空隊列"""
+        self.queue.clear()
+        if self.drain_timer is not None:
+            self.root.after_cancel(self.drain_timer)
+            self.drain_timer = None
+        for window in list(self.visible):
+            self.close(window)
+    
+    def close(self, window):
+        """
+        關閉通知窗口並放回池中，其餘窗口重新堆疊
         
-        # 設置自動關閉
-        self.after(duration, self.destroy)
+        Args:
+            window: 顯示中的通知窗口
+        """
+        if window not in self.visible:
+            return
+        if window.close_timer is not None:
+            self.root.after_cancel(window.close_timer)
+            window.close_timer = None
+        window.withdraw()
+        self.visible.remove(window)
+        if len(self.pool) < self.max_visible:
+            self.pool.append(window)
+        else:
+            window.destroy()
+        self._restack()
+        self._schedule_drain()
+    
+    def _show(self, title, message, duration, count):
+        """從池中取出窗口顯示通知"""
+        window = self.pool.pop() if self.pool else NotificationWindow(self.root, on_close=self.close)
+        window.set_content(title, message, count)
+        window.shown_at = time.monotonic()
+        self.visible.append(window)
+        window.show_at(*self._position(len(self.visible) - 1))
+        self._schedule_close(window, duration)
+    
+    def _schedule_close(self, window, duration):
+        """重新開始窗口的自動關閉計時"""
+        if window.close_timer is not None:
+            self.root.after_cancel(window.close_timer)
+        window.close_timer = self.root.after(duration, lambda: self.close(window))
+    
+    def _position(self, index):
+        """第index個堆疊位置的螢幕座標，螢幕尺寸只查詢一次"""
+        if self.screen_size is None:
+            self.screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        screen_width, screen_height = self.screen_size
+        x = screen_width - NotificationWindow.WIDTH - self.MARGIN
+        y = screen_height - self.MARGIN - (index + 1) * NotificationWindow.HEIGHT - index * self.SPACING
+        return x, y
+    
+    def _restack(self):
+        """窗口關閉後讓上方的窗口下移，位置不變的窗口不會移動"""
+        for index, window in enumerate(self.visible):
+            window.show_at(*self._position(index))
+    
+    def _schedule_drain(self):
+        """有排隊通知且有空位時安排顯示，等待窗口關閉時不設計時器"""
+        if self.queue and self.drain_timer is None and len(self.visible) < self.max_visible:
+            self.drain_timer = self.root.after(0, self._drain)
+    
+    def _drain(self):
+        """按頻率限制顯示排隊的通知"""
+        self.drain_timer = None
+        while self.queue and len(self.visible) < self.max_visible:
+            if not self.bucket.try_acquire():
+                # 令牌不足，等補充一個令牌後再試
+                self.drain_timer = self.root.after(int(self.min_interval * 1000), self._drain)
+                return
+            title, (message, duration, count) = self.queue.popitem(last=False)
+            self._show(title, message, duration, count)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+輕量任務卡片渲染器 - 在同一個Canvas上以繪圖項目繪製所有任務卡片
+"""
+
+import bisect
+
+from chronohelper.config.colors import COLORS
+from chronohelper.ui.helpers import TooltipManager
+from chronohelper.ui.task_card import (get_task_status_info, get_task_status_tooltip,
+                                       build_task_context_menu)
+from chronohelper.ui.task_list import VirtualTaskList
+
+# 卡片內部佈局（像素，相對卡片左上角）
+PADDING = 15        # 卡片內邊距
+TITLE_Y = 15        # 標題和狀態標籤
+INFO_Y = 50         # 日期和時間
+STATUS_Y = 78       # 簽到/簽退指示燈和複選框
+WARNING_Y = 104     # 環境受限提示（只在任務受限時顯示）
+WARNING_HEIGHT = 24
+WARNING_SHIFT = 34  # 顯示環境受限提示時按鈕下移的距離
+BUTTON_Y = 108      # 按鈕
+BUTTON_HEIGHT = 28
+CARD_HEIGHT = BUTTON_Y + BUTTON_HEIGHT + PADDING
+CHECK_WIDTH = 70    # 複選框（含文字）的寬度
+
+# 按鈕: (名稱, 文字, 背景色, 懸停提示)
+BUTTONS = (
+    ("sign_in", "簽到", COLORS["primary"], "執行簽到操作\n系統會自動檢查校內網絡環境"),
+    ("sign_out", "簽退", COLORS["secondary"], "執行簽退操作\n需要先完成簽到才能簽退"),
+    ("delete", "刪除", COLORS["warning"], "刪除此任務\n此操作無法撤銷"),
+    ("edit", "編輯", COLORS["primary"], "編輯此任務的詳細信息"),
+)
+BUTTON_TOOLTIPS = {name: tooltip for name, _, _, tooltip in BUTTONS}
+
+def card_regions(width, restricted):
+    """卡片上可點擊區域的位置，繪製和點擊判斷共用同一份佈局
+
+    Args:
+        width: 卡片寬度
+        restricted: 是否顯示環境受限提示
+
+    Returns:
+        dict: 區域名稱 -> (x0, y0, x1, y1)，相對卡片左上角
+    """
+    right = width - PADDING
+    button_y = BUTTON_Y + (WARNING_SHIFT if restricted else 0)
+    return {
+        "sign_in_check": (right - 2 * CHECK_WIDTH - 10, STATUS_Y, right - CHECK_WIDTH - 10, STATUS_Y + 18),
+        "sign_out_check": (right - CHECK_WIDTH, STATUS_Y, right, STATUS_Y + 18),
+        "sign_in": (PADDING, button_y, PADDING + 70, button_y + BUTTON_HEIGHT),
+        "sign_out": (PADDING + 80, button_y, PADDING + 150, button_y + BUTTON_HEIGHT),
+        "delete": (right - 130, button_y, right - 70, button_y + BUTTON_HEIGHT),
+        "edit": (right - 60, button_y, right, button_y + BUTTON_HEIGHT),
+    }
+
+class CanvasCardSlot:
+    """一張以Canvas繪圖項目組成的卡片，可重新綁定到其他任務"""
+
+    def __init__(self, canvas, tag):
+        """在canvas上創建卡片的所有繪圖項目（初始隱藏）
+
+        Args:
+            canvas: 所在的Canvas
+            tag: 本卡片所有項目共用的標籤，用於整體隱藏和移動
+        """
+        self.tag = tag
+        self.task = None
+        self.top = None  # 卡片頂部的Canvas座標
+        self.width = None
+        self.restricted = None
+        tags = (tag, "task_card")
+        create = lambda kind, **kw: getattr(canvas, "create_" + kind)(0, 0, 0, 0, tags=tags, **kw)
+        text = lambda **kw: canvas.create_text(0, 0, tags=tags, **kw)
+
+        self.items = {
+            "border": create("rectangle", fill=COLORS["card"], outline=COLORS["border"]),
+            "title": text(anchor="nw", font=("Arial", 12, "bold"), fill=COLORS["text"]),
+            "status_bg": create("rectangle", outline=""),
+            "status": text(anchor="ne", font=("Arial", 10), fill="white"),
+            "date": text(anchor="nw", font=("Arial", 10), fill=COLORS["text"]),
+            "time": text(anchor="ne", font=("Arial", 10), fill=COLORS["text"]),
+            "sign_in_dot": create("oval", outline=""),
+            "sign_in_label": text(anchor="nw", text="簽到", font=("Arial", 9), fill=COLORS["text"]),
+            "sign_out_dot": create("oval", outline=""),
+            "sign_out_label": text(anchor="nw", text="簽退", font=("Arial", 9), fill=COLORS["text"]),
+            "sign_in_box": create("rectangle", fill="white", outline=COLORS["light_text"]),
+            "sign_in_mark": text(anchor="center", font=("Arial", 9, "bold"), fill=COLORS["primary"]),
+            "sign_in_check": text(anchor="nw", text="已簽到", font=("Arial", 9), fill=COLORS["text"]),
+            "sign_out_box": create("rectangle", fill="white", outline=COLORS["light_text"]),
+            "sign_out_mark": text(anchor="center", font=("Arial", 9, "bold"), fill=COLORS["primary"]),
+            "sign_out_check": text(anchor="nw", text="已簽退", font=("Arial", 9), fill=COLORS["text"]),
+            "warning_bg": create("rectangle", fill=COLORS["status_warning"], outline=""),
+            "warning": text(anchor="w", text="⚠️ 環境受限", font=("Arial", 9),
+                            fill=COLORS["status_warning_text"]),
+        }
+        for name, label, color, _ in BUTTONS:
+            self.items[name + "_bg"] = create("rectangle", fill=color, outline="")
+            self.items[name] = text(anchor="center", text=label, font=("Arial", 10), fill="white")
+
+    def bind_task(self, canvas, task):
+        """更新卡片顯示的任務內容，位置由layout負責"""
+        self.task = task
+        items = self.items
+        status_text, status_color = get_task_status_info(task)
+        canvas.itemconfigure(items["title"], text=task.name)
+        canvas.itemconfigure(items["date"], text=f"日期: {task.date}")
+        canvas.itemconfigure(items["time"], text=f"時間: {task.sign_in_time} - {task.sign_out_time}")
+        canvas.itemconfigure(items["status"], text=status_text)
+        canvas.itemconfigure(items["status_bg"], fill=status_color)
+        for kind, done in (("sign_in", task.sign_in_done), ("sign_out", task.sign_out_done)):
+            canvas.itemconfigure(items[kind + "_dot"], fill="#2ecc71" if done else "#e0e0e0")
+            canvas.itemconfigure(items[kind + "_mark"], text="✓" if done else "")
+        self._fit_status(canvas)
+
+    def layout(self, canvas, left, top, width, restricted):
+        """按卡片位置、寬度和形態設置所有項目的座標"""
+        self.top = top
+        self.width = width
+        self.restricted = restricted
+        items = self.items
+        right = left + width
+        coords = canvas.coords
+
+        height = CARD_HEIGHT + (WARNING_SHIFT if restricted else 0)
+        coords(items["border"], left, top, right, top + height)
+        coords(items["title"], left + PADDING, top + TITLE_Y)
+        coords(items["status"], right - PADDING - 8, top + TITLE_Y + 2)
+        coords(items["date"], left + PADDING, top + INFO_Y)
+        coords(items["time"], right - PADDING, top + INFO_Y)
+        coords(items["sign_in_dot"], left + 17, top + STATUS_Y + 3, left + 28, top + STATUS_Y + 14)
+        coords(items["sign_in_label"], left + 33, top + STATUS_Y)
+        coords(items["sign_out_dot"], left + 70, top + STATUS_Y + 3, left + 81, top + STATUS_Y + 14)
+        coords(items["sign_out_label"], left + 86, top + STATUS_Y)
+
+        for name, (x0, y0, x1, y1) in card_regions(width, restricted).items():
+            if name.endswith("_check"):
+                kind = name[:-len("_check")]
+                coords(items[kind + "_box"], left + x0, top + y0 + 2, left + x0 + 13, top + y0 + 15)
+                coords(items[kind + "_mark"], left + x0 + 7, top + y0 + 9)
+                coords(items[name], left + x0 + 18, top + y0)
+            else:
+                coords(items[name + "_bg"], left + x0, top + y0, left + x1, top + y1)
+                coords(items[name], left + (x0 + x1) / 2, top + (y0 + y1) / 2)
+
+        coords(items["warning_bg"], left + PADDING, top + WARNING_Y, right - PADDING, top + WARNING_Y + WARNING_HEIGHT)
+        coords(items["warning"], left + PADDING + 8, top + WARNING_Y + WARNING_HEIGHT / 2)
+        state = "normal" if restricted else "hidden"
+        canvas.itemconfigure(items["warning_bg"], state=state)
+        canvas.itemconfigure(items["warning"], state=state)
+        self._fit_status(canvas)
+
+    def _fit_status(self, canvas):
+        """狀態標籤背景隨文字寬度調整"""
+        bbox = canvas.bbox(self.items["status"])
+        if bbox:
+            x0, y0, x1, y1 = bbox
+            canvas.coords(self.items["status_bg"], x0 - 8, y0 - 2, x1 + 8, y1 + 2)
+
+class CanvasTaskList(VirtualTaskList):
+    """在同一個Canvas上繪製任務卡片的虛擬化列表
+
+    與VirtualTaskList相同，只為可見區域內的任務放置卡片並回收重用，但每張卡片是一組
+    Canvas繪圖項目而不是一棵元件樹：整個列表只有一個Tk元件，不需要創建子元件、逐層綁定
+    事件或實測高度。按鈕和複選框以card_regions中的佈局做點擊判斷，懸停區域交給TooltipManager顯示提示。
+    """
+
+    TOOLTIP_DELAY = 300  # 懸停提示的延遲（毫秒）
+
+    def __init__(self, canvas, scrollbar, on_edit=None, on_delete=None, on_sign_in=None,
+                 on_sign_out=None, on_update_status=None, empty_factory=None, signature=None,
+                 overscan=2):
+        """初始化列表
+
+        Args:
+            canvas: 繪製卡片的Canvas
+            scrollbar: 縱向捲動條
+            on_edit, on_delete, on_sign_in, on_sign_out, on_update_status: 與TaskCard相同的回調，參數為任務
+            empty_factory: empty_factory(parent)創建沒有任務時顯示的元件
+            signature: signature(task)返回卡片顯示內容的簽名，None表示每次渲染都重新綁定
+            overscan: 可見區域上下額外渲染的卡片數
+        """
+        super().__init__(canvas, scrollbar, None, empty_factory, signature, overscan,
+                         CARD_HEIGHT + self.CARD_GAP)
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.on_sign_in = on_sign_in
+        self.on_sign_out = on_sign_out
+        self.on_update_status = on_update_status
+        # 卡片高度由佈局決定，不需要實測
+        self.shape_heights = {False: CARD_HEIGHT + self.CARD_GAP,
+                              True: CARD_HEIGHT + WARNING_SHIFT + self.CARD_GAP}
+        self.slot_count = 0
+        self.hover = None  # 目前懸停的 (任務ID, 區域名稱)
+        # Canvas本身沒有提示，註冊後離開Canvas或按下滑鼠時管理器會隱藏區域提示
+        self.tooltips = TooltipManager.for_widget(canvas)
+        self.tooltips.register(canvas, "")
+
+        self.canvas.tag_bind("task_card", "<Button-1>", self._on_click)
+        self.canvas.tag_bind("task_card", "<Button-3>", self._on_right_click)
+        self.canvas.tag_bind("task_card", "<Motion>", self._on_motion)
+        # 在同一張卡片的項目之間移動也會觸發Leave，按位置重新判斷而不是直接清除
+        self.canvas.tag_bind("task_card", "<Leave>", self._on_motion)
+
+    def _acquire(self):
+        """從池中取出一張卡片，池為空時創建新卡片"""
+        if self.pool:
+            return self.pool.pop()
+        self.slot_count += 1
+        tag = f"card{self.slot_count}"
+        slot = CanvasCardSlot(self.canvas, tag)
+        self.canvas.itemconfigure(tag, state="hidden")
+        return slot, tag
+
+    def _place_cards(self):
+        """只為可見區域內的任務放置卡片，已放置的卡片只在內容或位置變化時更新
+
+        Returns:
+            int: 需要重新計算位置的第一個索引（卡片形態變化），None表示無需重算
+        """
+        self._show_empty(not self.tasks)
+
+        first, last = self._visible_range()
+        wanted = {task.id for task in self.tasks[first:last]}
+        for task_id in [task_id for task_id in self.active if task_id not in wanted]:
+            self._release(task_id)
+
+        width = max(1, self.canvas.winfo_width() - 2 * self.CARD_PADX)
+        self.card_width = width
+        stale_from = None
+        for index in range(first, last):
+            task = self.tasks[index]
+            signature = self.signature(task) if self.signature else None
+            entry = self.active.get(task.id)
+            if entry is None:
+                slot, tag = self._acquire()
+                entry = self.active[task.id] = [slot, tag, None, None]
+                self.canvas.itemconfigure(tag, state="normal")
+
+            slot, tag, y, bound_signature = entry
+            rebind = slot.task is not task or signature is None or signature != bound_signature
+            shape = self._shape(task)
+            if rebind and shape != self.shapes[index]:
+                self.shapes[index] = shape
+                stale_from = index if stale_from is None else min(stale_from, index)
+
+            target_y = self.offsets[index] + self.CARD_GAP // 2
+            if y is None or slot.width != width or slot.restricted != shape:
+                slot.layout(self.canvas, self.CARD_PADX, target_y, width, shape)
+            elif target_y != y:
+                self.canvas.move(tag, 0, target_y - y)
+                slot.top = target_y
+            entry[2] = target_y
+
+            if rebind:
+                slot.bind_task(self.canvas, task)
+                entry[3] = signature
+        return stale_from
+
+    def _hit_test(self, event):
+        """找出事件位置上的任務和區域
+
+        Returns:
+            tuple: (任務, 區域名稱或None)，不在任何卡片上時返回 (None, None)
+        """
+        x = self.canvas.canvasx(event.x) - self.CARD_PADX
+        y = self.canvas.canvasy(event.y)
+        index = bisect.bisect_right(self.offsets, y) - 1
+        if not 0 <= index < len(self.tasks):
+            return None, None
+        task = self.tasks[index]
+        y -= self.offsets[index] + self.CARD_GAP // 2
+        for name, (x0, y0, x1, y1) in card_regions(self.card_width or 1, self.shapes[index]).items():
+            if x0 <= x < x1 and y0 <= y < y1:
+                return task, name
+        if y < 0:
+            return None, None
+        return task, "status" if self._in_status(task.id, event) else None
+
+    def _in_status(self, task_id, event):
+        """事件位置是否在狀態標籤上"""
+        entry = self.active.get(task_id)
+        if entry is None:
+            return False
+        bbox = self.canvas.bbox(entry[0].items["status_bg"])
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        return bool(bbox) and bbox[0] <= x < bbox[2] and bbox[1] <= y < bbox[3]
+
+    def _on_click(self, event):
+        """左鍵點擊按鈕或複選框"""
+        self._set_hover(None)
+        task, region = self._hit_test(event)
+        if task is None or region is None:
+            return
+        if region == "sign_in_check":
+            self._change_status(task, COLORS["status_info"], 200, sign_in_done=not task.sign_in_done)
+        elif region == "sign_out_check":
+            self._change_status(task, COLORS["status_info"], 200, sign_out_done=not task.sign_out_done)
+        else:
+            callback = getattr(self, "on_" + region, None)
+            if callback:
+                callback(task)
+
+    def _on_right_click(self, event):
+        """顯示任務的右鍵選單"""
+        self._set_hover(None)
+        task, _ = self._hit_test(event)
+        if task is None:
+            return None
+
+        toggle = lambda status_type, value: self._change_status(
+            task, COLORS["status_info"], 200, **{status_type + "_done": bool(value)})
+        context_menu = build_task_context_menu(
+            self.canvas, task, toggle,
+            lambda: self._change_status(task, COLORS["status_danger"], 300, sign_in_done=False,
+                                        sign_out_done=False, campus_restricted=False),
+            lambda: self._change_status(task, COLORS["status_success"], 300, sign_in_done=True,
+                                        sign_out_done=True),
+            lambda: self._change_status(task, None, 0, campus_restricted=False),
+            lambda: self.on_edit and self.on_edit(task),
+            lambda: self.on_delete and self.on_delete(task))
+
+        self._highlight(task.id, COLORS["primary_dark"])
+        try:
+            context_menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.canvas.after(100, lambda: self._highlight(task.id, None))
+        return "break"
+
+    def _change_status(self, task, flash_color, flash_ms, **changes):
+        """修改任務狀態，立即重繪卡片並通知應用程序
+
+        Args:
+            task: 任務
+            flash_color: 邊框閃爍的顏色，None表示不閃爍
+            flash_ms: 閃爍持續時間（毫秒）
+            changes: 要設置的任務屬性
+        """
+        for name, value in changes.items():
+            if name != "campus_restricted" or hasattr(task, name):
+                setattr(task, name, value)
+
+        self.update_tasks([task.id])
+        entry = self.active.get(task.id)
+        if entry is not None:
+            entry[0].bind_task(self.canvas, task)
+            entry[3] = self.signature(task) if self.signature else None
+
+        if self.on_update_status:
+            self.on_update_status(task)
+
+        if flash_color:
+            self._highlight(task.id, flash_color)
+            self.canvas.after(flash_ms, lambda: self._highlight(task.id, None))
+
+    def _highlight(self, task_id, color):
+        """改變卡片邊框以提供視覺反饋，color為None時恢復"""
+        entry = self.active.get(task_id)
+        if entry is None:
+            return
+        self.canvas.itemconfigure(entry[0].items["border"],
+                                  outline=color or COLORS["border"], width=2 if color else 1)
+
+    def _on_motion(self, event):
+        """更新游標形狀和懸停提示"""
+        task, region = self._hit_test(event)
+        self._set_hover((task.id, region) if task is not None and region else None)
+
+    def _set_hover(self, hover):
+        """更新懸停區域的游標和提示，同一區域重複報告時提示不重新計時"""
+        if hover != self.hover:
+            self.hover = hover
+            self.canvas.configure(cursor="hand2" if hover and hover[1] != "status" else "")
+        if hover is None:
+            self.tooltips.hover(self.canvas, None)
+            return
+
+        task_id, region = hover
+        if region == "status":
+            provider = lambda: self._status_tooltip(task_id)
+        else:
+            provider = BUTTON_TOOLTIPS.get(region, "")
+        self.tooltips.hover(self.canvas, hover, provider, self.TOOLTIP_DELAY)
+
+    def _status_tooltip(self, task_id):
+        """顯示時才計算狀態提示，任務已不在列表中時不顯示"""
+        index = self.index_of(task_id)
+        return get_task_status_tooltip(self.tasks[index]) if index is not None else ""
@@ -10,11 +10,160 @@ import datetime
 from tkinter import ttk
 from chronohelper.config.colors import COLORS
 from chronohelper.ui.base import ModernButton
-from chronohelper.ui.helpers import SettingTooltip, add_tooltip
+from chronohelper.ui.helpers import TooltipManager
+
+def get_task_status_info(task):
+    """根據任務狀態獲取狀態文本和顏色
+    
+    Args:
+        task: 任務
+    
+    Returns:
+        tuple: (狀態文本, 狀態顏色)
+    """
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    current_time = datetime.datetime.now().strftime("%H:%M")
+    
+    # 如果不是今天的任務
+    if task.date != today:
+        if task.date < today:
+            # 過期任務狀態顯示處理
+            if task.sign_in_done and task.sign_out_done:
+                return "已完成", COLORS["progress_done"]  # 綠色
+            elif not task.sign_in_done and not task.sign_out_done:
+                return "已過期", COLORS["warning"]  # 紅色
+            else:
+                return "部分完成", COLORS["progress_pending"]  # 橙色
+        else:
+            # 未來任務
+            return "未開始", COLORS["progress_waiting"]  # 藍色
+    
+    # 今天的任務
+    if task.sign_in_done and task.sign_out_done:
+        return "已完成", COLORS["progress_done"]  # 綠色
+    
+    if not task.sign_in_done:
+        if current_time < task.sign_in_time:
+            return "待簽到", COLORS["progress_waiting"]  # 藍色
+        else:
+            # 已過簽到時間但未簽到
+            return "待簽到(已遲到)", COLORS["warning"]  # 紅色
+    
+    # 已簽到但未簽退
+    if current_time < task.sign_out_time:
+        return "進行中", COLORS["progress_pending"]  # 橙色
+    else:
+        # 已過簽退時間但未簽退
+        return "待簽退(已遲到)", COLORS["warning"]  # 紅色
+
+def get_task_status_tooltip(task):
+    """獲取任務狀態的提示文本
+    
+    Args:
+        task: 任務
+    
+    Returns:
+        str: 提示文本
+    """
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    
+    if hasattr(task, 'campus_restricted') and task.campus_restricted:
+        return "此任務由於網絡環境限制暫時無法執行\n請確保連接到校內網絡後再試"
+        
+    if getattr(task, 'sign_in_done', False) and getattr(task, 'sign_out_done', False):
+        return "任務已完成，已成功執行簽到和簽退"
+    elif getattr(task, 'sign_in_done', False):
+        return "已完成簽到，等待簽退"
+    elif task.date == today:
+        # 判斷是否已過簽到時間
+        now = datetime.datetime.now().strftime("%H:%M")
+        
+        if now >= task.sign_in_time:
+            return "簽到時間已到，但尚未簽到"
+        else:
+            return "等待任務開始時間"
+    elif task.date < today:
+        return "任務日期已過，未能完成"
+    else:
+        return "未來任務，等待任務日期到來"
+
+def build_task_context_menu(master, task, on_toggle, on_reset, on_complete, on_reset_restriction,
+                            on_edit, on_delete):
+    """建立任務的右鍵選單
+    
+    Args:
+        master: 選單的父元件
+        task: 任務
+        on_toggle: on_toggle(status_type, value)切換簽到/簽退狀態
+        on_reset: 重置所有狀態
+        on_complete: 一鍵設為完成
+        on_reset_restriction: 重置環境限制
+        on_edit: 編輯任務
+        on_delete: 刪除任務
+    
+    Returns:
+        tk.Menu: 尚未顯示的選單
+    """
+    context_menu = tk.Menu(master, tearoff=0)
+    
+    # 狀態管理子選單
+    status_menu = tk.Menu(context_menu, tearoff=0)
+    
+    # 簽到狀態選項
+    status_menu.add_command(
+        label="✓ 標記為已簽到" if not task.sign_in_done else "❌ 標記為未簽到",
+        command=lambda: on_toggle("sign_in", not task.sign_in_done)
+    )
+    
+    # 簽退狀態選項
+    status_menu.add_command(
+        label="✓ 標記為已簽退" if not task.sign_out_done else "❌ 標記為未簽退",
+        command=lambda: on_toggle("sign_out", not task.sign_out_done)
+    )
+    
+    # 重置狀態選項
+    status_menu.add_separator()
+    status_menu.add_command(label="重置所有狀態", command=on_reset)
+    
+    # 快速設置選項
+    status_menu.add_separator()
+    status_menu.add_command(label="一鍵設為完成", command=on_complete)
+    
+    # 將狀態選單添加到主選單
+    context_menu.add_cascade(label="任務狀態管理", menu=status_menu)
+    
+    # 如果環境受限，添加重置選項
+    if hasattr(task, 'campus_restricted') and task.campus_restricted:
+        context_menu.add_command(label="重置環境限制", command=on_reset_restriction)
+    
+    context_menu.add_separator()
+    context_menu.add_command(label="編輯任務", command=on_edit)
+    context_menu.add_command(label="刪除任務", command=on_delete)
+    return context_menu
+
+def card_signature(task):
+    """任務卡片顯示內容的簽名，簽名不變時卡片不需要重新綁定
+    
+    包含狀態文本，因此隨時間變化的狀態（如"待簽到(已遲到)"）也會觸發更新。
+    
+    Args:
+        task: 任務
+    
+    Returns:
+        tuple: 卡片上所有可見內容
+    """
+    return (task.name, task.date, task.sign_in_time, task.sign_out_time,
+            bool(task.sign_in_done), bool(task.sign_out_done),
+            bool(getattr(task, 'campus_restricted', False)),
+            get_task_status_info(task)[0])
 
 class TaskCard(tk.Frame):
-    """任務卡片元件，顯示單個任務信息"""
-    def __init__(self, master, task, on_edit=None, on_delete=None, on_sign_in=None, on_sign_out=None, on_update_status=None, main_canvas=None):
+    """任務卡片元件，顯示單個任務信息
+    
+    卡片的子元件和事件綁定只在創建時建立一次，之後可通過bind_task重新綁定到其他任務，
+    供虛擬化任務列表回收重用。task為None時創建尚未綁定任務的空卡片。
+    """
+    def __init__(self, master, task=None, on_edit=None, on_delete=None, on_sign_in=None, on_sign_out=None, on_update_status=None, main_canvas=None):
         super().__init__(master, bg=COLORS["card"], padx=15, pady=15)
         self.task = task
         self.on_edit = on_edit
@@ -32,6 +181,9 @@ class TaskCard(tk.Frame):
         
         # 綁定所有事件
         self.setup_event_bindings()
+        
+        if task is not None:
+            self.bind_task(task)
     
     def setup_event_bindings(self):
         """設置卡片的所有事件綁定"""
@@ -126,47 +278,9 @@ class TaskCard(tk.Frame):
                     highlightthickness=2)  # 增加邊框厚度提高視覺反饋效果
         
         # 建立右鍵選單
-        context_menu = tk.Menu(self, tearoff=0)
-        
-        # 狀態管理子選單
-        status_menu = tk.Menu(context_menu, tearoff=0)
-        
-        # 簽到狀態選項
-        status_menu.add_command(
-            label="✓ 標記為已簽到" if not self.task.sign_in_done else "❌ 標記為未簽到",
-            command=lambda: self.update_task_status("sign_in", not self.task.sign_in_done)
-        )
-        
-        # 簽退狀態選項
-        status_menu.add_command(
-            label="✓ 標記為已簽退" if not self.task.sign_out_done else "❌ 標記為未簽退",
-            command=lambda: self.update_task_status("sign_out", not self.task.sign_out_done)
-        )
-        
-        # 重置狀態選項
-        status_menu.add_separator()
-        status_menu.add_command(
-            label="重置所有狀態",
-            command=self.reset_status
-        )
-        
-        # 快速設置選項
-        status_menu.add_separator()
-        status_menu.add_command(
-            label="一鍵設為完成",
-            command=self.set_all_complete
-        )
-        
-        # 將狀態選單添加到主選單
-        context_menu.add_cascade(label="任務狀態管理", menu=status_menu)
-        
-        # 如果環境受限，添加重置選項
-        if hasattr(self.task, 'campus_restricted') and self.task.campus_restricted:
-            context_menu.add_command(label="重置環境限制", command=self.reset_restriction)
-        
-        context_menu.add_separator()
-        context_menu.add_command(label="編輯任務", command=self.edit)
-        context_menu.add_command(label="刪除任務", command=self.delete)
+        context_menu = build_task_context_menu(self, self.task, self.update_task_status, self.reset_status,
+                                               self.set_all_complete, self.reset_restriction,
+                                               self.edit, self.delete)
         
         # 在菜單關閉時恢復原來的樣式
         def restore_style():
@@ -203,30 +317,29 @@ class TaskCard(tk.Frame):
         title_frame = tk.Frame(self, bg=COLORS["card"])
         title_frame.pack(fill=tk.X, pady=(0, 10))
         
-        title_label = tk.Label(title_frame, text=self.task.name, font=("Arial", 12, "bold"),
-                             bg=COLORS["card"], fg=COLORS["text"])
-        title_label.pack(side=tk.LEFT)
+        self.title_label = tk.Label(title_frame, font=("Arial", 12, "bold"),
+                                  bg=COLORS["card"], fg=COLORS["text"])
+        self.title_label.pack(side=tk.LEFT)
         
-        status_text, status_color = self.get_status_info()
-        self.status_label = tk.Label(title_frame, text=status_text, font=("Arial", 10),
-                                bg=status_color, fg="white", padx=8, pady=2)
+        self.status_label = tk.Label(title_frame, font=("Arial", 10),
+                                bg=COLORS["progress_waiting"], fg="white", padx=8, pady=2)
         self.status_label.pack(side=tk.RIGHT)
         
-        # 為狀態標籤添加工具提示
-        status_tooltip_text = self.get_status_tooltip_text()
-        self.status_tooltip = SettingTooltip(self.status_label, status_tooltip_text)
+        # 卡片的提示共用根窗口的提示窗口，狀態提示在顯示時才按目前任務計算
+        tooltips = TooltipManager.for_widget(self)
+        tooltips.register(self.status_label, self.get_status_tooltip_text)
         
         # 日期和時間信息
         info_frame = tk.Frame(self, bg=COLORS["card"])
         info_frame.pack(fill=tk.X, pady=5)
         
-        date_label = tk.Label(info_frame, text=f"日期: {self.task.date}", font=("Arial", 10),
-                             bg=COLORS["card"], fg=COLORS["text"])
-        date_label.pack(side=tk.LEFT)
+        self.date_label = tk.Label(info_frame, font=("Arial", 10),
+                                 bg=COLORS["card"], fg=COLORS["text"])
+        self.date_label.pack(side=tk.LEFT)
         
-        time_label = tk.Label(info_frame, text=f"時間: {self.task.sign_in_time} - {self.task.sign_out_time}", 
-                             font=("Arial", 10), bg=COLORS["card"], fg=COLORS["text"])
-        time_label.pack(side=tk.RIGHT)
+        self.time_label = tk.Label(info_frame, font=("Arial", 10), 
+                                 bg=COLORS["card"], fg=COLORS["text"])
+        self.time_label.pack(side=tk.RIGHT)
         
         # 任務狀態管理區域
         status_frame = tk.Frame(self, bg=COLORS["card"])
@@ -240,11 +353,10 @@ class TaskCard(tk.Frame):
         sign_in_frame = tk.Frame(indicator_frame, bg=COLORS["card"])
         sign_in_frame.pack(side=tk.LEFT, padx=(0, 10))
         
-        sign_in_color = "#2ecc71" if self.task.sign_in_done else "#e0e0e0"
-        sign_in_indicator = tk.Canvas(sign_in_frame, width=15, height=15, bg=COLORS["card"], 
-                                    highlightthickness=0)
-        sign_in_indicator.create_oval(2, 2, 13, 13, fill=sign_in_color, outline="")
-        sign_in_indicator.pack(side=tk.LEFT, padx=(0, 5))
+        self.sign_in_indicator = tk.Canvas(sign_in_frame, width=15, height=15, bg=COLORS["card"], 
+                                         highlightthickness=0)
+        self.sign_in_oval = self.sign_in_indicator.create_oval(2, 2, 13, 13, fill="#e0e0e0", outline="")
+        self.sign_in_indicator.pack(side=tk.LEFT, padx=(0, 5))
         
         sign_in_label = tk.Label(sign_in_frame, text="簽到", font=("Arial", 9), 
                                bg=COLORS["card"], fg=COLORS["text"])
@@ -254,11 +366,10 @@ class TaskCard(tk.Frame):
         sign_out_frame = tk.Frame(indicator_frame, bg=COLORS["card"])
         sign_out_frame.pack(side=tk.LEFT)
         
-        sign_out_color = "#2ecc71" if self.task.sign_out_done else "#e0e0e0"
-        sign_out_indicator = tk.Canvas(sign_out_frame, width=15, height=15, bg=COLORS["card"], 
-                                     highlightthickness=0)
-        sign_out_indicator.create_oval(2, 2, 13, 13, fill=sign_out_color, outline="")
-        sign_out_indicator.pack(side=tk.LEFT, padx=(0, 5))
+        self.sign_out_indicator = tk.Canvas(sign_out_frame, width=15, height=15, bg=COLORS["card"], 
+                                          highlightthickness=0)
+        self.sign_out_oval = self.sign_out_indicator.create_oval(2, 2, 13, 13, fill="#e0e0e0", outline="")
+        self.sign_out_indicator.pack(side=tk.LEFT, padx=(0, 5))
         
         sign_out_label = tk.Label(sign_out_frame, text="簽退", font=("Arial", 9), 
                                 bg=COLORS["card"], fg=COLORS["text"])
@@ -269,31 +380,29 @@ class TaskCard(tk.Frame):
         status_toggle_frame.pack(side=tk.RIGHT)
         
         # 添加簽到狀態切換
-        self.sign_in_status_var = tk.IntVar(value=1 if self.task.sign_in_done else 0)
+        self.sign_in_status_var = tk.IntVar(value=0)
         sign_in_cb = ttk.Checkbutton(status_toggle_frame, text="已簽到", 
                                    variable=self.sign_in_status_var,
                                    command=lambda: self.update_task_status("sign_in", self.sign_in_status_var.get()))
         sign_in_cb.pack(side=tk.LEFT, padx=(0, 10))
         
         # 添加簽退狀態切換
-        self.sign_out_status_var = tk.IntVar(value=1 if self.task.sign_out_done else 0)
+        self.sign_out_status_var = tk.IntVar(value=0)
         sign_out_cb = ttk.Checkbutton(status_toggle_frame, text="已簽退", 
                                     variable=self.sign_out_status_var,
                                     command=lambda: self.update_task_status("sign_out", self.sign_out_status_var.get()))
         sign_out_cb.pack(side=tk.LEFT)
         
-        # 任務受限警告顯示
-        if hasattr(self.task, 'campus_restricted') and self.task.campus_restricted:
-            warning_frame = tk.Frame(self, bg=COLORS["card"])
-            warning_frame.pack(fill=tk.X, pady=(5, 10))
-            
-            restricted_label = tk.Label(warning_frame, text="⚠️ 環境受限", 
-                                      font=("Arial", 9), bg=COLORS["status_warning"], fg=COLORS["status_warning_text"],
-                                      padx=8, pady=3)
-            restricted_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        # 任務受限警告顯示，只在任務受限時放入卡片（見update_status_display）
+        self.warning_frame = tk.Frame(self, bg=COLORS["card"])
+        
+        restricted_label = tk.Label(self.warning_frame, text="⚠️ 環境受限", 
+                                  font=("Arial", 9), bg=COLORS["status_warning"], fg=COLORS["status_warning_text"],
+                                  padx=8, pady=3)
+        restricted_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # 按鈕區域
-        button_frame = tk.Frame(self, bg=COLORS["card"])
+        button_frame = self.button_frame = tk.Frame(self, bg=COLORS["card"])
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
         # 簽到按鈕
@@ -302,9 +411,7 @@ class TaskCard(tk.Frame):
         sign_in_button.pack(side=tk.LEFT, padx=(0, 10))
         
         # 為簽到按鈕添加工具提示 - 使用較短延遲以提高響應速度
-        tooltip_sign_in = add_tooltip(sign_in_button, 
-                                     "執行簽到操作\n系統會自動檢查校內網絡環境",
-                                     delay=300, button_safe=True)
+        tooltips.register(sign_in_button, "執行簽到操作\n系統會自動檢查校內網絡環境", delay=300)
         
         # 簽退按鈕
         sign_out_button = ModernButton(button_frame, text="簽退", command=self.sign_out,
@@ -312,15 +419,13 @@ class TaskCard(tk.Frame):
         sign_out_button.pack(side=tk.LEFT, padx=(0, 10))
         
         # 為簽退按鈕添加工具提示 - 使用較短延遲以提高響應速度
-        tooltip_sign_out = add_tooltip(sign_out_button, 
-                                      "執行簽退操作\n需要先完成簽到才能簽退",
-                                      delay=300, button_safe=True)
+        tooltips.register(sign_out_button, "執行簽退操作\n需要先完成簽到才能簽退", delay=300)
         
         # 編輯按鈕
         edit_button = ModernButton(button_frame, text="編輯", command=self.edit)
         edit_button.pack(side=tk.RIGHT, padx=(5, 0))
         # 為編輯按鈕添加工具提示
-        add_tooltip(edit_button, "編輯此任務的詳細信息", delay=300)
+        tooltips.register(edit_button, "編輯此任務的詳細信息", delay=300)
         
         # 刪除按鈕保持紅色
         delete_button = ModernButton(button_frame, text="刪除", command=self.delete,
@@ -328,11 +433,41 @@ class TaskCard(tk.Frame):
                                    keep_color=True)
         delete_button.pack(side=tk.RIGHT, padx=5)
         # 為刪除按鈕添加工具提示
-        add_tooltip(delete_button, "刪除此任務\n此操作無法撤銷", delay=300)
+        tooltips.register(delete_button, "刪除此任務\n此操作無法撤銷", delay=300)
         
         # 將右鍵菜單綁定到所有子元素
         self.bind_right_click_to_children(self)
     
+    def bind_task(self, task):
+        """綁定要顯示的任務並更新卡片的所有內容，子元件和事件綁定保持不變
+        
+        Args:
+            task: 要顯示的任務
+        """
+        self.task = task
+        self.title_label.config(text=task.name)
+        self.date_label.config(text=f"日期: {task.date}")
+        self.time_label.config(text=f"時間: {task.sign_in_time} - {task.sign_out_time}")
+        self.update_status_display()
+    
+    def update_status_display(self):
+        """根據任務目前的狀態更新狀態標籤、指示燈、複選框和環境受限提示"""
+        status_text, status_color = self.get_status_info()
+        self.status_label.config(text=status_text, bg=status_color)
+        
+        self.sign_in_indicator.itemconfig(self.sign_in_oval,
+                                          fill="#2ecc71" if self.task.sign_in_done else "#e0e0e0")
+        self.sign_out_indicator.itemconfig(self.sign_out_oval,
+                                           fill="#2ecc71" if self.task.sign_out_done else "#e0e0e0")
+        self.sign_in_status_var.set(1 if self.task.sign_in_done else 0)
+        self.sign_out_status_var.set(1 if self.task.sign_out_done else 0)
+        
+        restricted = bool(getattr(self.task, 'campus_restricted', False))
+        if restricted and not self.warning_frame.winfo_manager():
+            self.warning_frame.pack(fill=tk.X, pady=(5, 10), before=self.button_frame)
+        elif not restricted and self.warning_frame.winfo_manager():
+            self.warning_frame.pack_forget()
+    
     def update_task_status(self, status_type, value):
         """更新任務狀態並刷新界面
         
@@ -346,14 +481,11 @@ class TaskCard(tk.Frame):
         # 更新任務狀態
         if status_type == "sign_in":
             self.task.sign_in_done = value
-            self.sign_in_status_var.set(1 if value else 0)
         elif status_type == "sign_out":
             self.task.sign_out_done = value
-            self.sign_out_status_var.set(1 if value else 0)
         
         # 更新UI狀態
-        status_text, status_color = self.get_status_info()
-        self.status_label.config(text=status_text, bg=status_color)
+        self.update_status_display()
         
         # 通知應用程序更新任務狀態
         if self.on_update_status:
@@ -453,13 +585,8 @@ class TaskCard(tk.Frame):
         if hasattr(self.task, 'campus_restricted'):
             self.task.campus_restricted = False
         
-        # 更新複選框狀態
-        self.sign_in_status_var.set(0)
-        self.sign_out_status_var.set(0)
-        
-        # 更新UI狀態
-        status_text, status_color = self.get_status_info()
-        self.status_label.config(text=status_text, bg=status_color)
+        # 更新複選框、指示燈和狀態標籤
+        self.update_status_display()
         
         # 通知應用程序更新任務狀態
         if self.on_update_status:
@@ -474,13 +601,8 @@ class TaskCard(tk.Frame):
         self.task.sign_in_done = True
         self.task.sign_out_done = True
         
-        # 更新複選框狀態
-        self.sign_in_status_var.set(1)
-        self.sign_out_status_var.set(1)
-        
-        # 更新UI狀態
-        status_text, status_color = self.get_status_info()
-        self.status_label.config(text=status_text, bg=status_color)
+        # 更新複選框、指示燈和狀態標籤
+        self.update_status_display()
         
         # 通知應用程序更新任務狀態
         if self.on_update_status:
@@ -496,12 +618,7 @@ class TaskCard(tk.Frame):
             self.task.campus_restricted = False
             
             # 移除警告標籤
-            for widget in self.winfo_children():
-                if isinstance(widget, tk.Frame):
-                    for child in widget.winfo_children():
-                        if isinstance(child, tk.Label) and "環境受限" in child.cget("text"):
-                            widget.destroy()
-                            break
+            self.update_status_display()
             
             # 通知應用程序更新任務狀態
             if self.on_update_status:
@@ -516,40 +633,7 @@ class TaskCard(tk.Frame):
         Returns:
             tuple: (狀態文本, 狀態顏色)
         """
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-        current_time = datetime.datetime.now().strftime("%H:%M")
-        
-        # 如果不是今天的任務
-        if self.task.date != today:
-            if self.task.date < today:
-                # 過期任務狀態顯示處理
-                if self.task.sign_in_done and self.task.sign_out_done:
-                    return "已完成", COLORS["progress_done"]  # 綠色
-                elif not self.task.sign_in_done and not self.task.sign_out_done:
-                    return "已過期", COLORS["warning"]  # 紅色
-                else:
-                    return "部分完成", COLORS["progress_pending"]  # 橙色
-            else:
-                # 未來任務
-                return "未開始", COLORS["progress_waiting"]  # 藍色
-        
-        # 今天的任務
-        if self.task.sign_in_done and self.task.sign_out_done:
-            return "已完成", COLORS["progress_done"]  # 綠色
-        
-        if not self.task.sign_in_done:
-            if current_time < self.task.sign_in_time:
-                return "待簽到", COLORS["progress_waiting"]  # 藍色
-            else:
-                # 已過簽到時間但未簽到
-                return "待簽到(已遲到)", COLORS["warning"]  # 紅色
-        
-        # 已簽到但未簽退
-        if current_time < self.task.sign_out_time:
-            return "進行中", COLORS["progress_pending"]  # 橙色
-        else:
-            # 已過簽退時間但未簽退
-            return "待簽退(已遲到)", COLORS["warning"]  # 紅色
+        return get_task_status_info(self.task)
     
     def edit(self):
         """編輯任務"""
@@ -573,25 +657,7 @@ class TaskCard(tk.Frame):
     
     def get_status_tooltip_text(self):
         """獲取狀態提示文本"""
-        if hasattr(self.task, 'campus_restricted') and self.task.campus_restricted:
-            return "此任務由於網絡環境限制暫時無法執行\n請確保連接到校內網絡後再試"
-            
-        if getattr(self.task, 'sign_in_done', False) and getattr(self.task, 'sign_out_done', False):
-            return "任務已完成，已成功執行簽到和簽退"
-        elif getattr(self.task, 'sign_in_done', False):
-            return "已完成簽到，等待簽退"
-        elif self._is_due_today():
-            # 判斷是否已過簽到時間
-            now = datetime.datetime.now().strftime("%H:%M")
-            
-            if now >= self.task.sign_in_time:
-                return "簽到時間已到，但尚未簽到"
-            else:
-                return "等待任務開始時間"
-        elif self._is_past_date():
-            return "任務日期已過，未能完成"
-        else:
-            return "未來任務，等待任務日期到來"
+        return get_task_status_tooltip(self.task)
     
     def _is_due_today(self):
         """檢查是否為今天的任務"""
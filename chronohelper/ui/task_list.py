@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+虛擬化任務列表 - 只為可見區域內的任務建立卡片，捲動時回收重用
+"""
+
+import bisect
+import itertools
+
+class VirtualTaskList:
+    """在Canvas上顯示任務卡片的虛擬化列表
+
+    列表按每種卡片形態（是否顯示環境受限提示）的實測高度計算所有任務的縱向位置，
+    只為與可見區域相交的任務（上下再各多渲染overscan張）放置卡片。離開可見區域的
+    卡片隱藏後放回池中，之後綁定到新進入可見區域的任務，因此卡片數量只與視窗高度
+    有關，與任務總數無關。
+
+    卡片以任務ID為鍵：重新設置任務時保留仍可見任務的卡片，只重新綁定顯示內容簽名
+    有變化的卡片，只移動位置有變化的卡片。
+    """
+
+    CARD_GAP = 10   # 卡片之間的垂直間距（像素）
+    CARD_PADX = 5   # 卡片左右邊距（像素）
+
+    def __init__(self, canvas, scrollbar, card_factory, empty_factory=None, signature=None,
+                 overscan=2, estimated_height=170):
+        """初始化虛擬化列表
+
+        Args:
+            canvas: 顯示卡片的Canvas，卡片以窗口項目放在其上
+            scrollbar: 縱向捲動條
+            card_factory: card_factory(parent)創建尚未綁定任務的卡片，卡片需提供bind_task(task)
+            empty_factory: empty_factory(parent)創建沒有任務時顯示的元件
+            signature: signature(task)返回卡片顯示內容的簽名，None表示每次渲染都重新綁定
+            overscan: 可見區域上下額外渲染的卡片數，減少快速捲動時的空白
+            estimated_height: 尚未實測前假定的卡片高度（像素，含間距）
+        """
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.card_factory = card_factory
+        self.empty_factory = empty_factory
+        self.signature = signature
+        self.overscan = max(0, int(overscan))
+        self.estimated_height = estimated_height
+
+        self.tasks = []
+        self.positions = None  # 任務ID -> 在tasks中的索引，順序變化後首次需要時才建立
+        self.shapes = []  # 與tasks對應的卡片形態
+        self.offsets = [0]  # offsets[i]為第i個任務卡片的頂部位置，最後一項為總高度
+        self.shape_heights = {}  # 卡片形態 -> 實測高度（含間距）
+        self.active = {}  # 任務ID -> [卡片, Canvas項目ID, 目前y座標, 綁定時的簽名]
+        self.pool = []  # 已隱藏可重用的 (卡片, Canvas項目ID)
+        self.card_width = None
+        self.empty_view = None
+        self.empty_item = None
+        self.render_pending = False
+
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+        self.scrollbar.configure(command=self.canvas.yview)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_render(), add="+")
+
+    def set_tasks(self, tasks):
+        """設置要顯示的任務，只在順序變化時重新計算位置
+
+        Args:
+            tasks: 按顯示順序排列的任務列表，列表由調用方持有且不再修改（如排序視圖的快照），
+                再次傳入同一個列表對象表示順序未變
+        """
+        if tasks is not self.tasks and tasks != self.tasks:
+            self.tasks = tasks
+            self.positions = None
+            self.shapes = [self._shape(task) for task in tasks]
+            self._rebuild_offsets()
+        self.schedule_render()
+
+    def update_tasks(self, task_ids):
+        """指定任務的內容已變更但順序不變，只更新這些任務
+
+        Args:
+            task_ids: 變更的任務ID，不在列表中的ID會被忽略
+        """
+        first_changed = None
+        for task_id in task_ids:
+            index = self.index_of(task_id)
+            if index is None:
+                continue
+            shape = self._shape(self.tasks[index])
+            if shape != self.shapes[index]:
+                self.shapes[index] = shape
+                first_changed = index if first_changed is None else min(first_changed, index)
+        if first_changed is not None:
+            self._rebuild_offsets(first_changed)
+        self.schedule_render()
+
+    def index_of(self, task_id):
+        """任務在目前顯示順序中的索引，不在列表中時返回None"""
+        if self.positions is None:
+            self.positions = {task.id: index for index, task in enumerate(self.tasks)}
+        return self.positions.get(task_id)
+
+    def card_count(self):
+        """已創建的卡片數（使用中加池中）"""
+        return len(self.active) + len(self.pool)
+
+    def schedule_render(self):
+        """在空閒時渲染一次，同一輪事件中的多次請求只渲染一次"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.canvas.after_idle(self._render)
+
+    def _on_view_changed(self, first, last):
+        """Canvas可見範圍變化（捲動、縮放、滾輪）時更新捲動條並重新渲染"""
+        self.scrollbar.set(first, last)
+        self.schedule_render()
+
+    def _shape(self, task):
+        """卡片形態，不同形態的卡片高度不同"""
+        return bool(getattr(task, 'campus_restricted', False))
+
+    def _rebuild_offsets(self, start=0):
+        """根據各形態的高度重新計算從start開始的卡片位置和滾動範圍
+
+        Args:
+            start: 第一個需要重新計算的索引，之前的位置保持不變
+        """
+        height_of = {shape: self.shape_heights.get(shape, self.estimated_height) for shape in (False, True)}
+        heights = map(height_of.__getitem__, itertools.islice(self.shapes, start, None))
+        base = self.offsets[start] if start else 0
+        del self.offsets[start:]
+        self.offsets.extend(itertools.accumulate(heights, initial=base))
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.offsets[-1]))
+
+    def _visible_range(self):
+        """計算需要渲染的任務索引範圍 [first, last)"""
+        top = self.canvas.canvasy(0)
+        bottom = top + max(1, self.canvas.winfo_height())
+        first = max(0, bisect.bisect_right(self.offsets, top) - 1 - self.overscan)
+        last = min(len(self.tasks), bisect.bisect_left(self.offsets, bottom) + self.overscan)
+        return first, last
+
+    def _acquire(self):
+        """從池中取出一張卡片，池為空時創建新卡片"""
+        if self.pool:
+            return self.pool.pop()
+        card = self.card_factory(self.canvas)
+        item = self.canvas.create_window(0, 0, window=card, anchor="nw", state="hidden")
+        return card, item
+
+    def _release(self, task_id):
+        """隱藏卡片並放回池中"""
+        card, item, _, _ = self.active.pop(task_id)
+        self.canvas.itemconfigure(item, state="hidden")
+        self.pool.append((card, item))
+
+    def _show_empty(self, show):
+        """顯示或隱藏沒有任務時的提示"""
+        if show and self.empty_view is None and self.empty_factory is not None:
+            self.empty_view = self.empty_factory(self.canvas)
+            self.empty_item = self.canvas.create_window(self.CARD_PADX, self.CARD_GAP // 2,
+                                                        window=self.empty_view, anchor="nw")
+        if self.empty_item is not None:
+            self.canvas.itemconfigure(self.empty_item, state="normal" if show else "hidden",
+                                      width=max(1, self.canvas.winfo_width() - 2 * self.CARD_PADX))
+
+    def _render(self):
+        """渲染並在結束後才允許下一次渲染請求，避免實測高度時的update_idletasks重入"""
+        try:
+            stale_from = self._place_cards()
+        finally:
+            self.render_pending = False
+        if stale_from is not None:
+            self._rebuild_offsets(stale_from)
+            self.schedule_render()
+
+    def _place_cards(self):
+        """只為可見區域內的任務放置卡片，已放置的卡片只在內容或位置變化時更新
+
+        Returns:
+            int: 需要重新計算位置的第一個索引（卡片形態或實測高度與記錄不同），None表示無需重算
+        """
+        self._show_empty(not self.tasks)
+
+        first, last = self._visible_range()
+        wanted = {task.id for task in self.tasks[first:last]}
+        for task_id in [task_id for task_id in self.active if task_id not in wanted]:
+            self._release(task_id)
+
+        width = max(1, self.canvas.winfo_width() - 2 * self.CARD_PADX)
+        resized = width != self.card_width
+        self.card_width = width
+        bound = []
+        stale_from = None
+        for index in range(first, last):
+            task = self.tasks[index]
+            signature = self.signature(task) if self.signature else None
+            entry = self.active.get(task.id)
+            if entry is None:
+                card, item = self._acquire()
+                entry = self.active[task.id] = [card, item, None, None]
+                self.canvas.itemconfigure(item, state="normal", width=width)
+            elif resized:
+                self.canvas.itemconfigure(entry[1], width=width)
+
+            card, item, y, bound_signature = entry
+            if card.task is not task or signature is None or signature != bound_signature:
+                card.bind_task(task)
+                entry[3] = signature
+                bound.append(card)
+                shape = self._shape(task)
+                if shape != self.shapes[index]:
+                    self.shapes[index] = shape
+                    stale_from = index if stale_from is None else min(stale_from, index)
+
+            target_y = self.offsets[index] + self.CARD_GAP // 2
+            if target_y != y:
+                self.canvas.coords(item, self.CARD_PADX, target_y)
+                entry[2] = target_y
+
+        # 實測新綁定卡片的高度，通常只在每種形態首次出現時與記錄不同
+        if bound:
+            self.canvas.update_idletasks()
+            for card in bound:
+                height = card.winfo_reqheight() + self.CARD_GAP
+                shape = self._shape(card.task)
+                if self.shape_heights.get(shape) != height:
+                    self.shape_heights[shape] = height
+                    stale_from = 0
+        return stale_from
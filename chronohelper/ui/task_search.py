@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+任務搜尋索引 - 支持按名稱、日期範圍和狀態即時篩選任務
+"""
+
+import bisect
+import itertools
+import operator
+
+# 狀態篩選選項 -> (索引類型, 值)
+STATUS_FILTERS = {
+    "全部狀態": None,
+    "今天待處理": ("rank", 1),
+    "未來任務": ("rank", 2),
+    "已完成": ("rank", 3),
+    "過期未完成": ("rank", 4),
+    "環境受限": ("restricted", True),
+}
+
+class TaskQuery:
+    """任務篩選條件，所有條件同時滿足才算匹配"""
+
+    def __init__(self, text="", date_from="", date_to="", status=None):
+        """初始化篩選條件
+
+        Args:
+            text: 名稱包含的文字（不區分大小寫）
+            date_from: 起始日期（含），可以只輸入前綴，如"2025-03"
+            date_to: 結束日期（含），可以只輸入前綴，如"2025-03"表示到三月底
+            status: STATUS_FILTERS中的選項，None或"全部狀態"表示不限
+        """
+        self.text = text.strip().lower()
+        self.date_from = date_from.strip()
+        self.date_to = date_to.strip()
+        self.status = STATUS_FILTERS.get(status)
+
+    def is_empty(self):
+        """是否沒有任何篩選條件"""
+        return not (self.text or self.date_from or self.date_to or self.status)
+
+    def cache_key(self):
+        """可作為字典鍵的篩選條件"""
+        return (self.text, self.date_from, self.date_to, self.status)
+
+class TaskSearchIndex:
+    """任務的名稱n-gram索引和狀態索引
+
+    名稱索引把每個任務名稱（小寫）的單字和相鄰雙字映射到任務槽位集合，查詢時取查詢文字
+    所有雙字集合的交集作為候選，再確認包含關係；狀態索引按狀態分組保存任務槽位集合。
+    日期範圍直接在日期排序視圖上二分查找。以整數槽位代替任務ID，集合運算不需要雜湊字符串。
+
+    匹配大量任務的n-gram（如單個常見字母）另外保存以槽位為下標的位元組遮罩，多個遮罩
+    以整數按位與合併，結果交給SortedView.select在C層取出任務，不在Python層逐一處理匹配的
+    任務。遮罩在第一次查詢時建立，之後隨任務增刪更新，最多保留MAX_MASKS個。
+    查詢文字延長上一次的文字且上一次結果較少時（逐字輸入），只在上一次的結果中確認。
+    """
+
+    DENSE_RATIO = 16  # 匹配超過全部任務的1/DENSE_RATIO時使用遮罩
+    MAX_MASKS = 32
+
+    def __init__(self, rank_func, slot_of):
+        """初始化索引
+
+        Args:
+            rank_func: rank_func(task)返回任務的狀態分組（1~4，見status_rank）
+            slot_of: 任務ID -> 整數槽位，由SortedTaskViews分配
+        """
+        self.rank_func = rank_func
+        self.slot_of = slot_of
+        self.grams = {}  # n-gram -> 任務槽位集合
+        self.masks = {}  # n-gram -> 槽位遮罩，按最近使用排序
+        self.capacity = 0  # 遮罩長度，大於所有已分配的槽位
+        self.names = []  # 以槽位為下標的已索引小寫名稱，空槽位為None
+        self.ranks = {}  # 槽位 -> 已索引的狀態分組
+        self.rank_sets = {rank: set() for rank in (1, 2, 3, 4)}
+        self.restricted = set()  # 環境受限的任務槽位
+        self.last_text = None  # (文字, 匹配的槽位集合)，索引變化時清除
+
+    @staticmethod
+    def _grams(name):
+        """名稱的單字和雙字n-gram"""
+        grams = set(name)
+        grams.update(name[i:i + 2] for i in range(len(name) - 1))
+        return grams
+
+    @staticmethod
+    def is_mask(result):
+        """match的結果是否為槽位遮罩（否則為槽位集合）"""
+        return isinstance(result, (bytes, bytearray))
+
+    def rebuild(self, tasks):
+        """重建全部索引
+
+        Args:
+            tasks: 全部任務
+        """
+        self.grams = {}
+        self.masks = {}
+        self.ranks = {}
+        self.rank_sets = {rank: set() for rank in (1, 2, 3, 4)}
+        self.restricted = set()
+        self.last_text = None
+        self.capacity = 0
+
+        # 同名任務只切分一次名稱，整組槽位一起加入n-gram集合
+        by_name = {}
+        for task in tasks:
+            slot = self.slot_of[task.id]
+            self.capacity = max(self.capacity, slot + 1)
+            by_name.setdefault(task.name.lower(), []).append(slot)
+            self._add_status(task, slot)
+        grams = self.grams
+        names = self.names = [None] * self.capacity
+        for name, slots in by_name.items():
+            for slot in slots:
+                names[slot] = name
+            for gram in self._grams(name):
+                ids = grams.get(gram)
+                if ids is None:
+                    grams[gram] = set(slots)
+                else:
+                    ids.update(slots)
+
+    def add(self, task):
+        """索引新任務"""
+        slot = self.slot_of[task.id]
+        if slot >= self.capacity:
+            self.capacity = slot + 1
+            for mask in self.masks.values():
+                mask.extend(bytes(self.capacity - len(mask)))
+            self.names.extend([None] * (self.capacity - len(self.names)))
+        name = task.name.lower()
+        self.names[slot] = name
+        for gram in self._grams(name):
+            self.grams.setdefault(gram, set()).add(slot)
+            mask = self.masks.get(gram)
+            if mask is not None:
+                mask[slot] = 1
+        self._add_status(task, slot)
+        self.last_text = None
+
+    def _add_status(self, task, slot):
+        """索引任務的狀態分組和環境限制"""
+        rank = self.ranks[slot] = self.rank_func(task)
+        self.rank_sets[rank].add(slot)
+        if getattr(task, 'campus_restricted', False):
+            self.restricted.add(slot)
+
+    def remove(self, task_id):
+        """移除任務的索引"""
+        slot = self.slot_of.get(task_id)
+        name = self.names[slot] if slot is not None and slot < len(self.names) else None
+        if name is None:
+            return
+        self.names[slot] = None
+        for gram in self._grams(name):
+            ids = self.grams.get(gram)
+            if ids is not None:
+                ids.discard(slot)
+                if not ids:
+                    del self.grams[gram]
+            mask = self.masks.get(gram)
+            if mask is not None:
+                mask[slot] = 0
+        self.rank_sets[self.ranks.pop(slot)].discard(slot)
+        self.restricted.discard(slot)
+        self.last_text = None
+
+    def update(self, task):
+        """任務內容變更後更新索引，沒有變化的部分不重建
+
+        Returns:
+            bool: 索引是否有變化
+        """
+        slot = self.slot_of[task.id]
+        if self.names[slot] != task.name.lower():
+            self.remove(task.id)
+            self.add(task)
+            return True
+
+        changed = False
+        rank = self.rank_func(task)
+        if self.ranks[slot] != rank:
+            self.rank_sets[self.ranks[slot]].discard(slot)
+            self.rank_sets[rank].add(slot)
+            self.ranks[slot] = rank
+            changed = True
+
+        restricted = bool(getattr(task, 'campus_restricted', False))
+        if restricted != (slot in self.restricted):
+            if restricted:
+                self.restricted.add(slot)
+            else:
+                self.restricted.discard(slot)
+            changed = True
+        return changed
+
+    def _mask(self, gram):
+        """n-gram的槽位遮罩，沒有時由槽位集合建立"""
+        mask = self.masks.pop(gram, None)
+        if mask is None:
+            ids = self.grams.get(gram, set())
+            mask = bytearray(map(ids.__contains__, range(self.capacity)))
+            if len(self.masks) >= self.MAX_MASKS:
+                del self.masks[next(iter(self.masks))]
+        self.masks[gram] = mask
+        return mask
+
+    def to_mask(self, slots):
+        """把槽位集合轉為以槽位為下標的位元組遮罩"""
+        if len(slots) * 8 < self.capacity:
+            mask = bytearray(self.capacity)
+            for slot in slots:
+                mask[slot] = 1
+            return mask
+        return bytearray(map(slots.__contains__, range(self.capacity)))
+
+    def _is_dense(self, ids):
+        """槽位集合是否大到值得使用遮罩"""
+        return len(ids) * self.DENSE_RATIO >= len(self.ranks)
+
+    def match_text(self, text):
+        """名稱包含text的任務
+
+        Returns:
+            set或bytearray: 槽位集合，或匹配較多時的槽位遮罩，都不可修改
+        """
+        names = self.names
+        if len(text) == 1:
+            ids = self.grams.get(text, set())
+            return self._mask(text) if ids and self._is_dense(ids) else ids
+
+        grams = [text[i:i + 2] for i in range(len(text) - 1)]
+        candidates = sorted((self.grams.get(gram, set()) for gram in grams), key=len)
+        last = self.last_text
+        if last is not None and text.startswith(last[0]) and len(last[1]) < len(candidates[0]):
+            # 逐字輸入時新結果必定是上一次結果的子集
+            ids = last[1]
+        elif candidates[0] and self._is_dense(candidates[0]):
+            value = int.from_bytes(self._mask(grams[0]), "little")
+            for gram in grams[1:]:
+                value &= int.from_bytes(self._mask(gram), "little")
+            mask = value.to_bytes(self.capacity, "little")
+            if len(text) > 2:
+                # 雙字全部出現不代表整段文字連續出現，清除不包含整段文字的槽位
+                slots = candidates[0].intersection(*candidates[1:])
+                rejected = list(itertools.compress(slots, map(operator.not_, map(
+                    operator.contains, map(names.__getitem__, slots), itertools.repeat(text)))))
+                if rejected:
+                    mask = bytearray(mask)
+                    for slot in rejected:
+                        mask[slot] = 0
+            return mask
+        else:
+            ids = candidates[0].intersection(*candidates[1:])
+            if len(text) == 2:
+                self.last_text = (text, ids)
+                return ids
+
+        # 雙字全部出現不代表整段文字連續出現，需逐一確認
+        ids = set(itertools.compress(ids, map(operator.contains, map(names.__getitem__, ids), itertools.repeat(text))))
+        self.last_text = (text, ids)
+        return ids
+
+    def match(self, query, date_view):
+        """按篩選條件返回匹配的任務
+
+        Args:
+            query: TaskQuery
+            date_view: 以 (日期, 簽到時間, ID) 排序的SortedView，用於日期範圍查詢
+
+        Returns:
+            set或bytearray: 匹配的任務槽位集合或槽位遮罩（見is_mask）；
+                沒有任何條件時返回None表示全部匹配
+        """
+        sets = []
+        if query.status:
+            kind, value = query.status
+            sets.append(self.rank_sets[value] if kind == "rank" else self.restricted)
+
+        if query.date_from or query.date_to:
+            # 日期以字符串比較，部分輸入（如"2025-03"）自然成為前綴範圍
+            keys = date_view.keys
+            lo = bisect.bisect_left(keys, (query.date_from,)) if query.date_from else 0
+            hi = bisect.bisect_left(keys, (query.date_to + "\uffff",)) if query.date_to else len(keys)
+            if hi - lo < len(keys):
+                sets.append(set(date_view.slots[lo:hi]))
+
+        mask = None
+        if query.text:
+            text_match = self.match_text(query.text)
+            if self.is_mask(text_match):
+                mask = text_match
+            else:
+                sets.append(text_match)
+
+        if not sets:
+            return mask
+        sets.sort(key=len)
+        ids = sets[0].intersection(*sets[1:])
+        if mask is not None:
+            ids = set(itertools.compress(ids, map(mask.__getitem__, ids)))
+        return ids
@@ -5,6 +5,7 @@
 
 import json
 import os
+import threading
 from chronohelper.models.task import Task
 from chronohelper.utils.encryption import SettingsEncryption
 
@@ -21,6 +22,9 @@ class FileHandler:
         self.config_file = "chronohelper_tasks.json"
         self.settings_file = "chronohelper_settings.json"
         self.cookie_file = "chronohelper_cookies.json"
+        self.account_cookie_file = "chronohelper_account_cookies.json"
+        self.auth_state_file = "chronohelper_auth_state.json"
+        self.save_lock = threading.Lock()  # 多個工作線程可能同時保存任務
     
     def load_tasks(self):
         """從配置文件讀取任務列表
@@ -49,9 +53,10 @@ class FileHandler:
             bool: 保存是否成功
         """
         try:
-            tasks_data = [task.to_dict() for task in tasks]
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(tasks_data, f, indent=2)
+            with self.save_lock:
+                tasks_data = [task.to_dict() for task in tasks]
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(tasks_data, f, indent=2)
             return True
         except Exception as e:
             self.logger.log(f"保存任務失敗: {str(e)}")
@@ -77,6 +82,11 @@ class FileHandler:
                             settings['username'] = SettingsEncryption.decrypt_data(settings['username'])
                         if 'password' in settings and settings['password']:
                             settings['password'] = SettingsEncryption.decrypt_data(settings['password'])
+                        for account in settings.get('accounts', []):
+                            if account.get('username'):
+                                account['username'] = SettingsEncryption.decrypt_data(account['username'])
+                            if account.get('password'):
+                                account['password'] = SettingsEncryption.decrypt_data(account['password'])
                     except Exception as e:
                         self.logger.log(f"解密設定失敗: {str(e)}")
                     
@@ -103,6 +113,16 @@ class FileHandler:
                 settings_to_save['username'] = SettingsEncryption.encrypt_data(settings_to_save['username'])
             if 'password' in settings_to_save and settings_to_save['password']:
                 settings_to_save['password'] = SettingsEncryption.encrypt_data(settings_to_save['password'])
+            if settings_to_save.get('accounts'):
+                encrypted_accounts = []
+                for account in settings_to_save['accounts']:
+                    account = dict(account)
+                    if account.get('username'):
+                        account['username'] = SettingsEncryption.encrypt_data(account['username'])
+                    if account.get('password'):
+                        account['password'] = SettingsEncryption.encrypt_data(account['password'])
+                    encrypted_accounts.append(account)
+                settings_to_save['accounts'] = encrypted_accounts
             
             # 寫入文件 (使用fsync確保立即寫入磁盤)
             with open(self.settings_file, 'w', encoding='utf-8') as f:
@@ -149,3 +169,67 @@ class FileHandler:
         except Exception as e:
             self.logger.log(f"保存Cookie失敗: {str(e)}")
             return False
+    
+    def load_account_cookies(self):
+        """載入附加帳號保存的Cookie
+        
+        Returns:
+            dict: 帳號名稱 -> Cookie字典列表
+        """
+        if os.path.exists(self.account_cookie_file):
+            try:
+                with open(self.account_cookie_file, 'r', encoding='utf-8') as f:
+                    cookies_map = json.load(f)
+                    self.logger.log(f"成功載入 {len(cookies_map)} 個附加帳號的Cookie")
+                    return cookies_map
+            except Exception as e:
+                self.logger.log(f"載入附加帳號Cookie失敗: {str(e)}")
+        return {}
+    
+    def save_account_cookies(self, cookies_map):
+        """保存附加帳號的Cookie
+        
+        Args:
+            cookies_map: 帳號名稱 -> Cookie字典列表
+            
+        Returns:
+            bool: 保存是否成功
+        """
+        try:
+            with open(self.account_cookie_file, 'w', encoding='utf-8') as f:
+                json.dump(cookies_map, f)
+            return True
+        except Exception as e:
+            self.logger.log(f"保存附加帳號Cookie失敗: {str(e)}")
+            return False
+    
+    def load_auth_state(self):
+        """載入各帳號的登入狀態（退避和鎖定資訊）
+        
+        Returns:
+            dict: 帳號名稱 -> 狀態字典
+        """
+        if os.path.exists(self.auth_state_file):
+            try:
+                with open(self.auth_state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.log(f"載入登入狀態失敗: {str(e)}")
+        return {}
+    
+    def save_auth_state(self, state):
+        """保存各帳號的登入狀態
+        
+        Args:
+            state: 帳號名稱 -> 狀態字典
+            
+        Returns:
+            bool: 保存是否成功
+        """
+        try:
+            with open(self.auth_state_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            return True
+        except Exception as e:
+            self.logger.log(f"保存登入狀態失敗: {str(e)}")
+            return False
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+進行中操作登記 - 合併對同一操作的並發調用
+"""
+
+import threading
+from concurrent.futures import Future
+
+class InFlightRegistry:
+    """按鍵登記進行中的操作
+
+    第一個調用者執行操作，操作完成前以相同鍵進入的調用者不會重複執行，
+    而是等待並共用第一個調用者的結果（或異常）。
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def run(self, key, func, *args, **kwargs):
+        """執行操作，或加入同鍵的進行中操作
+
+        Args:
+            key: 操作鍵，例如(任務ID, 操作名稱)
+            func: 要執行的函數
+            *args, **kwargs: 傳給函數的參數
+
+        Returns:
+            tuple: (操作結果, 是否加入了他人進行中的操作)
+        """
+        with self.lock:
+            future = self.pending.get(key)
+            leader = future is None
+            if leader:
+                future = self.pending[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def is_in_flight(self, key):
+        """檢查操作是否正在進行
+
+        Args:
+            key: 操作鍵
+
+        Returns:
+            bool: 是否正在進行
+        """
+        with self.lock:
+            return key in self.pending
@@ -5,23 +5,26 @@
 
 import datetime
 import os
-import tkinter as tk
 
 class Logger:
     """日誌管理器"""
     
-    def __init__(self, log_file="chronohelper_log.txt", max_size=1024*1024, max_lines=500):
+    def __init__(self, log_file="chronohelper_log.txt", max_size=1024*1024, max_lines=500, console=False):
         """初始化日誌管理器
         
         Args:
             log_file: 日誌文件路徑
             max_size: 日誌文件最大大小(bytes)
             max_lines: 清理時保留的最大行數
+            console: 是否同時輸出到標準輸出（無界面運行時使用）
         """
         self.log_file = log_file
         self.max_size = max_size
         self.max_lines = max_lines
+        self.console = console
         self.log_text = None  # UI文本組件，由外部設置
+        self.ui_sink = None  # 界面日誌接收函數，設置後代替直接寫入文本組件
+        self.debug_enabled = False  # 是否記錄調試日誌
     
     def set_text_widget(self, log_text):
         """設置日誌顯示的文本組件
@@ -31,6 +34,17 @@ class Logger:
         """
         self.log_text = log_text
     
+    def set_ui_sink(self, sink):
+        """設置界面日誌接收函數
+        
+        日誌可能在任意線程記錄，設置後每行日誌交給sink（如界面事件總線）轉交主線程顯示，
+        不再由記錄日誌的線程直接操作文本組件。
+        
+        Args:
+            sink: 接收已格式化日誌行的函數，None表示取消
+        """
+        self.ui_sink = sink
+    
     def log(self, message):
         """記錄日誌信息
         
@@ -40,10 +54,15 @@ class Logger:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_msg = f"[{timestamp}] {message}\n"
         
-        # 添加到UI日誌
-        if self.log_text:
-            self.log_text.insert(tk.END, log_msg)
-            self.log_text.see(tk.END)  # 自動滾動到底部
+        # 添加到UI日誌（使用Tk的"end"索引，日誌模塊本身不導入tkinter）
+        if self.ui_sink:
+            self.ui_sink(log_msg)
+        elif self.log_text:
+            self.log_text.insert("end", log_msg)
+            self.log_text.see("end")  # 自動滾動到底部
+        
+        if self.console:
+            print(log_msg, end="", flush=True)
         
         # 保存到文件
         try:
@@ -55,6 +74,25 @@ class Logger:
         except Exception as e:
             print(f"保存日誌失敗: {str(e)}")
     
+    def set_debug(self, enabled):
+        """設置是否記錄調試日誌
+        
+        Args:
+            enabled: 是否啟用
+        """
+        self.debug_enabled = bool(enabled)
+    
+    def debug(self, message):
+        """記錄調試日誌，未啟用調試時直接忽略
+        
+        消息構建成本較高時，調用方應先檢查debug_enabled再格式化消息。
+        
+        Args:
+            message: 日誌消息內容
+        """
+        if self.debug_enabled:
+            self.log(message)
+    
     def load_recent_logs(self, lines=100):
         """載入最近的日誌內容
         
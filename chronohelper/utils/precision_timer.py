@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+精確定時器 - 在單調時鐘上按絕對截止時間觸發回調
+"""
+
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+def parse_task_time(date, hhmm):
+    """將任務的日期和HH:MM時間組合為datetime
+
+    Args:
+        date: 日期字串，格式YYYY-MM-DD
+        hhmm: 時間字串，格式HH:MM
+
+    Returns:
+        datetime: 本地時間
+    """
+    return datetime.datetime.strptime(f"{date} {hhmm}", "%Y-%m-%d %H:%M")
+
+def monotonic_deadline(target):
+    """將本地時間換算為單調時鐘上的截止時間
+
+    換算只在預約時進行一次，之後系統時間被調整也不會影響已預約的截止時間。
+
+    Args:
+        target: 目標時間（datetime，本地時間）
+
+    Returns:
+        float: time.monotonic()刻度上的截止時間
+    """
+    return time.monotonic() + (target.timestamp() - time.time())
+
+class PrecisionTimer:
+    """單線程精確定時器
+
+    所有預約保存在按截止時間排序的堆中，定時線程用條件變量等待到最近的截止時間，
+    最後spin_threshold秒改為忙等，使觸發誤差在毫秒以內。回調在定時線程中執行，
+    應只做提交到線程池之類的輕量工作。
+    """
+
+    def __init__(self, spin_threshold=0.002, logger=None):
+        """初始化定時器
+
+        Args:
+            spin_threshold: 截止前改為忙等的秒數
+            logger: 日誌記錄器，用於記錄回調錯誤
+        """
+        self.spin_threshold = spin_threshold
+        self.logger = logger
+        self.heap = []
+        self.entries = {}  # 鍵 -> (截止時間, 序號, 回調, 參數)
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """啟動定時線程"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._loop, name="precision-timer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """停止定時線程並清除所有預約"""
+        with self.condition:
+            self.running = False
+            self.heap = []
+            self.entries = {}
+            self.condition.notify_all()
+
+    def schedule(self, key, deadline, callback, *args):
+        """預約或更新一個回調
+
+        Args:
+            key: 預約鍵，同鍵的舊預約會被取代
+            deadline: 單調時鐘上的截止時間
+            callback: 到期時調用的函數，第一個參數為觸發時的延遲秒數
+            *args: 傳給回調的其他參數
+        """
+        with self.condition:
+            seq = next(self.counter)
+            self.entries[key] = (deadline, seq, callback, args)
+            heapq.heappush(self.heap, (deadline, seq, key))
+            self.condition.notify()
+
+    def cancel(self, key):
+        """取消預約
+
+        Returns:
+            bool: 是否存在該預約
+        """
+        with self.condition:
+            return self.entries.pop(key, None) is not None
+
+    def get_deadline(self, key):
+        """獲取預約的截止時間
+
+        Returns:
+            float: 截止時間，未預約時返回None
+        """
+        with self.condition:
+            entry = self.entries.get(key)
+            return entry[0] if entry else None
+
+    def is_scheduled(self, key):
+        """是否存在尚未觸發的預約"""
+        with self.condition:
+            return key in self.entries
+
+    def _next_due(self):
+        """等待並取出下一個到期的預約，調用前需持有鎖
+
+        Returns:
+            tuple: (截止時間, 回調, 參數)，定時器停止時返回None
+        """
+        while self.running:
+            # 丟棄已被取代或取消的堆項目
+            while self.heap:
+                deadline, seq, key = self.heap[0]
+                entry = self.entries.get(key)
+                if entry is not None and entry[1] == seq:
+                    break
+                heapq.heappop(self.heap)
+            if not self.heap:
+                self.condition.wait()
+                continue
+
+            deadline, seq, key = self.heap[0]
+            remaining = deadline - time.monotonic()
+            if remaining > self.spin_threshold:
+                self.condition.wait(remaining - self.spin_threshold)
+                continue
+
+            heapq.heappop(self.heap)
+            _, _, callback, args = self.entries.pop(key)
+            return deadline, callback, args
+        return None
+
+    def _loop(self):
+        """定時線程主循環"""
+        while True:
+            with self.condition:
+                due = self._next_due()
+            if due is None:
+                return
+
+            deadline, callback, args = due
+            # 最後幾毫秒忙等，避免條件變量喚醒的調度誤差
+            while time.monotonic() < deadline:
+                pass
+            try:
+                callback(time.monotonic() - deadline, *args)
+            except Exception as e:
+                if self.logger:
+                    self.logger.log(f"定時回調執行錯誤: {str(e)}")
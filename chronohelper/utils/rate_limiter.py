@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+請求頻率限制工具 - 按主機共用的令牌桶
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """線程安全的令牌桶
+
+    令牌按固定速率補充，最多累積capacity個，允許短時間內的突發請求。
+    reserve不會阻塞：它立即預扣一個令牌並返回調用方需要等待的秒數，
+    令牌可以透支為負數，後續的預約會依序排在後面。
+    """
+
+    def __init__(self, rate, capacity):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒補充的令牌數
+            capacity: 令牌桶容量（突發上限）
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        """根據經過的時間補充令牌，調用前需持有鎖"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """預扣令牌
+
+        Args:
+            tokens: 需要的令牌數
+
+        Returns:
+            float: 需要等待的秒數，0表示可以立即執行
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def try_acquire(self, tokens=1):
+        """在有足夠令牌時立即取得，否則不扣除
+
+        Args:
+            tokens: 需要的令牌數
+
+        Returns:
+            bool: 是否取得令牌
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def configure(self, rate, capacity):
+        """更新補充速率和容量，保留當前令牌數（包括已透支的預約）
+
+        Args:
+            rate: 每秒補充的令牌數
+            capacity: 令牌桶容量（突發上限）
+        """
+        with self.lock:
+            # 先按舊速率結算到現在，之後才按新速率補充
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = float(capacity)
+            self.tokens = min(self.tokens, self.capacity)
+
+class RateLimiter:
+    """按主機劃分令牌桶的請求頻率限制器，供認證服務和任務服務共用"""
+
+    def __init__(self, interval=1.5, burst=2):
+        """初始化限制器
+
+        Args:
+            interval: 同一主機兩個請求之間的平均間隔（秒）
+            burst: 允許連續發出的請求數
+        """
+        self.interval = max(0.01, float(interval))
+        self.burst = max(1, int(burst))
+        self.buckets = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        """從URL或主機名中取出主機"""
+        return urlparse(url).netloc or url
+
+    def _get_bucket(self, host):
+        """獲取主機對應的令牌桶，調用前需持有鎖"""
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(1 / self.interval, self.burst)
+        return bucket
+
+    def reserve(self, url):
+        """為一次請求預約令牌，不阻塞
+
+        Args:
+            url: 請求URL或主機名
+
+        Returns:
+            float: 請求應該延後的秒數
+        """
+        host = self._host(url)
+        with self.lock:
+            bucket = self._get_bucket(host)
+        delay = bucket.reserve()
+        self._record(host, delay)
+        return delay
+
+    def acquire(self, url):
+        """阻塞直到可以發出請求，只應在工作線程中使用
+
+        Args:
+            url: 請求URL或主機名
+
+        Returns:
+            float: 實際等待的秒數
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def schedule(self, url, callback, *args, **kwargs):
+        """預約令牌並在輪到時於後台線程執行回調，調用方不會被阻塞
+
+        預約的只是一個請求的令牌。簽到/簽退用它發送首次請求，操作中由ensure_login
+        發出的驗證、刷新和登入請求以及重試請求仍會各自取得令牌。
+
+        Args:
+            url: 請求URL或主機名
+            callback: 輪到時執行的函數
+            *args, **kwargs: 傳給回調的參數
+
+        Returns:
+            float: 回調被延後的秒數
+        """
+        delay = self.reserve(url)
+        timer = threading.Timer(delay, callback, args, kwargs)
+        timer.daemon = True
+        timer.start()
+        return delay
+
+    def update_settings(self, interval, burst):
+        """更新限制參數，已有的令牌桶就地更新，已排隊的預約不會丟失
+
+        Args:
+            interval: 平均請求間隔（秒）
+            burst: 突發上限
+        """
+        with self.lock:
+            self.interval = max(0.01, float(interval))
+            self.burst = max(1, int(burst))
+            for bucket in self.buckets.values():
+                bucket.configure(1 / self.interval, self.burst)
+
+    def _record(self, host, delay):
+        """記錄排隊延遲"""
+        with self.lock:
+            stats = self.metrics.setdefault(host, {"requests": 0, "delayed": 0, "total_delay": 0.0, "max_delay": 0.0})
+            stats["requests"] += 1
+            if delay > 0:
+                stats["delayed"] += 1
+                stats["total_delay"] += delay
+                stats["max_delay"] = max(stats["max_delay"], delay)
+
+    def get_metrics(self):
+        """獲取各主機的排隊延遲統計
+
+        Returns:
+            dict: 主機 -> 包含requests、delayed、total_delay、max_delay和avg_delay的字典
+        """
+        with self.lock:
+            result = {}
+            for host, stats in self.metrics.items():
+                stats = dict(stats)
+                stats["avg_delay"] = stats["total_delay"] / stats["requests"] if stats["requests"] else 0.0
+                result[host] = stats
+            return result
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+伺服器時鐘偏移估計 - 從HTTP響應的Date頭推算本地與伺服器的時間差
+"""
+
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+class ServerClock:
+    """以NTP的方式估計伺服器時鐘相對本地時鐘的偏移
+
+    每個響應提供一個樣本: Date頭只精確到秒，伺服器在發送時刻的時間落在
+    [D, D+1) 內，而發送時刻落在本地的請求開始t0與響應結束t3之間，因此
+    偏移 = 伺服器時間 - 本地時間 一定在 [D - t3, D + 1 - t0) 內。
+    對滑動窗口內所有樣本的區間取交集，交集的中點是估計值，半寬是不確定度；
+    交集為空（例如本地時鐘被調整）時逐個捨棄最舊的樣本。
+    """
+
+    def __init__(self, window=32):
+        """初始化時鐘
+
+        Args:
+            window: 保留的最近樣本數
+        """
+        self.samples = deque(maxlen=window)  # (下界, 上界)
+        self.estimate = None  # (偏移, 不確定度)
+        self.lock = threading.Lock()
+
+    def observe(self, date_header, sent_at, received_at):
+        """加入一個響應樣本
+
+        Args:
+            date_header: 響應的Date頭
+            sent_at: 發送請求前的本地時間（time.time()）
+            received_at: 收到響應後的本地時間（time.time()）
+
+        Returns:
+            bool: 樣本是否有效
+        """
+        if not date_header or received_at < sent_at:
+            return False
+        try:
+            server_time = parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return False
+
+        with self.lock:
+            self.samples.append((server_time - received_at, server_time + 1 - sent_at))
+            self._update_estimate()
+        return True
+
+    def _update_estimate(self):
+        """根據窗口內的樣本重新計算估計值，調用前需持有鎖"""
+        while self.samples:
+            low = max(sample[0] for sample in self.samples)
+            high = min(sample[1] for sample in self.samples)
+            if low <= high:
+                self.estimate = ((low + high) / 2, (high - low) / 2)
+                return
+            # 樣本互相矛盾，說明某一方的時鐘發生了跳變，捨棄最舊的樣本
+            self.samples.popleft()
+        self.estimate = None
+
+    def get_offset(self):
+        """獲取目前的偏移估計
+
+        Returns:
+            tuple: (偏移秒數, 不確定度秒數)，偏移為正表示伺服器時鐘較快；沒有樣本時返回None
+        """
+        with self.lock:
+            return self.estimate
+
+    def now(self):
+        """估計目前的伺服器時間
+
+        Returns:
+            float: 伺服器時間的epoch秒數，沒有樣本時返回本地時間
+        """
+        estimate = self.get_offset()
+        return time.time() + (estimate[0] if estimate else 0.0)
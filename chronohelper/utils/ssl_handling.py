@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+SSL處理設定，由界面和守護進程的入口共用
+"""
+
+import logging
+from typing import Any
+
+import requests
+import urllib3
+
+logger = logging.getLogger('ChronoHelper')
+
+def setup_ssl_handling() -> None:
+    """
+    配置SSL處理和請求設定
+    
+    永久禁用SSL證書驗證，適用於本系統訪問的自簽證書網站
+    
+    警告：
+        禁用SSL證書驗證可能導致安全風險，僅應在受控內部網絡環境中使用。
+    """
+    # 禁用SSL證書驗證
+    logger.warning("安全警告：SSL證書驗證已被禁用。")
+    
+    # 禁用SSL證書驗證警告
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    
+    # 保存原始請求方法
+    old_request = requests.Session.request
+    
+    # 修改requests庫的默認行為，禁用SSL驗證
+    def new_request(self: requests.Session, method: str, url: str, **kwargs: Any) -> requests.Response:
+        # 禁用證書驗證
+        if 'verify' not in kwargs:
+            kwargs['verify'] = False
+        return old_request(self, method, url, **kwargs)
+    
+    # 覆蓋原始請求方法
+    requests.Session.request = new_request  # type: ignore
+    
+    logger.info("已配置忽略SSL證書驗證的網絡請求")
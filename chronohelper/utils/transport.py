@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP傳輸層 - 為認證服務提供可替換的會話實現
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from requests.structures import CaseInsensitiveDict
+
+# HTTP/2客戶端為可選依賴（pip install httpx[http2]）
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+# HTTP/2禁止的逐跳頭部
+HOP_BY_HOP_HEADERS = ('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade')
+
+class RequestsTransport:
+    """基於requests的HTTP/1.1傳輸，默認實現"""
+
+    name = "http1"
+
+    def __init__(self, adapter=None):
+        """初始化傳輸
+
+        Args:
+            adapter: 共用的HTTPAdapter，為None時每個會話使用自己的連接池
+        """
+        self.adapter = adapter
+
+    def new_session(self):
+        """創建新的會話
+
+        Returns:
+            Session: requests.Session實例
+        """
+        session = requests.Session()
+        session.verify = False
+        if self.adapter is not None:
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+        return session
+
+    def close(self):
+        """關閉共用的連接池"""
+        if self.adapter is not None:
+            self.adapter.close()
+
+class Http2Transport:
+    """基於httpx的HTTP/2傳輸
+
+    所有會話共用同一個httpx.HTTPTransport，同一主機的請求在一條連接上多路復用。
+    每個會話保留自己的Cookie容器，互不干擾。
+    """
+
+    name = "http2"
+
+    def __init__(self, max_connections=10, http1=True):
+        """初始化傳輸
+
+        Args:
+            max_connections: 連接池最大連接數
+            http1: 是否允許降級到HTTP/1.1，為False時對http://使用HTTP/2明文直連
+
+        Raises:
+            ImportError: 未安裝httpx或h2
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("未安裝httpx，無法使用HTTP/2傳輸")
+        # 未安裝h2時httpx會在這裡拋出ImportError
+        self.transport = httpx.HTTPTransport(
+            http1=http1,
+            http2=True,
+            verify=False,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def new_session(self):
+        """創建新的會話
+
+        Returns:
+            Http2Session: 與requests.Session接口兼容的會話
+        """
+        return Http2Session(self.transport)
+
+    def close(self):
+        """關閉共用的連接"""
+        self.transport.close()
+
+class Http2Session:
+    """以requests.Session的接口包裝httpx.Client
+
+    只實現認證和任務服務用到的部分: headers、cookies、get、post，
+    並將httpx的異常轉換為requests的異常，調用方的錯誤處理無需改動。
+    """
+
+    def __init__(self, transport):
+        """初始化會話
+
+        Args:
+            transport: 共用的httpx.HTTPTransport
+        """
+        self.headers = CaseInsensitiveDict()
+        self.cookies = RequestsCookieJar()
+        self.verify = False
+        # httpx.Cookies直接包裝傳入的CookieJar，兩邊看到的是同一個容器
+        self.client = httpx.Client(transport=transport, cookies=self.cookies, follow_redirects=True)
+
+    def mount(self, prefix, adapter):
+        """兼容requests接口，HTTP/2會話的連接由傳輸層統一管理"""
+
+    def request(self, method, url, headers=None, timeout=None, **kwargs):
+        """發送請求
+
+        Args:
+            method: HTTP方法
+            url: 請求URL
+            headers: 額外的請求頭部，會覆蓋會話頭部
+            timeout: 超時秒數
+            **kwargs: 傳給httpx的其他參數（data、json、params等）
+
+        Returns:
+            httpx.Response: 響應對象，提供status_code、text、json()和headers
+        """
+        merged = CaseInsensitiveDict(self.headers)
+        if headers:
+            merged.update(headers)
+        merged = {key: value for key, value in merged.items() if key.lower() not in HOP_BY_HOP_HEADERS}
+
+        try:
+            return self.client.request(method, url, headers=merged, timeout=timeout, **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e))
+
+    def get(self, url, **kwargs):
+        """發送GET請求"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """發送POST請求"""
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """釋放會話，共用的傳輸由Http2Transport負責關閉"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def create_transport(kind="http1", adapter=None, max_connections=10, logger=None):
+    """根據設定創建傳輸，HTTP/2依賴缺失時回退到HTTP/1.1
+
+    Args:
+        kind: 傳輸類型，"http1"或"http2"
+        adapter: HTTP/1.1傳輸使用的共用HTTPAdapter
+        max_connections: HTTP/2傳輸的最大連接數
+        logger: 日誌記錄器，用於記錄回退原因
+
+    Returns:
+        RequestsTransport或Http2Transport實例
+    """
+    if kind == "http2":
+        try:
+            return Http2Transport(max_connections=max_connections)
+        except ImportError as e:
+            if logger:
+                logger.log(f"無法使用HTTP/2傳輸，改用HTTP/1.1: {str(e)}")
+    return RequestsTransport(adapter if adapter is not None else HTTPAdapter(pool_maxsize=max_connections))